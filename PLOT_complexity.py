@@ -1,7 +1,8 @@
-import json
 from pathlib import Path
 import matplotlib.pyplot as plt
 import radon
+from report_columns import load_columns
+from config import load_config
 
 # -----------------------------------------
 # CONFIG
@@ -12,52 +13,29 @@ CLOSE_PLOTS = 1
 # -----------------------------------------
 # PATHS
 # -----------------------------------------
-BASE = Path("/Users/acalapai/Desktop/CodeAnalysis")
-RESULTS_DIR = BASE / "results"
+CONFIG = load_config()   # metacode.json (see config.py)
+RESULTS_DIR = CONFIG["results_dir"]
 ANALYSIS_FILE = RESULTS_DIR / "analysis.json"
 
 # -----------------------------------------
 # LOAD DATA
 # -----------------------------------------
-with open(ANALYSIS_FILE, "r") as f:
-    report = json.load(f)
+cols = load_columns(ANALYSIS_FILE)   # also reads analysis.json.gz / .zst
 
 # -----------------------------------------
 # EXTRACT COMPLEXITY DATA
 # -----------------------------------------
-all_cc_values = []        # all function complexities across all repos
-repo_avg_complexity = []  # avg file complexity per repo
-repo_max_complexity = []  # max file complexity per repo
-repo_names = []
+has_cc = cols.counts_per_file("cc_values") > 0   # files with at least one CC value
 
-for repo_name, repo_data in report.items():
-    if repo_name == "_global":
-        continue
-
-    repo_names.append(repo_name)
-
-    per_file_avg = []
-    per_file_max = []
-
-    for fpath, fdata in repo_data["files"].items():
-        cc = fdata["complexity"]["cc_values"]  # list of function CC values
-
-        if cc:
-            all_cc_values.extend(cc)
-            per_file_avg.append(fdata["complexity"]["avg_cc"])
-            per_file_max.append(fdata["complexity"]["max_cc"])
-
-    # Repo-level aggregates
-    avg_cplx = sum(per_file_avg) / len(per_file_avg) if per_file_avg else 0
-    max_cplx = max(per_file_max) if per_file_max else 0
-
-    repo_avg_complexity.append(avg_cplx)
-    repo_max_complexity.append(max_cplx)
+all_cc_values = cols["cc_values"]                              # all function complexities across all repos
+repo_names = cols.repos
+repo_avg_complexity = cols.group_mean("avg_cc", mask=has_cc)  # avg file complexity per repo
+repo_max_complexity = cols.group_max("max_cc", mask=has_cc)   # max file complexity per repo
 
 # ----------------------------------------------------------
 # 1. HISTOGRAM OF ALL COMPLEXITY VALUES
 # ----------------------------------------------------------
-if all_cc_values:
+if len(all_cc_values):
     plt.figure(figsize=(10, 6))
     plt.hist(all_cc_values, bins=30, edgecolor='black')
     plt.xlabel("Cyclomatic Complexity")
@@ -2,38 +2,26 @@ import json
 from pathlib import Path
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
-from collections import Counter
+from report_columns import load_columns
+from config import load_config
 
 # ---------------- CONFIG ----------------
 SAVE_PLOTS = 0
 CLOSE_PLOTS = 0
 MIN_COUNT_FILTER = 2
 
-BASE = Path("/Users/acalapai/Desktop/CodeAnalysis")
-RESULTS_DIR = BASE / "results"
+CONFIG = load_config()   # metacode.json (see config.py)
+RESULTS_DIR = CONFIG["results_dir"]
 ANALYSIS_FILE = RESULTS_DIR / "analysis.json"
+DUPLICATES_FILE = RESULTS_DIR / "function_duplicates.json"   # written by main.py
 
 # ------------ LOAD DATA -----------------
-with open(ANALYSIS_FILE, "r") as f:
-    report = json.load(f)
+cols = load_columns(ANALYSIS_FILE)   # also reads analysis.json.gz / .zst
 
-function_counts = Counter()
-file_func_counts = []
-file_locs = []
-file_num_funcs = []
-
-for repo_name, repo in report.items():
-    if repo_name == "_global":
-        continue
-
-    for fpath, fdata in repo["files"].items():
-        fnames = fdata["function_names"]
-        loc = fdata["loc"]
-        nf = fdata["num_functions"]
-
-        function_counts.update(fnames)
-        file_num_funcs.append(nf)
-        file_locs.append(loc)
+name_counts = cols.most_common("function_names")   # most frequent first
+function_counts = dict(name_counts)
+file_locs = cols["loc"]
+file_num_funcs = cols["num_functions"]
 
 # ------------- Helper --------------------
 def show_or_save(path=None):
@@ -70,7 +58,7 @@ if filtered:
     show_or_save(RESULTS_DIR / "defined_functions_wordcloud_filtered.png")
 
 # ---- 3. Bar plot (Top 20 defined) -------
-top20 = function_counts.most_common(20)
+top20 = name_counts[:20]
 if top20:
     labels = [t[0] for t in top20]
     counts = [t[1] for t in top20]
@@ -99,4 +87,22 @@ plt.xlabel("LOC")
 plt.ylabel("# Functions")
 plt.title("LOC vs # Defined Functions")
 plt.tight_layout()
-show_or_save(RESULTS_DIR / "defined_functions_scatter.png")
\ No newline at end of file
+show_or_save(RESULTS_DIR / "defined_functions_scatter.png")
+
+# ---- 6. Bar plot — duplicated bodies ----
+# Same normalized body under any name (function_index.build_duplicate_index)
+if DUPLICATES_FILE.exists():
+    with open(DUPLICATES_FILE, "r") as f:
+        top_groups = json.load(f)["groups"][:20]
+    if top_groups:
+        labels = []
+        for g in top_groups:
+            names = list(dict.fromkeys(fn[2].rsplit(".", 1)[-1] for fn in g["functions"]))
+            labels.append(" / ".join(names[:3]) + (" …" if len(names) > 3 else ""))
+
+        plt.figure(figsize=(12,6))
+        plt.barh(labels[::-1], [g["count"] for g in top_groups][::-1])
+        plt.xlabel("Copies")
+        plt.title("Top 20 Duplicated Function Bodies (by duplicated lines)")
+        plt.tight_layout()
+        show_or_save(RESULTS_DIR / "defined_functions_duplicates.png")
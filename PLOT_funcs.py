@@ -1,47 +1,30 @@
-import json
 from pathlib import Path
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
-from collections import Counter, defaultdict
+from collections import Counter
+from heavy_hitters import HeavyHitters, count_calls
+from report_io import load_report
+from config import load_config
 
 # ---------------- CONFIG ----------------
 SAVE_PLOTS = 0
 CLOSE_PLOTS = 0
 TOP_N = 50           # top N function calls to plot
 FILTER_PACKAGES = ["torch", "cv2", "numpy", "PIL", "sklearn"]
+APPROX_COUNTS = 0    # 1 = fixed-memory call counts (heavy_hitters.py) for huge reports
 
-BASE = Path("/Users/acalapai/Desktop/CodeAnalysis")
-RESULTS_DIR = BASE / "results"
+CONFIG = load_config()   # metacode.json (see config.py)
+RESULTS_DIR = CONFIG["results_dir"]
 ANALYSIS_FILE = RESULTS_DIR / "analysis.json"
 
 # ------------ LOAD DATA -----------------
-with open(ANALYSIS_FILE, "r") as f:
-    report = json.load(f)
+report = load_report(ANALYSIS_FILE)   # also reads analysis.json.gz / .zst
 
-call_counts = Counter()
-file_call_counts = []
-file_locs = []
-
-package_specific = {pkg: Counter() for pkg in FILTER_PACKAGES}
+new_counter = HeavyHitters if APPROX_COUNTS else Counter
 
 # -------- Extract function call data -----
-for repo_name, repo in report.items():
-    if repo_name == "_global":
-        continue
-
-    for fpath, fdata in repo["files"].items():
-        calls = fdata["function_calls"]
-        loc = fdata["loc"]
-
-        call_counts.update(calls)
-        file_call_counts.append(len(calls))
-        file_locs.append(loc)
-
-        # package-specific classification
-        for c in calls:
-            for pkg in FILTER_PACKAGES:
-                if c.startswith(pkg + "."):
-                    package_specific[pkg][c] += 1
+call_counts, file_call_counts, file_locs, package_specific = count_calls(
+    report, FILTER_PACKAGES, new_counter)
 
 # ------------- Helper --------------------
 def show_or_save(path=None):
@@ -56,7 +39,7 @@ def show_or_save(path=None):
 # -------- 1. Wordcloud — all function calls
 if call_counts:
     wc = WordCloud(width=1600, height=900, background_color="white")
-    img = wc.generate_from_frequencies(call_counts)
+    img = wc.generate_from_frequencies(dict(call_counts.most_common()))
 
     plt.figure(figsize=(16,9))
     plt.imshow(img, interpolation="bilinear")
@@ -102,7 +85,7 @@ for pkg, counter in package_specific.items():
         continue
 
     wc = WordCloud(width=1600, height=900, background_color="white")
-    img = wc.generate_from_frequencies(counter)
+    img = wc.generate_from_frequencies(dict(counter.most_common()))
 
     plt.figure(figsize=(16,9))
     plt.imshow(img, interpolation="bilinear")
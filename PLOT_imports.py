@@ -1,8 +1,9 @@
-import json
 from pathlib import Path
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 from collections import Counter
+from report_io import load_report
+from config import load_config
 
 # -----------------------------------------
 # CONFIG
@@ -12,16 +13,12 @@ CLOSE_PLOTS = 1       # Close plots after saving (1 = yes, 0 = no)
 MIN_IMPORT_COUNT = 10 # Only visualize imports used >= this number of times
 
 # Paths
-BASE = Path("/Users/acalapai/Desktop/CodeAnalysis")
-RESULTS_DIR = BASE / "results"
+CONFIG = load_config()   # metacode.json (see config.py)
+RESULTS_DIR = CONFIG["results_dir"]
 ANALYSIS_FILE = RESULTS_DIR / "analysis.json"
 
-# Load the analysis results
-if not ANALYSIS_FILE.exists():
-    raise FileNotFoundError(f"{ANALYSIS_FILE} not found. Run main.py first.")
-
-with open(ANALYSIS_FILE, "r") as f:
-    report = json.load(f)
+# Load the analysis results (plain, .gz or .zst; raises if none exists)
+report = load_report(ANALYSIS_FILE)
 
 # -----------------------------------------
 # LOAD GLOBAL STATS (SAFE PARSING)
@@ -1,8 +1,10 @@
-import json
 from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
 import squarify
+from report_io import load_report
+from report_columns import load_columns
+from config import load_config
 
 # Seaborn style
 sns.set_theme(style="whitegrid")
@@ -10,12 +12,12 @@ sns.set_theme(style="whitegrid")
 SAVE_PLOTS = 1
 CLOSE_PLOTS = 1
 
-BASE = Path("/Users/acalapai/Desktop/CodeAnalysis")
-RESULTS_DIR = BASE / "results"
+CONFIG = load_config()   # metacode.json (see config.py)
+RESULTS_DIR = CONFIG["results_dir"]
 ANALYSIS_FILE = RESULTS_DIR / "analysis.json"
 
-with open(ANALYSIS_FILE, "r") as f:
-    report = json.load(f)
+report = load_report(ANALYSIS_FILE)   # also reads analysis.json.gz / .zst
+cols = load_columns(ANALYSIS_FILE)
 
 # ============================================================
 # EXTRACT DATA
@@ -27,22 +29,12 @@ lang_names = list(languages.keys())
 lang_loc = [languages[l]["total_loc"] for l in lang_names]
 
 # Repositories
-repo_names = []
-repo_loc = []
-repo_num_files = []
-file_loc_per_repo = {}
-
-for repo_name, repo_data in report.items():
-    if repo_name.startswith("_"):
-        continue
-
-    repo_names.append(repo_name)
-    repo_loc.append(repo_data["total_lines"])
-    repo_num_files.append(repo_data["num_source_files"])
-    file_loc_per_repo[repo_name] = [f["loc"] for f in repo_data["files"].values()]
+repo_names = cols.repos
+repo_loc = cols.group_sum("loc")
+repo_num_files = cols.group_count()
 
 # Histogram data
-all_locs = [loc for repo in file_loc_per_repo.values() for loc in repo]
+all_locs = cols["loc"]
 
 
 # ============================================================
@@ -83,9 +75,10 @@ ax.set_xlabel("LOC")
 # (4) Treemap
 # ------------------------------------------------------------
 ax = axs[1, 1]
-sizes = [loc for loc in repo_loc if loc > 0]
-labels = [repo_names[i] for i, loc in enumerate(repo_loc) if loc > 0]
-if sizes:
+nonempty = repo_loc > 0
+sizes = repo_loc[nonempty]
+labels = [name for name, keep in zip(repo_names, nonempty) if keep]
+if len(sizes):
     squarify.plot(sizes=sizes, label=labels, ax=ax, alpha=0.8)
 ax.set_title("Repository LOC Treemap")
 ax.axis("off")
@@ -0,0 +1,272 @@
+import heapq
+import json
+from array import array
+from collections import Counter, deque
+from pathlib import Path
+
+# =========================================================
+# CROSS-REPO CALL GRAPH
+# =========================================================
+# Nodes are Python functions (one per row of a file's "functions"
+# records, notebooks included) plus one "<module>" node per file for
+# top-level code.
+# Edges are stored CSR-style in flat integer arrays:
+#
+#   out_offsets[n] .. out_offsets[n+1]  -> slice of out_targets / out_counts
+#   in_offsets[n]  .. in_offsets[n+1]   -> slice of in_sources  / in_counts
+#
+# where *_counts hold the number of call sites behind each edge.
+
+MODULE_NODE = "<module>"
+
+# ---------------------------------------------------------
+# MODULE / SYMBOL TABLES
+# ---------------------------------------------------------
+def module_names(rel_path: str):
+    """
+    Dotted names a file can be imported as: the full path from the repo
+    root and every shorter suffix (scripts often extend sys.path).
+    """
+    parts = Path(rel_path).with_suffix("").parts
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return [".".join(parts[i:]) for i in range(len(parts))]
+
+def package_of(rel_path: str, level: int):
+    """Dotted package a relative import of `level` dots refers to."""
+    parts = Path(rel_path).parent.parts
+    if level > 1:
+        parts = parts[:max(0, len(parts) - (level - 1))]
+    return ".".join(parts)
+
+# ---------------------------------------------------------
+# BUILD
+# ---------------------------------------------------------
+def build_call_graph(report) -> dict:
+    repos = []
+    files = []          # [repo_id, rel_path]
+    node_file = array("i")
+    node_name = []
+    symbols = []        # per file: {qualname: node_id}
+    modules = {}        # dotted name -> [file_id, ...]
+    py_files = []       # (file_id, metrics)
+
+    for repo_name, repo_data in report.items():
+        if repo_name.startswith("_"):
+            continue
+        repo_id = len(repos)
+        repos.append(repo_name)
+
+        for rel_path, metrics in repo_data["files"].items():
+            if metrics.get("language") not in ("python", "jupyter"):
+                continue
+            file_id = len(files)
+            files.append([repo_id, rel_path])
+
+            table = {}
+            for qualname in [MODULE_NODE] + [r[0] for r in metrics.get("functions", [])]:
+                table[qualname] = len(node_name)
+                node_file.append(file_id)
+                node_name.append(qualname)
+            symbols.append(table)
+
+            for name in module_names(rel_path):
+                modules.setdefault(name, []).append(file_id)
+            py_files.append((file_id, metrics))
+
+    def lookup_module(module, from_file):
+        candidates = modules.get(module)
+        if not candidates:
+            return []
+        # Same repo first, then every other repo
+        repo_id = files[from_file][0]
+        return sorted(candidates, key=lambda f: files[f][0] != repo_id)
+
+    def lookup_symbol(file_id, sym):
+        table = symbols[file_id]
+        node = table.get(sym)
+        if node is None:
+            node = table.get(sym + ".__init__")   # Class(...) -> Class.__init__
+        return node
+
+    def resolve_dotted(dotted, from_file):
+        level = len(dotted) - len(dotted.lstrip("."))
+        if level:
+            package = package_of(files[from_file][1], level)
+            dotted = dotted[level:]
+            if package:
+                dotted = package + "." + dotted
+
+        parts = dotted.split(".")
+        for i in range(len(parts) - 1, 0, -1):
+            sym = ".".join(parts[i:])
+            for file_id in lookup_module(".".join(parts[:i]), from_file):
+                node = lookup_symbol(file_id, sym)
+                if node is not None:
+                    return node
+        return None
+
+    def resolve(call, file_id, owner, aliases, imports):
+        table = symbols[file_id]
+        head, _, rest = call.partition(".")
+
+        # self.method() / cls.method() inside a method (or a closure in one)
+        method = owner.split(".<locals>.", 1)[0]
+        if head in ("self", "cls") and rest and "." in method:
+            cls_name = method.rsplit(".", 1)[0]
+            node = lookup_symbol(file_id, cls_name + "." + rest)
+            if node is not None:
+                return node
+
+        # Closures, then module-level names of the same file
+        if owner != MODULE_NODE:
+            node = table.get(owner + ".<locals>." + call)
+            if node is not None:
+                return node
+        node = lookup_symbol(file_id, call)
+        if node is not None:
+            return node
+
+        if head in aliases:
+            target = aliases[head] + ("." + rest if rest else "")
+            return resolve_dotted(target, file_id)
+        if rest and head in imports:
+            return resolve_dotted(call, file_id)
+        return None
+
+    edges = Counter()
+    num_sites = num_resolved = 0
+    for file_id, metrics in py_files:
+        table = symbols[file_id]
+        records = metrics.get("functions", [])
+        calls = metrics.get("function_calls", [])
+        owners = metrics.get("call_owners") or [-1] * len(calls)
+        aliases = metrics.get("import_aliases", {})
+        imports = metrics.get("imports", {})
+
+        for call, owner_row in zip(calls, owners):
+            owner = records[owner_row][0] if owner_row >= 0 else MODULE_NODE
+            num_sites += 1
+            dst = resolve(call, file_id, owner, aliases, imports)
+            if dst is not None:
+                num_resolved += 1
+                edges[(table[owner], dst)] += 1
+
+    graph = {
+        "repos": repos,
+        "files": files,
+        "node_file": node_file,
+        "node_name": node_name,
+        "num_call_sites": num_sites,
+        "num_resolved": num_resolved,
+    }
+    graph.update(to_csr(edges, len(node_name)))
+    return graph
+
+def to_csr(edges, num_nodes):
+    out_offsets, out_targets, out_counts = csr_arrays(
+        ((src, dst, c) for (src, dst), c in edges.items()), num_nodes)
+    in_offsets, in_sources, in_counts = csr_arrays(
+        ((dst, src, c) for (src, dst), c in edges.items()), num_nodes)
+    return {
+        "out_offsets": out_offsets, "out_targets": out_targets, "out_counts": out_counts,
+        "in_offsets": in_offsets, "in_sources": in_sources, "in_counts": in_counts,
+    }
+
+def csr_arrays(triples, num_nodes):
+    triples = sorted(triples)
+    offsets = array("l", [0]) * (num_nodes + 1)
+    neighbours = array("i")
+    counts = array("i")
+    for src, dst, c in triples:
+        offsets[src + 1] += 1
+        neighbours.append(dst)
+        counts.append(c)
+    for n in range(num_nodes):
+        offsets[n + 1] += offsets[n]
+    return offsets, neighbours, counts
+
+# ---------------------------------------------------------
+# SAVE / LOAD
+# ---------------------------------------------------------
+ARRAY_TYPES = {
+    "node_file": "i",
+    "out_offsets": "l", "out_targets": "i", "out_counts": "i",
+    "in_offsets": "l", "in_sources": "i", "in_counts": "i",
+}
+
+def write_call_graph(graph, path: Path):
+    out = {k: (v.tolist() if k in ARRAY_TYPES else v) for k, v in graph.items()}
+    with open(path, "w") as f:
+        json.dump(out, f, separators=(",", ":"))
+
+def load_call_graph(path: Path) -> dict:
+    with open(path, "r") as f:
+        graph = json.load(f)
+    for key, typecode in ARRAY_TYPES.items():
+        graph[key] = array(typecode, graph[key])
+    return graph
+
+# ---------------------------------------------------------
+# QUERIES
+# ---------------------------------------------------------
+def describe(graph, node) -> dict:
+    repo_id, rel_path = graph["files"][graph["node_file"][node]]
+    return {"repo": graph["repos"][repo_id], "file": rel_path, "name": graph["node_name"][node]}
+
+def find_nodes(graph, name: str):
+    """Node ids whose qualified name equals `name` or ends with `.name`."""
+    suffix = "." + name
+    return [n for n, q in enumerate(graph["node_name"]) if q == name or q.endswith(suffix)]
+
+def fan_in(graph, node, weighted: bool = False) -> int:
+    lo, hi = graph["in_offsets"][node], graph["in_offsets"][node + 1]
+    return sum(graph["in_counts"][lo:hi]) if weighted else hi - lo
+
+def fan_out(graph, node, weighted: bool = False) -> int:
+    lo, hi = graph["out_offsets"][node], graph["out_offsets"][node + 1]
+    return sum(graph["out_counts"][lo:hi]) if weighted else hi - lo
+
+def callers(graph, node):
+    return graph["in_sources"][graph["in_offsets"][node]:graph["in_offsets"][node + 1]]
+
+def callees(graph, node):
+    return graph["out_targets"][graph["out_offsets"][node]:graph["out_offsets"][node + 1]]
+
+def caller_repos(graph, node) -> set:
+    files = graph["files"]
+    node_file = graph["node_file"]
+    return {files[node_file[c]][0] for c in callers(graph, node)}
+
+def top_fan_in(graph, n: int = 20, weighted: bool = True):
+    """The n most called functions, with the number of distinct calling repos."""
+    num_nodes = len(graph["node_name"])
+    ranked = heapq.nlargest(n, range(num_nodes), key=lambda v: fan_in(graph, v, weighted))
+    out = []
+    for v in ranked:
+        row = describe(graph, v)
+        row.update(fan_in=fan_in(graph, v, weighted), caller_repos=len(caller_repos(graph, v)))
+        out.append(row)
+    return out
+
+def reachable(graph, node, reverse: bool = False, max_depth: int = None) -> list:
+    """
+    Breadth-first closure from `node` over callees (or callers if
+    reverse=True). Returns node ids, excluding `node` itself.
+    """
+    offsets = graph["in_offsets"] if reverse else graph["out_offsets"]
+    targets = graph["in_sources"] if reverse else graph["out_targets"]
+    seen = bytearray(len(graph["node_name"]))
+    seen[node] = 1
+    queue = deque([(node, 0)])
+    out = []
+    while queue:
+        v, depth = queue.popleft()
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for w in targets[offsets[v]:offsets[v + 1]]:
+            if not seen[w]:
+                seen[w] = 1
+                out.append(w)
+                queue.append((w, depth + 1))
+    return out
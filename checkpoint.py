@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from pathlib import Path
+
+# =========================================================
+# SCAN CHECKPOINTS
+# =========================================================
+# While main.py scans, every analyzed file is appended to a JSONL file:
+#
+#   {"header": {...}}                                   first line
+#   {"repo": ..., "file": ..., "stamp": [...], "metrics": {...}}
+#
+# The stamp identifies the analyzed content: [mtime_ns, size] for files
+# on disk (file_stamp), ["git", blob sha] for git objects.
+#
+# The running language / category / global totals are not stored: they
+# are rebuilt exactly by feeding the recorded metrics back through
+# add_file in the original order, so a resumed scan ends with the same
+# report as an uninterrupted one. Lines are flushed and fsync'ed every
+# FLUSH_EVERY files or FLUSH_SECONDS; a torn last line is ignored.
+
+FLUSH_EVERY = 200
+FLUSH_SECONDS = 30.0
+
+def file_stamp(path: Path):
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+class ScanCheckpoint:
+    def __init__(self, path: Path, header: dict, resume: bool = False):
+        self.path = Path(path)
+        self.header = header
+        self.done = {}          # (repo, relative) -> (stamp, metrics)
+        if resume:
+            self.done = self.load()
+            mode = "a" if self.done else "w"
+        else:
+            mode = "w"
+        self.f = open(self.path, mode)
+        if mode == "w":
+            self._write({"header": header})
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def load(self) -> dict:
+        done = {}
+        valid = 0           # bytes up to the last complete, parsable line
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return done
+        with f:
+            for i, line in enumerate(f):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    entry = json.loads(line)
+                except ValueError:
+                    break           # torn write at the crash point
+                if i == 0 and entry.get("header") != self.header:
+                    print(f"[checkpoint] {self.path.name} is from a different scan; starting over")
+                    return {}
+                if i > 0:
+                    done[(entry["repo"], entry["file"])] = (entry["stamp"], entry["metrics"])
+                valid += len(line)
+        # Drop the torn tail so appended lines start on a fresh line
+        os.truncate(self.path, valid)
+        print(f"[checkpoint] resuming with {len(done)} files already analyzed")
+        return done
+
+    def lookup(self, repo: str, relative: str, stamp):
+        """Recorded metrics for a file, unless its content changed since."""
+        hit = self.done.get((repo, relative))
+        if hit is None or hit[0] != stamp:
+            return None
+        return hit[1]
+
+    def record(self, repo: str, relative: str, stamp, metrics):
+        if stamp is None:
+            return
+        self._write({"repo": repo, "file": relative, "stamp": stamp, "metrics": metrics})
+        self.pending += 1
+        if self.pending >= FLUSH_EVERY or time.monotonic() - self.last_flush > FLUSH_SECONDS:
+            self.flush()
+
+    def _write(self, entry):
+        # One line per entry; a crash can only ever tear the last one
+        self.f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def flush(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self, finished: bool = False):
+        """Close the file; once the reports are written it is removed."""
+        self.flush()
+        self.f.close()
+        if finished:
+            self.path.unlink()
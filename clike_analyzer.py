@@ -0,0 +1,432 @@
+import re
+from collections import Counter
+
+# =========================================================
+# C / C++ / JAVASCRIPT / TYPESCRIPT LEXER
+# =========================================================
+# One regex scan per file. Comments, strings, template literals and
+# (for JS/TS) regex literals are consumed as single tokens, so braces
+# and keywords inside them never reach the block tracker.
+
+C_FAMILY = {"c", "cpp"}
+JS_FAMILY = {"javascript", "typescript"}
+
+COMMON_TOKENS = r"""
+    (?P<newline>\n)
+  | (?P<ws>[ \t\r\f\v]+)
+  | (?P<lcomment>//[^\n]*)
+  | (?P<bcomment>/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>"(?:\\[\s\S]|[^"\\\n])*"|'(?:\\[\s\S]|[^'\\\n])*')
+  | (?P<number>\.?\d[\w.']*)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<optq>\?(?=[ \t]*[:,)=]))
+  | (?P<op>::|->|=>|&&|\|\||\?\?|\?\.|==|!=|<=|>=|[{}()\[\];,=?:.~<>/])
+  | (?P<other>.)
+"""
+
+C_TOKEN_RE = re.compile(r"""
+    (?P<pre>^[ \t]*\#[^\n]*(?:\\\n[^\n]*)*)
+  | """ + COMMON_TOKENS, re.VERBOSE | re.MULTILINE)
+
+JS_TOKEN_RE = re.compile(r"""
+    (?P<template>`(?:\\[\s\S]|[^`\\])*`)
+  | """ + COMMON_TOKENS, re.VERBOSE | re.MULTILINE)
+
+JS_REGEX_RE = re.compile(r"/(?![*/])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n])+/[a-z]*")
+INCLUDE_RE = re.compile(r"#\s*include\s*([<\"])([^>\"]+)[>\"]")
+
+CONTROL = {"if", "for", "while", "switch", "catch", "with", "do", "else", "try", "finally"}
+BRANCHES = {"if", "for", "while", "case", "catch"}
+BRANCH_OPS = {"&&", "||", "?", "??"}
+MEMBER_OPS = {".", "::", "->", "?."}
+SCOPE_KEYWORDS = {"class", "struct", "union", "enum", "namespace", "interface", "extern"}
+NOT_CALLS = CONTROL | {
+    "return", "sizeof", "typeof", "alignof", "decltype", "new", "delete", "throw",
+    "function", "defined", "static_assert", "await", "async", "void", "in", "of", "case",
+}
+# Tokens after which "/" divides instead of starting a JS regex literal
+VALUE_END = {"name", "number", "string", ")", "]", "}"}
+
+C_STD_HEADERS = {
+    # C
+    "assert.h", "complex.h", "ctype.h", "errno.h", "fenv.h", "float.h", "inttypes.h",
+    "limits.h", "locale.h", "math.h", "setjmp.h", "signal.h", "stdarg.h", "stdbool.h",
+    "stddef.h", "stdint.h", "stdio.h", "stdlib.h", "string.h", "time.h", "wchar.h",
+    "wctype.h", "unistd.h", "pthread.h",
+    # C++
+    "algorithm", "any", "array", "atomic", "bitset", "cassert", "cctype", "cerrno",
+    "chrono", "cmath", "complex", "condition_variable", "cstddef", "cstdint", "cstdio",
+    "cstdlib", "cstring", "ctime", "deque", "exception", "filesystem", "fstream",
+    "functional", "future", "initializer_list", "iomanip", "ios", "iosfwd", "iostream",
+    "istream", "iterator", "limits", "list", "map", "memory", "mutex", "numeric",
+    "optional", "ostream", "queue", "random", "ratio", "regex", "set", "sstream", "stack",
+    "stdexcept", "string", "string_view", "thread", "tuple", "type_traits", "typeinfo",
+    "unordered_map", "unordered_set", "utility", "valarray", "variant", "vector",
+}
+NODE_BUILTINS = {
+    "assert", "buffer", "child_process", "crypto", "events", "fs", "http", "https", "net",
+    "os", "path", "process", "querystring", "readline", "stream", "url", "util", "zlib",
+    "worker_threads",
+}
+
+# =========================================================
+# HELPERS
+# =========================================================
+def js_module_name(spec: str) -> str:
+    """'lodash/fp' -> 'lodash', '@scope/pkg/x' -> '@scope/pkg', 'node:fs' -> 'fs'."""
+    if spec.startswith("node:"):
+        spec = spec[5:]
+    parts = spec.split("/")
+    if spec.startswith("@") and len(parts) > 1:
+        return "/".join(parts[:2])
+    return parts[0]
+
+def count_params(tokens) -> int:
+    """Number of parameters between a signature's outer parentheses."""
+    inner = [v for _, v in tokens[1:-1]]
+    if not inner or inner == ["void"]:
+        return 0
+    depth = 0
+    n_params = 1
+    for v in inner:
+        if v in ("(", "[", "{", "<"):
+            depth += 1
+        elif v in (")", "]", "}", ">"):
+            depth -= 1
+        elif v == "," and depth == 0:
+            n_params += 1
+    return n_params
+
+def matching_paren(values, open_):
+    depth = 0
+    for i in range(open_, len(values)):
+        if values[i] == "(":
+            depth += 1
+        elif values[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+def assigned_name(stmt, upto, default="<anonymous>"):
+    """Name an anonymous function takes from `name = ...` or `name: ...` before it."""
+    for i in range(upto - 1, 0, -1):
+        if stmt[i][1] in ("=", ":") and stmt[i - 1][0] == "name":
+            return stmt[i - 1][1]
+    return default
+
+def classify_block(stmt, language, in_function):
+    """
+    What a "{" opens, judged from the statement tokens before it:
+    ("function", name, paren_start, paren_end), ("scope",), ("control",)
+    or ("block",).
+    """
+    values = [v for _, v in stmt]
+    if not values:
+        return ("block",)
+
+    if values[-1] in CONTROL:
+        return ("control",)
+
+    if values[-1] == "=>":
+        return ("function", assigned_name(stmt, len(values) - 1, "<arrow>"), None, None)
+
+    # Function expressions: `function name(...)`, `x = function (...)`,
+    # callbacks `f(a, function (...) {`
+    if "function" in values:
+        fn = len(values) - 1 - values[::-1].index("function")
+        open_ = next((i for i in range(fn + 1, len(values)) if values[i] == "("), None)
+        close = matching_paren(values, open_) if open_ is not None else None
+        if close is not None:
+            if stmt[fn + 1][0] == "name" and fn + 1 < open_:
+                name = values[fn + 1]
+            else:
+                name = assigned_name(stmt, fn)
+            return ("function", name, open_, close)
+
+    # First top-level "(" of the statement
+    first = next((i for i, v in enumerate(values) if v == "("), None)
+    head = values[:first] if first is not None else values
+    if any(v in SCOPE_KEYWORDS for v in head) and "=" not in head:
+        return ("scope",)
+    if first is None:
+        return ("block",)
+
+    before = values[first - 1] if first > 0 else None
+    if before in CONTROL:
+        return ("control",)
+    if "=" in head:
+        return ("block",)
+    if language in C_FAMILY and in_function:
+        return ("block",)
+
+    close = matching_paren(values, first)
+    if close is None:
+        return ("block",)
+
+    if first == 0 or stmt[first - 1][0] != "name" or before in NOT_CALLS:
+        return ("block",)
+
+    # Qualified C++ names: A::b, ~A, operator stuff is left as is
+    start = first - 1
+    while start >= 2 and values[start - 1] == "::" and stmt[start - 2][0] == "name":
+        start -= 2
+    if start >= 1 and values[start - 1] == "~":
+        start -= 1
+    name = "".join(values[start:first])
+    return ("function", name, first, close)
+
+# =========================================================
+# ANALYSIS
+# =========================================================
+def analyze_clike_text(text: str, language: str) -> dict:
+    """
+    Lex C/C++ or JavaScript/TypeScript once and return function records
+    (function_index.FUNCTION_FIELDS rows), #include / import dependencies, call sites,
+    comment lines and branch-based complexity (1 + if/for/while/case/
+    catch + && || ?: ?? per function).
+    """
+    js = language in JS_FAMILY
+    token_re = JS_TOKEN_RE if js else C_TOKEN_RE
+
+    functions = []
+    num_classes = 0
+    # Open braces as (kind, function index or None, control depth)
+    stack = []
+    calls = []
+    imports = Counter()
+    local_imports = set()
+    comment_lines = set()
+    decision_points = 0
+
+    line = 1
+    parens = 0              # open "(" since the innermost block opened
+    saved_parens = []       # parens of the enclosing blocks, one per stack entry
+    stmt = []               # (kind, value) since the last ; { } at paren depth 0
+    stmt_calls = []         # (position in stmt, index into calls) for this statement
+    chain = []              # current a.b::c name chain
+    prev = None
+    expect_module = False   # next string is an import / require specifier
+    import_braces = 0       # `import { a, b } from` braces, not blocks
+    literal_braces = 0      # braces inside parentheses: `y = {}`, `{a, b}: Opts`, `f({k: 1})`
+    pending_arrow = None    # (name, line) of `=>` waiting for its body
+
+    def innermost_function():
+        for kind, idx, _ in reversed(stack):
+            if kind == "function":
+                return idx
+        return None
+
+    def add_decision():
+        nonlocal decision_points
+        decision_points += 1
+        fi = innermost_function()
+        if fi is not None:
+            functions[fi][4] += 1
+
+    def add_import(name, local):
+        imports[name] += 1
+        if local:
+            local_imports.add(name)
+
+    def reset_statement():
+        nonlocal stmt, stmt_calls, expect_module
+        stmt = []
+        stmt_calls = []
+        expect_module = False
+
+    pos = 0
+    n = len(text)
+    while pos < n:
+        m = token_re.match(text, pos)
+        kind = m.lastgroup
+        value = m.group()
+        pos = m.end()
+
+        if kind == "ws":
+            continue
+        if kind == "newline":
+            line += 1
+            continue
+        if kind in ("lcomment", "bcomment"):
+            end_line = line + value.count("\n")
+            comment_lines.update(range(line, end_line + 1))
+            line = end_line
+            continue
+        if kind == "pre":
+            inc = INCLUDE_RE.match(value.strip())
+            if inc:
+                add_import(inc.group(2), inc.group(1) == '"')
+            line += value.count("\n")
+            continue
+
+        if js and value == "/" and prev not in VALUE_END:
+            rm = JS_REGEX_RE.match(text, m.start())
+            if rm:
+                kind, value, pos = "string", rm.group(), rm.end()
+        if kind == "template":
+            line += value.count("\n")
+            kind = "string"
+
+        # An arrow function without braces: `x => x + 1`
+        if pending_arrow is not None and value != "{":
+            name, start = pending_arrow
+            functions.append([name, start, start, 1, 1, 0, 0])
+            pending_arrow = None
+
+        # ---- names and call chains ----
+        if kind == "name":
+            if prev in MEMBER_OPS and chain:
+                chain.append(prev)
+                chain.append(value)
+            else:
+                chain = [value]
+            if value in BRANCHES:
+                add_decision()
+            if js and value == "from" and stmt and stmt[0][1] in ("import", "export"):
+                expect_module = True
+            if js and value == "import" and not stmt:
+                expect_module = True
+
+        elif kind == "string":
+            if expect_module:
+                spec = value[1:-1]
+                local = spec.startswith(".") or spec.startswith("/")
+                add_import(spec if local else js_module_name(spec), local)
+                expect_module = False
+
+        elif value == "(":
+            parens += 1
+            if prev == "name" and chain and chain[-1] not in NOT_CALLS:
+                if js and chain[-1] in ("require", "import"):
+                    expect_module = True
+                stmt_calls.append((len(stmt) - 1, len(calls)))
+                calls.append("".join(chain))
+        elif value == ")":
+            parens = max(0, parens - 1)
+
+        elif value in BRANCH_OPS:
+            add_decision()
+
+        elif value == "=>":
+            pending_arrow = (assigned_name(stmt, len(stmt), "<arrow>"), line)
+
+        elif value == ";" and parens == 0:
+            # Declarations / prototypes at file or class scope are not calls
+            if not js and innermost_function() is None and "=" not in [v for _, v in stmt]:
+                for _, i in stmt_calls:
+                    calls[i] = None
+            reset_statement()
+            chain = []
+            prev = ";"
+            continue
+
+        elif value == "{":
+            in_function = innermost_function() is not None
+            block = None
+            if js and import_braces == 0 and stmt and stmt[0][1] in ("import", "export") \
+                    and not any(v in ("function", "class", "=", "=>", "default") for _, v in stmt):
+                import_braces += 1
+            elif import_braces:
+                import_braces += 1
+            elif literal_braces:
+                literal_braces += 1
+            elif parens > 0:
+                # Inside an open "(" only a callback body is a block:
+                # `f(function (x) {`, `f(x => {`; anything else belongs to
+                # the expression or to a signature that is not closed yet
+                block = classify_block(stmt, language, in_function)
+                if block[0] != "function":
+                    block = None
+                    literal_braces += 1
+            else:
+                block = classify_block(stmt, language, in_function)
+
+            if block is not None:
+                pending_arrow = None
+                depth = stack[-1][2] if stack else 0
+                if block[0] == "function":
+                    _, name, first, close = block
+                    n_args = count_params(stmt[first:close + 1]) if first is not None else 0
+                    functions.append([name, line, None, 0, 1, n_args, 0])
+                    stack.append(("function", len(functions) - 1, 0))
+                    # The signature (name, C++ member initialisers) is not a call site
+                    sig_start = first - 1 if first is not None else len(stmt)
+                    for at, i in stmt_calls:
+                        if at >= sig_start:
+                            calls[i] = None
+                elif block[0] == "control":
+                    stack.append(("control", None, depth + 1))
+                    fi = innermost_function()
+                    if fi is not None:
+                        functions[fi][6] = max(functions[fi][6], depth + 1)
+                else:
+                    if block[0] == "scope" and any(v in ("class", "struct") for _, v in stmt):
+                        num_classes += 1
+                    stack.append((block[0], None, depth if block[0] == "block" else 0))
+                saved_parens.append(parens)
+                parens = 0
+                reset_statement()
+                chain = []
+                prev = "{"
+                continue
+
+        elif value == "}":
+            if import_braces:
+                import_braces -= 1
+            elif literal_braces:
+                literal_braces -= 1
+            else:
+                if stack:
+                    k, idx, _ = stack.pop()
+                    if k == "function":
+                        functions[idx][2] = line
+                    parens = saved_parens.pop()
+                reset_statement()
+                chain = []
+                prev = "}"
+                continue
+
+        if kind != "name" and value not in MEMBER_OPS:
+            # Only a.b::c chains of names continue a call name
+            chain = []
+
+        stmt.append((kind, value))
+        prev = kind if kind in ("name", "number", "string") else value
+
+    if pending_arrow is not None:
+        name, start = pending_arrow
+        functions.append([name, start, start, 1, 1, 0, 0])
+
+    last_line = line - 1 if text.endswith("\n") else line
+    for f in functions:
+        if f[2] is None:
+            f[2] = last_line
+        f[3] = f[2] - f[1] + 1
+
+    if js:
+        std = {k: v for k, v in imports.items() if k in NODE_BUILTINS}
+    else:
+        std = {k: v for k, v in imports.items() if k in C_STD_HEADERS}
+    third_party = {k: v for k, v in imports.items() if k not in std and k not in local_imports}
+
+    cc_values = [f[4] for f in functions]
+    total_cc = float(sum(cc_values))
+    return {
+        "functions": functions,
+        "function_names": [f[0] for f in functions],
+        "num_classes": num_classes,
+        "function_calls": [c for c in calls if c is not None],
+        "imports": dict(imports),
+        "imports_third_party": third_party,
+        "imports_local": {k: v for k, v in imports.items() if k in local_imports},
+        "num_comments": len(comment_lines),
+        "decision_points": decision_points,
+        "complexity": {
+            "avg_cc": total_cc / len(cc_values) if cc_values else 0.0,
+            "max_cc": float(max(cc_values)) if cc_values else 0.0,
+            "total_cc": total_cc,
+            "num_entities": len(cc_values),
+            "cc_values": cc_values,
+        },
+    }
@@ -0,0 +1,229 @@
+import base64
+import hashlib
+import keyword
+import re
+import struct
+from collections import defaultdict
+
+# =========================================================
+# NEAR-DUPLICATE CODE (MINHASH + LSH)
+# =========================================================
+# During the scan every code file (and every Python function) gets a
+# MinHash signature of its normalized token shingles:
+#
+#   tokens     comments dropped; identifiers -> "v" unless keywords,
+#              numbers -> "0", strings -> "s"; operators kept
+#   shingles   SHINGLE consecutive tokens, hashed to 64 bits
+#   signature  one-permutation MinHash: the 64-bit hash picks one of
+#              NUM_BINS bins and each bin keeps its minimum; empty bins
+#              borrow from the next filled one (densification)
+#
+# so a file costs one hash per token instead of one per token and
+# permutation. The fraction of equal bins estimates the Jaccard
+# similarity of two shingle sets.
+#
+# build_clone_section puts the signatures into BANDS x ROWS LSH buckets;
+# only members of a shared bucket are compared (each with the bucket's
+# first member), so the work is linear in the number of signatures.
+# Pairs at or above SIMILARITY are joined into clusters (union-find).
+
+SHINGLE = 5
+NUM_BINS = 64
+BANDS = 16
+ROWS = NUM_BINS // BANDS
+SIMILARITY = 0.8
+MIN_TOKENS = 50            # smaller files / functions are too generic to compare
+
+CLONE_LANGUAGES = {"python", "jupyter", "matlab", "c", "cpp", "javascript", "typescript", "shell"}
+
+COMMENT_PATTERNS = {
+    "python": r"\#[^\n]*",
+    "jupyter": r"\#[^\n]*",
+    "shell": r"\#[^\n]*",
+    "matlab": r"%[^\n]*",
+}
+C_COMMENTS = r"//[^\n]*|/\*[\s\S]*?\*/"
+
+KEYWORDS = set(keyword.kwlist) | {
+    "function", "end", "var", "let", "const", "switch", "case", "default", "do",
+    "new", "delete", "this", "typeof", "instanceof", "catch", "throw", "void",
+    "struct", "enum", "public", "private", "protected", "static", "elseif", "otherwise",
+    "then", "fi", "done", "esac", "local", "export",
+}
+
+MASK64 = (1 << 64) - 1
+VALUE_BITS = 58            # low bits of the hash: value; high 6 bits: bin
+
+def token_pattern(lang: str):
+    comments = COMMENT_PATTERNS.get(lang, C_COMMENTS)
+    return re.compile(
+        r'(?P<c>' + comments + r')'
+        r'|(?P<s>"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')'
+        r'|(?P<n>\d[\w.]*)'
+        r'|(?P<i>[A-Za-z_]\w*)'
+        r'|(?P<o>[^\s\w])'
+    )
+
+_patterns = {}
+_token_ids = {}
+
+def normalized_tokens(text: str, lang: str):
+    pattern = _patterns.get(lang)
+    if pattern is None:
+        pattern = _patterns[lang] = token_pattern(lang)
+    tokens = []
+    for m in pattern.finditer(text):
+        kind = m.lastgroup
+        if kind == "c":
+            continue
+        if kind == "s":
+            tokens.append("s")
+        elif kind == "n":
+            tokens.append("0")
+        elif kind == "i":
+            word = m.group()
+            tokens.append(word if word in KEYWORDS else "v")
+        else:
+            tokens.append(m.group())
+    return tokens
+
+def token_id(token: str) -> int:
+    tid = _token_ids.get(token)
+    if tid is None:
+        # Deterministic across processes (unlike hash())
+        tid = _token_ids[token] = int.from_bytes(
+            hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+    return tid
+
+def mix64(x: int) -> int:
+    """splitmix64 finalizer."""
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+    return x ^ (x >> 31)
+
+# ---------------------------------------------------------
+# SIGNATURES
+# ---------------------------------------------------------
+def minhash(tokens):
+    """One-permutation MinHash of the token shingles, as NUM_BINS 32-bit ints (or None)."""
+    if len(tokens) < max(MIN_TOKENS, SHINGLE):
+        return None
+    ids = [token_id(t) for t in tokens]
+    bins = [None] * NUM_BINS
+    value_mask = (1 << VALUE_BITS) - 1
+    for i in range(len(ids) - SHINGLE + 1):
+        h = 0
+        for tid in ids[i:i + SHINGLE]:
+            h = (h * 0x100000001B3 ^ tid) & MASK64
+        h = mix64(h)
+        b = h >> VALUE_BITS
+        v = h & value_mask
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+
+    sig = []
+    for b in range(NUM_BINS):
+        if bins[b] is not None:
+            sig.append(bins[b] >> (VALUE_BITS - 32))
+            continue
+        # Densify: an empty bin takes the next filled bin's value, mixed with the distance
+        d = 1
+        while bins[(b + d) % NUM_BINS] is None:
+            d += 1
+        sig.append(mix64(bins[(b + d) % NUM_BINS] + d) >> 32)
+    return sig
+
+def encode_signature(sig) -> str:
+    return base64.b64encode(struct.pack(f"<{NUM_BINS}I", *sig)).decode()
+
+def decode_signature(s: str):
+    return struct.unpack(f"<{NUM_BINS}I", base64.b64decode(s))
+
+def text_signature(text: str, lang: str):
+    """Encoded signature of a source text, or None if it is not compared."""
+    if lang not in CLONE_LANGUAGES:
+        return None
+    sig = minhash(normalized_tokens(text, lang))
+    return encode_signature(sig) if sig else None
+
+def function_signatures(lines, records, lang: str = "python"):
+    """[[row in records, signature], ...] for functions with enough tokens."""
+    out = []
+    for row, rec in enumerate(records):
+        start, end = rec[1], rec[2]
+        sig = text_signature("\n".join(lines[start - 1:end]), lang)
+        if sig:
+            out.append([row, sig])
+    return out
+
+# ---------------------------------------------------------
+# LSH CLUSTERS
+# ---------------------------------------------------------
+def similarity(a, b) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_BINS
+
+def find_clusters(signatures, threshold: float = SIMILARITY):
+    """signatures: list of decoded signatures. Returns clusters as lists of indices."""
+    parent = list(range(len(signatures)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets = defaultdict(list)
+    for i, sig in enumerate(signatures):
+        for band in range(BANDS):
+            buckets[(band, sig[band * ROWS:(band + 1) * ROWS])].append(i)
+
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        rep = members[0]
+        for j in members[1:]:
+            a, b = find(rep), find(j)
+            if a != b and similarity(signatures[rep], signatures[j]) >= threshold:
+                parent[b] = a
+
+    groups = defaultdict(list)
+    for i in range(len(signatures)):
+        groups[find(i)].append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+def describe_clusters(items, signatures, threshold: float = SIMILARITY):
+    """items[i] is the JSON description of signatures[i]."""
+    clusters = []
+    for members in find_clusters(signatures, threshold):
+        first = signatures[members[0]]
+        clusters.append({
+            "size": len(members),
+            "min_similarity": min(similarity(first, signatures[i]) for i in members[1:]),
+            "members": [items[i] for i in members],
+        })
+    clusters.sort(key=lambda c: (-c["size"], -c["min_similarity"]))
+    return clusters
+
+def build_clone_section(repos: dict, threshold: float = SIMILARITY) -> dict:
+    """The report's `_clones` section: clusters of similar files and Python functions."""
+    file_items, file_sigs = [], []
+    func_items, func_sigs = [], []
+    for repo_name, entry in repos.items():
+        for relative, metrics in entry["files"].items():
+            if metrics.get("minhash"):
+                file_items.append({"repo": repo_name, "file": relative, "loc": metrics["loc"]})
+                file_sigs.append(decode_signature(metrics["minhash"]))
+            functions = metrics.get("functions", [])
+            for row, sig in metrics.get("function_minhash", []):
+                rec = functions[row]
+                func_items.append({"repo": repo_name, "file": relative, "function": rec[0],
+                                   "line": rec[1], "length": rec[3]})
+                func_sigs.append(decode_signature(sig))
+    return {
+        "params": {"shingle": SHINGLE, "bins": NUM_BINS, "bands": BANDS,
+                   "threshold": threshold, "min_tokens": MIN_TOKENS},
+        "num_files": len(file_sigs),
+        "num_functions": len(func_sigs),
+        "files": describe_clusters(file_items, file_sigs, threshold),
+        "functions": describe_clusters(func_items, func_sigs, threshold),
+    }
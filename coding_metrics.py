@@ -1,18 +1,24 @@
-import json
 from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
+from techniques import TECHNIQUES
+from data_index import update_line_index
+from report_io import load_report
+from config import load_config
+
 # =========================================================
 # PATHS
 # =========================================================
-BASE = Path("/Users/acalapai/Desktop/CodeAnalysis")
-RESULTS = BASE / "results"
+CONFIG = load_config()   # metacode.json (see config.py)
+BASE = CONFIG["base"]
+RESULTS = CONFIG["results_dir"]
 ANALYSIS = RESULTS / "analysis.json"
 
-PRIVATE_DATA = Path("/Users/acalapai/Desktop/CodeAnalysis/private_data")
-REPOS_DIR = BASE / "repos"  # used for technique keyword scan
+PRIVATE_DATA = CONFIG["private_data"]
+REPOS_DIR = BASE / "repos"  # reports without repo paths: used for excluded-CSV line counts
+PRIVATE_DATA_INDEX = RESULTS / "private_data_index.json"
 
 RESULTS.mkdir(exist_ok=True)
 
@@ -32,11 +38,15 @@ def should_exclude_file(path: Path) -> bool:
         return True
     return False
 
+def repo_file(repo_name: str, repo_data: dict, rel_path: str) -> Path:
+    """A reported file on disk; main.py records where each repo was found."""
+    folder = Path(repo_data["path"]) if "path" in repo_data else REPOS_DIR / repo_name
+    return folder / rel_path
+
 # =========================================================
 # LOAD analysis.json
 # =========================================================
-with open(ANALYSIS, "r") as f:
-    data = json.load(f)
+data = load_report(ANALYSIS)   # also reads analysis.json.gz / .zst
 
 languages = data.get("_languages", {})
 categories = data.get("_categories", {})
@@ -163,7 +173,7 @@ for repo_name, repo_data in data.items():
         continue
 
     for rel_path in repo_data["files"].keys():
-        fp = REPOS_DIR / repo_name / rel_path
+        fp = repo_file(repo_name, repo_data, rel_path)
 
         if not fp.is_file():
             continue
@@ -183,23 +193,16 @@ if ".csv" in data_lines:
 # ---------------------------------------------------------
 # ADD PRIVATE DATA (but exclude MV or _exclude)
 # ---------------------------------------------------------
+# Line counts are cached in PRIVATE_DATA_INDEX keyed by (size, mtime),
+# so only new or modified data files are read on each run.
 if PRIVATE_DATA.exists():
-    for p in PRIVATE_DATA.rglob("*"):
-        if should_exclude_file(p):
-            continue
-        if not p.is_file():
-            continue
-        ext = p.suffix.lower()
-        if ext not in DATA_EXT:
-            continue
-
-        try:
-            n_lines = sum(1 for _ in p.open("r", errors="ignore"))
-        except:
-            n_lines = 0
+    index = update_line_index(PRIVATE_DATA, PRIVATE_DATA_INDEX, DATA_EXT,
+                              exclude=should_exclude_file)
 
+    for rel_path, entry in index.items():
+        ext = Path(rel_path).suffix.lower()
         data_lines.setdefault(ext, 0)
-        data_lines[ext] += n_lines
+        data_lines[ext] += entry["lines"]
 
 # ---------------------------------------------------------
 # DONUT PLOT
@@ -245,68 +248,22 @@ else:
 # =========================================================
 # PANEL 3 — TECHNIQUES
 # =========================================================
-TECHNIQUES = {
-    "Machine learning / deep learning": {
-        "imports": ["tensorflow", "keras", "torch", "sklearn", "xgboost", "lightgbm", "catboost"],
-        "keywords": ["neural", "cnn", "rnn", "lstm", "transformer", "classifier", "regressor", "deep learning"],
-    },
-    "Computer vision / pose": {
-        "imports": ["cv2", "mmpose", "mediapipe", "torchvision", "ultralytics", "yolov5", "yolov8"],
-        "keywords": ["pose", "keypoint", "bounding box", "segmentation"],
-    },
-    "Statistics / GLM / inference": {
-        "imports": ["statsmodels", "pymc", "scipy", "pingouin"],
-        "keywords": ["glm", "regression", "anova", "bayesian"],
-    },
-    "Time-series / signal processing": {
-        "imports": ["scipy.signal", "mne", "neurokit2"],
-        "keywords": ["fft", "spectral", "filter", "bandpass"],
-    },
-    "Data visualization / plots": {
-        "imports": ["matplotlib", "seaborn", "plotly"],
-        "keywords": ["heatmap", "scatter", "boxplot"],
-    },
-}
-
-for spec in TECHNIQUES.values():
-    spec["keywords"] = [k.lower() for k in spec["keywords"]]
-
-def classify_file(repo_name, rel_path, metrics):
-    tech_found = set()
-    imports = metrics.get("imports", {}) or {}
-
-    text = ""
-    try:
-        fp = REPOS_DIR / repo_name / rel_path
-        if fp.is_file() and not should_exclude_file(fp):
-            text = fp.read_text(errors="ignore")
-    except:
-        pass
-
-    t = text.lower()
-
-    for tech, info in TECHNIQUES.items():
-        imp_hit = any(im in imports for im in info["imports"])
-        key_hit = any(kw in t for kw in info["keywords"])
-        if imp_hit or key_hit:
-            tech_found.add(tech)
-
-    return tech_found
-
-tech_counts = {k: 0 for k in TECHNIQUES.keys()}
+# Technique tags are computed by main.py during the scan and stored
+# per file under "techniques"; this panel only aggregates them.
+tech_names = data.get("_techniques") or list(TECHNIQUES.keys())
+tech_counts = {k: 0 for k in tech_names}
 
 for repo_name, repo_data in data.items():
     if repo_name.startswith("_"):
         continue
 
     for rel_path, metrics in repo_data["files"].items():
-        fp = REPOS_DIR / repo_name / rel_path
+        fp = repo_file(repo_name, repo_data, rel_path)
         if should_exclude_file(fp):
             continue
 
-        techs = classify_file(repo_name, rel_path, metrics)
-        for t in techs:
-            tech_counts[t] += 1
+        for t in metrics.get("techniques", []):
+            tech_counts[t] = tech_counts.get(t, 0) + 1
 
 tech_counts = {k: v for k, v in tech_counts.items() if v > 0}
 
@@ -0,0 +1,90 @@
+import json
+import os
+from pathlib import Path
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+# All paths come from one JSON file, metacode.json next to the scripts
+# (or the file named by $METACODE_CONFIG):
+#
+#   {
+#     "base": "/Users/acalapai/Desktop/CodeAnalysis",
+#     "results_dir": "results",            relative to base
+#     "private_data": "private_data",      relative to base
+#     "techniques": "techniques.json",     relative to base (techniques.py)
+#     "roots": [
+#       {"path": "~/code", "max_readers": 16},
+#       {"path": "/Volumes/lab-share/code", "name": "share",
+#        "exclude": ["raw_data"], "max_readers": 4},
+#       {"path": "~/Library/Mobile Documents/com~apple~CloudDocs/GitHub",
+#        "name": "icloud", "max_readers": 2}
+#     ]
+#   }
+#
+# Every root is a folder of repositories. `exclude` adds directory names
+# to EXCLUDE_DIRS for that root only; `max_readers` caps how many batches
+# of that root are read at the same time (null = only --workers), so a
+# local SSD can use every worker while a network share or a synced cloud
+# drive is not flooded with parallel reads. Without the file, the
+# defaults below are used.
+
+CONFIG_ENV = "METACODE_CONFIG"
+CONFIG_FILE = Path(__file__).resolve().parent / "metacode.json"
+
+DEFAULT_CONFIG = {
+    "base": "/Users/acalapai/Desktop/CodeAnalysis",
+    "results_dir": "results",
+    "private_data": "private_data",
+    "techniques": "techniques.json",
+    "roots": [
+        {"path": "/Users/acalapai/Library/Mobile Documents/com~apple~CloudDocs/GitHub",
+         "name": "icloud"},
+    ],
+}
+
+def config_path() -> Path:
+    return Path(os.environ.get(CONFIG_ENV) or CONFIG_FILE)
+
+def resolve(path, base: Path) -> Path:
+    path = Path(path).expanduser()
+    return path if path.is_absolute() else base / path
+
+def make_root(path, name: str = None, exclude=(), max_readers: int = None) -> dict:
+    path = Path(path).expanduser()
+    if max_readers is not None and (not isinstance(max_readers, int) or max_readers < 1):
+        raise ValueError(f"root {path}: max_readers must be a positive integer or null")
+    return {
+        "path": path,
+        "name": name or path.name,
+        "exclude": set(exclude),
+        "max_readers": max_readers,
+    }
+
+def load_config(path: Path = None) -> dict:
+    """
+    The configuration from `path` (default: config_path()), with every
+    directory resolved to a Path. Missing keys fall back to
+    DEFAULT_CONFIG.
+    """
+    path = Path(path) if path is not None else config_path()
+    spec = dict(DEFAULT_CONFIG)
+    if path.is_file():
+        with open(path, "r") as f:
+            spec.update(json.load(f))
+
+    base = Path(spec["base"]).expanduser()
+    roots = [make_root(**r) for r in spec["roots"]]
+    if not roots:
+        raise ValueError(f"{path}: no scan roots configured")
+    names = [r["name"] for r in roots]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: root names must be unique, got {names}")
+
+    return {
+        "base": base,
+        "results_dir": resolve(spec["results_dir"], base),
+        "private_data": resolve(spec["private_data"], base),
+        "techniques": resolve(spec["techniques"], base),
+        "roots": roots,
+    }
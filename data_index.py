@@ -0,0 +1,92 @@
+import json
+import os
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================================================
+# CONFIG
+# =========================================================
+CHUNK_SIZE = 1 << 20   # bytes read per chunk when counting lines
+MAX_WORKERS = 8        # parallel readers for new / modified files
+
+# =========================================================
+# STREAMING LINE COUNTER
+# =========================================================
+def count_lines(path: Path, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Count lines by scanning raw bytes for newlines, chunk by chunk.
+    Matches `sum(1 for _ in open(path))`: a final line without a
+    trailing newline still counts.
+    """
+    n_lines = 0
+    last = b""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                n_lines += chunk.count(b"\n")
+                last = chunk[-1:]
+    except OSError:
+        return 0
+
+    if last and last != b"\n":
+        n_lines += 1
+    return n_lines
+
+# =========================================================
+# PERSISTENT INDEX
+# =========================================================
+def load_index(index_path: Path) -> dict:
+    try:
+        with open(index_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_index(index: dict, index_path: Path):
+    tmp = Path(str(index_path) + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, index_path)
+
+def update_line_index(root: Path, index_path: Path, extensions, exclude=None,
+                      max_workers: int = MAX_WORKERS) -> dict:
+    """
+    Bring the (path, size, mtime) -> line count index for `root` up to date.
+
+    Only files whose size or mtime changed since the last run are read;
+    deleted files are dropped from the index. Returns the index as
+    {relative_path: {"size", "mtime", "lines"}}.
+    """
+    old = load_index(index_path)
+    index = {}
+    todo = []
+
+    for p in root.rglob("*"):
+        if exclude is not None and exclude(p):
+            continue
+        if p.suffix.lower() not in extensions or not p.is_file():
+            continue
+
+        st = p.stat()
+        rel = str(p.relative_to(root))
+        entry = old.get(rel)
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+            index[rel] = entry
+        else:
+            index[rel] = {"size": st.st_size, "mtime": st.st_mtime, "lines": 0}
+            todo.append(rel)
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            counts = pool.map(lambda rel: count_lines(root / rel), todo)
+            for rel, n_lines in zip(todo, counts):
+                index[rel]["lines"] = n_lines
+
+    if todo or len(index) != len(old):
+        save_index(index, index_path)
+
+    print(f"[data_index] {len(index)} files indexed, {len(todo)} (re)counted")
+    return index
@@ -0,0 +1,205 @@
+import math
+from bisect import bisect_right
+from collections import Counter, defaultdict
+
+# =========================================================
+# MERGEABLE DISTRIBUTION SUMMARIES
+# =========================================================
+# Histograms of per-file and per-function metrics are built while
+# main.py aggregates, so dashboards can draw them from the report's
+# `_distributions` section instead of walking every file:
+#
+#   _distributions
+#     global / languages/<lang> / repos/<repo>
+#       loc_per_file, cc_per_function, functions_per_file, calls_per_file
+#         count, sum, mean, min, max
+#         histogram   {edges, counts}   fixed buckets, edges[i] <= x < edges[i+1]
+#         quantiles   {p50, p90, p95, p99}
+#         sketch      log-spaced buckets (relative error RELATIVE_ACCURACY)
+#
+# Every part is a count per bucket, so two summaries merge by adding
+# them (Distribution.merge / from_dict) and a file can be taken out
+# again (sign=-1, as in watch mode). Only min/max cannot be undone
+# exactly: after removing an extreme value they fall back to the sketch.
+
+RELATIVE_ACCURACY = 0.01
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+BUCKETS = {
+    "loc_per_file": (0, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+    # Radon ranks: A 1-5, B 6-10, C 11-20, D 21-30, E 31-40, F 41+
+    "cc_per_function": (0, 1, 2, 3, 4, 5, 6, 11, 21, 31, 41),
+    "functions_per_file": (0, 1, 2, 5, 10, 20, 50, 100, 200),
+    "calls_per_file": (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000),
+}
+
+def distribution_values(metrics):
+    """The values one file contributes to each summary."""
+    return {
+        "loc_per_file": (metrics["loc"],),
+        # Complexity column of the function records (function_index.FUNCTION_FIELDS),
+        # which every analyzer fills; radon's cc_values are absent without radon
+        "cc_per_function": [r[4] for r in metrics.get("functions", [])],
+        "functions_per_file": (metrics["num_functions"],),
+        "calls_per_file": (len(metrics["function_calls"]),),
+    }
+
+class Distribution:
+    def __init__(self, edges, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.edges = tuple(edges)
+        self.counts = [0] * len(self.edges)     # values below edges[0] go to bucket 0
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.zeros = 0                          # sketch bucket for values <= 0
+        self.bins = Counter()                   # sketch: key -> count
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    # ---------------------------------------------------------
+    # UPDATE / MERGE
+    # ---------------------------------------------------------
+    def key(self, value) -> int:
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def value_of(self, key: int) -> float:
+        """Representative value of a sketch bucket (within the relative error)."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def bucket(self, value) -> int:
+        return max(0, bisect_right(self.edges, value) - 1)
+
+    def add(self, value, sign: int = 1):
+        self.counts[self.bucket(value)] += sign
+        if value > 0:
+            k = self.key(value)
+            self.bins[k] += sign
+            if self.bins[k] <= 0:
+                del self.bins[k]
+        else:
+            self.zeros += sign
+        self.count += sign
+        self.sum += sign * value
+
+        if sign > 0:
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+        elif self.count <= 0:
+            self.min = self.max = None
+        elif not self.occupied(value):
+            # The last value in an extreme bucket went; fall back to the sketch
+            low, high = self.sketch_extremes()
+            if value == self.min:
+                self.min = low
+            if value == self.max:
+                self.max = high
+
+    def merge(self, other: "Distribution"):
+        if other.edges != self.edges or other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge distributions with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.zeros += other.zeros
+        self.bins.update(other.bins)
+        self.count += other.count
+        self.sum += other.sum
+        for bound, pick in (("min", min), ("max", max)):
+            values = [v for v in (getattr(self, bound), getattr(other, bound)) if v is not None]
+            setattr(self, bound, pick(values) if values else None)
+        return self
+
+    def occupied(self, value) -> bool:
+        return self.zeros > 0 if value <= 0 else self.bins.get(self.key(value), 0) > 0
+
+    def sketch_extremes(self):
+        keys = sorted(self.bins)
+        low = 0 if self.zeros else self.value_of(keys[0])
+        high = self.value_of(keys[-1]) if keys else 0
+        return low, high
+
+    # ---------------------------------------------------------
+    # QUERIES
+    # ---------------------------------------------------------
+    def quantile(self, q: float):
+        if self.count <= 0:
+            return 0
+        rank = round(q * (self.count - 1))     # nearest rank, as scheduler.percentile
+        seen = self.zeros
+        if seen > rank:
+            return 0
+        value = self.max
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if seen > rank:
+                value = self.value_of(k)
+                break
+        # The sketch value may overshoot the exact extremes
+        return min(max(value, self.min), self.max)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "histogram": {"edges": list(self.edges), "counts": list(self.counts)},
+            "quantiles": {f"p{round(q * 100)}": self.quantile(q) for q in QUANTILES},
+            "sketch": {
+                "relative_accuracy": self.relative_accuracy,
+                "zeros": self.zeros,
+                "bins": sorted(self.bins.items()),
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Distribution":
+        """Rebuild a summary from the report, e.g. to merge several reports."""
+        dist = cls(d["histogram"]["edges"], d["sketch"]["relative_accuracy"])
+        dist.counts = list(d["histogram"]["counts"])
+        dist.zeros = d["sketch"]["zeros"]
+        dist.bins = Counter({k: c for k, c in d["sketch"]["bins"]})
+        dist.count = d["count"]
+        dist.sum = d["sum"]
+        dist.min = d["min"]
+        dist.max = d["max"]
+        return dist
+
+# ---------------------------------------------------------
+# ONE SET PER SCOPE
+# ---------------------------------------------------------
+def new_distributions():
+    return {metric: Distribution(edges) for metric, edges in BUCKETS.items()}
+
+def new_distribution_totals():
+    return {"global": new_distributions(), "languages": defaultdict(new_distributions)}
+
+def add_distributions(scopes, metrics, sign: int = 1):
+    """Add one file's values to every summary set in `scopes`."""
+    for metric, values in distribution_values(metrics).items():
+        for dists in scopes:
+            dist = dists[metric]
+            for value in values:
+                dist.add(value, sign)
+
+def distributions_to_dict(dists: dict) -> dict:
+    return {metric: dist.to_dict() for metric, dist in dists.items()}
+
+def build_distribution_section(totals: dict, repos: dict) -> dict:
+    """The report's `_distributions` section; empty scopes are left out."""
+    def nonempty(dists):
+        return dists["loc_per_file"].count > 0
+
+    dist_totals = totals["distributions"]
+    return {
+        "global": distributions_to_dict(dist_totals["global"]),
+        "languages": {
+            lang: distributions_to_dict(d)
+            for lang, d in sorted(dist_totals["languages"].items()) if nonempty(d)
+        },
+        "repos": {
+            name: distributions_to_dict(entry["distributions"])
+            for name, entry in repos.items() if nonempty(entry["distributions"])
+        },
+    }
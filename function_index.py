@@ -0,0 +1,147 @@
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+# =========================================================
+# FUNCTION INDEX
+# =========================================================
+# Column-oriented table of every function record in the report
+# (columns as in FUNCTION_FIELDS below). Repos and files are stored once
+# and referenced by integer id; rows are pre-sorted by complexity
+# (descending) so "top N most complex" is a slice.
+#
+#   {
+#     "repos":   [repo, ...],
+#     "files":   [[repo_id, rel_path], ...],
+#     "columns": {"file": [...], "name": [...], "start": [...], ...},
+#   }
+
+FUNCTION_FIELDS = ["name", "start", "end", "length", "complexity", "num_args", "nesting"]
+NUMERIC_FIELDS = FUNCTION_FIELDS[1:]
+
+def build_function_index(report) -> dict:
+    repos = []
+    files = []
+    rows = []
+
+    for repo_name, repo_data in report.items():
+        if repo_name.startswith("_"):
+            continue
+        repo_id = len(repos)
+        repos.append(repo_name)
+
+        for rel_path, metrics in repo_data["files"].items():
+            records = metrics.get("functions")
+            if not records:
+                continue
+            file_id = len(files)
+            files.append([repo_id, rel_path])
+            rows.extend((file_id, *r) for r in records)
+
+    # complexity is column 5 of a row (file id first); ties broken by length
+    rows.sort(key=lambda r: (-r[5], -r[4]))
+
+    columns = {"file": [r[0] for r in rows]}
+    for i, field in enumerate(FUNCTION_FIELDS, start=1):
+        columns[field] = [r[i] for r in rows]
+
+    return {"repos": repos, "files": files, "columns": columns}
+
+def write_function_index(index, path: Path):
+    with open(path, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+def load_function_index(path: Path) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+# =========================================================
+# DUPLICATE FUNCTIONS
+# =========================================================
+# Python functions grouped by their structural hash (function_hash in
+# main.py, stored per file as "function_hashes"): the same body up to
+# renamed identifiers and changed constants, whatever the function is
+# called. One pass over the report; only hashes seen at least twice are
+# kept, largest first by duplicated lines (count x length).
+#
+#   {
+#     "num_hashed": n,
+#     "groups": [{"hash": ..., "count": 3, "num_repos": 2, "length": 14,
+#                 "functions": [[repo, rel_path, name, start], ...]}, ...],
+#   }
+
+def build_duplicate_index(report, min_count: int = 2) -> dict:
+    groups = defaultdict(list)
+    num_hashed = 0
+    for repo_name, repo_data in report.items():
+        if repo_name.startswith("_"):
+            continue
+        for rel_path, metrics in repo_data["files"].items():
+            hashes = metrics.get("function_hashes")
+            if not hashes:
+                continue
+            for record, h in zip(metrics["functions"], hashes):
+                if h is not None:
+                    num_hashed += 1
+                    groups[h].append((repo_name, rel_path, record))
+
+    out = []
+    for h, members in groups.items():
+        if len(members) < min_count:
+            continue
+        out.append({
+            "hash": h,
+            "count": len(members),
+            "num_repos": len({repo for repo, _, _ in members}),
+            "length": min(record[3] for _, _, record in members),
+            "functions": [[repo, rel_path, record[0], record[1]]
+                          for repo, rel_path, record in members],
+        })
+    out.sort(key=lambda g: (-g["count"] * g["length"], g["hash"]))
+    return {"num_hashed": num_hashed, "groups": out}
+
+def duplicates_in_repo(duplicates, repo: str, n: int = 20):
+    """Groups with at least one function in `repo`."""
+    out = []
+    for group in duplicates["groups"]:
+        if any(f[0] == repo for f in group["functions"]):
+            out.append(group)
+            if len(out) == n:
+                break
+    return out
+
+# =========================================================
+# QUERIES
+# =========================================================
+def num_functions(index) -> int:
+    return len(index["columns"]["file"])
+
+def row(index, i) -> dict:
+    cols = index["columns"]
+    repo_id, rel_path = index["files"][cols["file"][i]]
+    out = {"repo": index["repos"][repo_id], "file": rel_path}
+    out.update({field: cols[field][i] for field in FUNCTION_FIELDS})
+    return out
+
+def top_complex(index, n: int = 20, repo: str = None):
+    """The n most complex functions, optionally restricted to one repo."""
+    if repo is None:
+        return [row(index, i) for i in range(min(n, num_functions(index)))]
+
+    if repo not in index["repos"]:
+        return []
+    repo_id = index["repos"].index(repo)
+    files = index["files"]
+    out = []
+    for i, file_id in enumerate(index["columns"]["file"]):
+        if files[file_id][0] == repo_id:
+            out.append(row(index, i))
+            if len(out) == n:
+                break
+    return out
+
+def distribution(index, field: str = "complexity") -> dict:
+    """Exact value -> count histogram for a numeric column."""
+    if field not in NUMERIC_FIELDS:
+        raise KeyError(field)
+    return dict(sorted(Counter(index["columns"][field]).items()))
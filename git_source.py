@@ -0,0 +1,121 @@
+import atexit
+import os
+import subprocess
+from pathlib import Path, PurePosixPath
+
+# =========================================================
+# GIT OBJECT-STORAGE SOURCE
+# =========================================================
+# Bare clones (and, on request, ordinary clones) are analyzed without a
+# checkout: `git ls-tree` lists the files of one commit, and blob
+# contents are read through one long-running `git cat-file --batch`
+# process per repository (per worker process), so there is no fork per
+# file and nothing is written to disk.
+
+GIT = "git"
+DEFAULT_REV = "HEAD"
+
+def is_bare_repo(path: Path) -> bool:
+    return (path / "HEAD").is_file() and (path / "objects").is_dir() and (path / "refs").is_dir()
+
+def git_dir_of(path: Path):
+    """The git directory of a bare repo or a working tree, else None."""
+    if is_bare_repo(path):
+        return path
+    if is_bare_repo(path / ".git"):
+        return path / ".git"
+    return None
+
+def repo_name_of(path: Path) -> str:
+    """Bare clones are usually named Foo.git; report them as Foo."""
+    return path.name[:-4] if path.name.endswith(".git") and len(path.name) > 4 else path.name
+
+# ---------------------------------------------------------
+# TREE LISTING
+# ---------------------------------------------------------
+def list_tree(git_dir: Path, rev: str = DEFAULT_REV):
+    """
+    Yield (PurePosixPath, blob sha, size) for every regular file in
+    `rev`. Symlinks and submodules are left out.
+    """
+    out = subprocess.run(
+        [GIT, "--git-dir", str(git_dir), "ls-tree", "-r", "-z", "--long", "--full-tree", rev],
+        check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    ).stdout
+    for record in out.split(b"\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition(b"\t")
+        mode, kind, sha, size = meta.split()
+        if kind != b"blob" or mode == b"120000":
+            continue
+        yield (PurePosixPath(path.decode("utf-8", errors="surrogateescape")),
+               sha.decode(), int(size))
+
+# ---------------------------------------------------------
+# BLOB READER
+# ---------------------------------------------------------
+class BlobReader:
+    """One `git cat-file --batch` process; read(sha) returns the blob bytes."""
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = Path(git_dir)
+        self.proc = subprocess.Popen(
+            [GIT, "--git-dir", str(self.git_dir), "cat-file", "--batch"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+
+    def read(self, sha: str) -> bytes:
+        """Raises KeyError for a missing object, EOFError / BrokenPipeError if git died."""
+        self.proc.stdin.write(sha.encode() + b"\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline()
+        if not line:
+            raise EOFError(f"git cat-file for {self.git_dir} exited")
+        header = line.split()
+        if len(header) != 3:
+            # "<sha> missing"
+            raise KeyError(f"{sha} not found in {self.git_dir}")
+        size = int(header[2])
+        data = self.proc.stdout.read(size)
+        if len(data) < size:
+            raise EOFError(f"git cat-file for {self.git_dir} exited")
+        self.proc.stdout.read(1)            # trailing newline
+        return data
+
+    def close(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            self.proc.wait()
+
+# One reader per repository and process, reused across batches. Keyed
+# by pid too: forked pool workers must not share the parent's pipes.
+_readers = {}
+
+def blob_reader(git_dir) -> BlobReader:
+    key = (os.getpid(), str(git_dir))
+    reader = _readers.get(key)
+    if reader is None:
+        reader = _readers[key] = BlobReader(git_dir)
+    return reader
+
+def read_blob(git_dir, sha: str) -> bytes:
+    """
+    blob_reader(git_dir).read(sha). A cached reader whose git process
+    died is dropped and replaced once, so one crash does not fail every
+    later read of that repo in this process.
+    """
+    try:
+        return blob_reader(git_dir).read(sha)
+    except (EOFError, BrokenPipeError):
+        _readers.pop((os.getpid(), str(git_dir))).close()
+    return blob_reader(git_dir).read(sha)
+
+@atexit.register
+def close_readers():
+    pid = os.getpid()
+    for key in [k for k in _readers if k[0] == pid]:
+        _readers.pop(key).close()
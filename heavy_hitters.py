@@ -0,0 +1,189 @@
+import hashlib
+import heapq
+import math
+from array import array
+from collections import Counter
+
+# =========================================================
+# APPROXIMATE FREQUENCY COUNTING
+# =========================================================
+# Exact Counters grow with every distinct name, which generated code
+# can push into the millions. HeavyHitters answers the same questions
+# ("how often was X seen", "what are the most common names") in fixed
+# memory, combining two classic summaries:
+#
+#   Count-Min sketch (depth x width counters)
+#       width = ceil(e / epsilon), depth = ceil(ln(1 / delta)).
+#       Any key's estimate never undercounts, and overcounts by at
+#       most epsilon * N with probability >= 1 - delta (N = total count).
+#
+#   Space-Saving (top_k tracked keys)
+#       Every key whose true count exceeds N / top_k is tracked, and a
+#       tracked count overcounts by at most its recorded error <= N / top_k.
+#       A newcomer that evicts the smallest entry starts from the smaller
+#       of that entry's count and its own Count-Min estimate.
+#
+# Sketch cells come from a blake2b digest of the key rather than hash(),
+# which is salted per process for str, so two runs (or two pool workers)
+# put a key in the same cells.
+#
+# Only the Counter methods main.py and the plot scripts use are
+# provided: update, subtract, [], items, most_common, len.
+
+EPSILON = 0.001
+DELTA = 0.01
+TOP_K = 1000
+
+class HeavyHitters:
+    def __init__(self, epsilon: float = EPSILON, delta: float = DELTA, top_k: int = TOP_K):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.top_k = top_k
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.sketch = array("q", [0]) * (self.width * self.depth)
+        self.total = 0
+        self.counts = {}        # tracked key -> estimated count
+        self.errors = {}        # tracked key -> max overcount
+        self.heap = []          # (count, key), lazily updated min-heap
+
+    # -----------------------------------------------------
+    # COUNT-MIN
+    # -----------------------------------------------------
+    def _cells(self, key):
+        # Double hashing: row i uses h1 + i * h2
+        digest = hashlib.blake2b(str(key).encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        w = self.width
+        return [i * w + (h1 + i * h2) % w for i in range(self.depth)]
+
+    def _add(self, key, count: int) -> int:
+        cells = self._cells(key)
+        sketch = self.sketch
+        for c in cells:
+            sketch[c] += count
+        return min(sketch[c] for c in cells)
+
+    def sketch_estimate(self, key) -> int:
+        return min(self.sketch[c] for c in self._cells(key))
+
+    # -----------------------------------------------------
+    # SPACE-SAVING
+    # -----------------------------------------------------
+    def _push(self, key, count):
+        heapq.heappush(self.heap, (count, key))
+        # Stale entries pile up as counts change; rebuild now and then
+        if len(self.heap) > 4 * self.top_k:
+            self.heap = [(c, k) for k, c in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self.heap)
+            if self.counts.get(key) == count:
+                return key, count
+
+    def _track(self, key, count: int, sketch_est: int):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.top_k:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            evicted, min_count = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            base = min(min_count, sketch_est - count)
+            self.counts[key] = base + count
+            self.errors[key] = base
+        self._push(key, self.counts[key])
+
+    # -----------------------------------------------------
+    # COUNTER INTERFACE
+    # -----------------------------------------------------
+    def update(self, items):
+        """Add a mapping of counts, or an iterable of keys (one each)."""
+        pairs = items.items() if hasattr(items, "items") else ((k, 1) for k in items)
+        for key, count in pairs:
+            if count <= 0:
+                continue
+            self.total += count
+            self._track(key, count, self._add(key, count))
+
+    def subtract(self, items):
+        """
+        Remove previously added counts (watch mode). The sketch stays
+        exact about what was removed; tracked entries are clamped to the
+        new sketch estimate and dropped at zero.
+        """
+        for key, count in items.items():
+            self.total -= count
+            est = self._add(key, -count)
+            if key in self.counts:
+                self.counts[key] = min(self.counts[key] - count, est)
+                if self.counts[key] <= 0:
+                    del self.counts[key]
+                    del self.errors[key]
+                else:
+                    self._push(key, self.counts[key])
+
+    def __getitem__(self, key) -> int:
+        if key in self.counts:
+            return self.counts[key]
+        return max(0, self.sketch_estimate(key))
+
+    def __len__(self):
+        return len(self.counts)
+
+    def items(self):
+        return self.counts.items()
+
+    def most_common(self, n: int = None):
+        if n is None:
+            return sorted(self.counts.items(), key=lambda kv: -kv[1])
+        return heapq.nlargest(n, self.counts.items(), key=lambda kv: kv[1])
+
+    def bounds(self) -> dict:
+        """Error bounds of the current counts, for the report."""
+        return {
+            "mode": "approximate",
+            "epsilon": self.epsilon,
+            "delta": self.delta,
+            "top_k": self.top_k,
+            "total": self.total,
+            "sketch_max_overcount": self.epsilon * self.total,
+            "top_k_max_overcount": max(self.errors.values(), default=0),
+            "guaranteed_above": self.total / self.top_k,
+        }
+
+# =========================================================
+# CALL-NAME COUNTS (PLOT_funcs.py)
+# =========================================================
+def count_calls(report, packages=(), new_counter=Counter):
+    """
+    Call-name counts over every file in the report, for the plots:
+    returns (call_counts, calls_per_file, loc_per_file, per_package),
+    where per_package[pkg] counts the calls starting with "pkg.".
+    new_counter is Counter or HeavyHitters, so only the
+    methods both provide are used.
+    """
+    call_counts = new_counter()
+    calls_per_file = []
+    loc_per_file = []
+    per_package = {pkg: new_counter() for pkg in packages}
+    prefixes = [(pkg, pkg + ".") for pkg in packages]
+
+    for repo_name, repo_data in report.items():
+        if repo_name.startswith("_"):
+            continue
+        for metrics in repo_data["files"].values():
+            calls = metrics["function_calls"]
+            call_counts.update(calls)
+            calls_per_file.append(len(calls))
+            loc_per_file.append(metrics["loc"])
+            for c in calls:
+                for pkg, prefix in prefixes:
+                    if c.startswith(prefix):
+                        per_package[pkg].update([c])
+    return call_counts, calls_per_file, loc_per_file, per_package
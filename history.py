@@ -0,0 +1,132 @@
+import json
+import time
+from pathlib import Path
+
+# =========================================================
+# APPEND-ONLY RUN HISTORY
+# =========================================================
+# history.jsonl holds one line per run of main.py. Aggregates are
+# flattened to "scope/name/metric" keys, e.g.
+#
+#   global/_/total_loc   lang/python/total_functions   repo/MyRepo/total_loc
+#
+# Each line stores only what changed since the previous run:
+#   {"ts": ..., "delta": {key: new - old}, "removed": [key, ...]}
+# and every KEYFRAME_EVERY runs a full {"ts": ..., "full": {...}} line,
+# so a corrupt or hand-edited line never poisons the whole history:
+# the reader drops it and the deltas after it up to the next keyframe,
+# and the next run writes a keyframe if the history ends that way.
+
+KEYFRAME_EVERY = 50
+
+# ---------------------------------------------------------
+# FLATTENING
+# ---------------------------------------------------------
+def flatten_aggregates(report) -> dict:
+    flat = {}
+
+    for metric, value in report.get("_global", {}).items():
+        if isinstance(value, (int, float)):
+            flat[f"global/_/{metric}"] = value
+
+    for scope, section in (("lang", "_languages"), ("cat", "_categories")):
+        for name, stats in report.get(section, {}).items():
+            for metric, value in stats.items():
+                flat[f"{scope}/{name}/{metric}"] = value
+
+    for repo_name, repo_data in report.items():
+        if repo_name.startswith("_"):
+            continue
+        for metric in ("total_loc", "total_functions", "num_source_files"):
+            flat[f"repo/{repo_name}/{metric}"] = repo_data[metric]
+
+    return flat
+
+# ---------------------------------------------------------
+# WRITE
+# ---------------------------------------------------------
+def read_entries(path: Path):
+    """
+    Yield (timestamp, state) for every line, oldest first. state is None
+    for a corrupt line and for every delta after it up to the next "full"
+    keyframe, since those deltas no longer add up to the true totals.
+    """
+    state = None
+    try:
+        f = open(path, "r")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                ts = entry["ts"]
+                if "full" in entry:
+                    state = dict(entry["full"])
+                elif state is not None:
+                    for key, diff in entry["delta"].items():
+                        state[key] = state.get(key, 0) + diff
+                    for key in entry.get("removed", []):
+                        state.pop(key, None)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # Truncated (e.g. killed run) or hand-edited line
+                ts, state = None, None
+            yield ts, state
+
+def read_history(path: Path):
+    """Yield (timestamp, full state) for every readable run, oldest first."""
+    for ts, state in read_entries(path):
+        if state is not None:
+            yield ts, state
+
+def append_snapshot(path: Path, flat: dict, ts: float = None):
+    ts = time.time() if ts is None else ts
+
+    n_runs = 0
+    prev = None
+    for _, state in read_entries(path):
+        n_runs += 1
+        prev = state
+
+    # prev is None for an empty history or one that ends in unreadable lines
+    if prev is None or n_runs % KEYFRAME_EVERY == 0:
+        entry = {"ts": ts, "full": flat}
+    else:
+        entry = {
+            "ts": ts,
+            "delta": {k: v - prev.get(k, 0) for k, v in flat.items() if v != prev.get(k)},
+            "removed": [k for k in prev if k not in flat],
+        }
+
+    with open(path, "a+b") as f:
+        # A killed run can leave a line without its newline; don't append to it
+        if f.seek(0, 2):
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write((json.dumps(entry, separators=(",", ":")) + "\n").encode())
+
+# ---------------------------------------------------------
+# QUERY
+# ---------------------------------------------------------
+def time_series(path: Path, keys) -> dict:
+    """
+    {"ts": [...], key: [...] for each key}; runs where a key did not
+    exist yet (e.g. a repo added later) hold None.
+    """
+    out = {"ts": []}
+    out.update({k: [] for k in keys})
+    for ts, state in read_history(path):
+        out["ts"].append(ts)
+        for k in keys:
+            out[k].append(state.get(k))
+    return out
+
+def keys_matching(path: Path, prefix: str) -> list:
+    """All keys ever recorded that start with `prefix`, e.g. "lang/python/"."""
+    found = set()
+    for _, state in read_history(path):
+        found.update(k for k in state if k.startswith(prefix))
+    return sorted(found)
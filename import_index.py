@@ -0,0 +1,79 @@
+import sys
+import sysconfig
+from pathlib import Path
+
+# =========================================================
+# STANDARD LIBRARY INDEX
+# =========================================================
+def stdlib_module_names() -> frozenset:
+    # Python >= 3.10 ships the exact list
+    names = getattr(sys, "stdlib_module_names", None)
+    if names:
+        return frozenset(names)
+
+    # Older interpreters: list the stdlib directory of this interpreter
+    names = set(sys.builtin_module_names) | {"__future__"}
+    stdlib = Path(sysconfig.get_paths()["stdlib"])
+    for p in stdlib.iterdir():
+        if p.name == "site-packages":
+            continue
+        if p.suffix == ".py":
+            names.add(p.stem)
+        elif p.is_dir() and (p / "__init__.py").exists():
+            names.add(p.name)
+    lib_dynload = stdlib / "lib-dynload"
+    if lib_dynload.is_dir():
+        names.update(p.name.split(".")[0] for p in lib_dynload.iterdir())
+    return frozenset(names)
+
+STDLIB_MODULES = stdlib_module_names()
+
+# =========================================================
+# REPO-LOCAL INDEX
+# =========================================================
+def build_local_module_index(py_files, repo_root: Path) -> set:
+    """
+    Names a repo can import from itself: its top-level modules
+    (foo.py), top-level packages (foo/...) and src-layout packages and
+    modules (src/foo/..., src/foo.py). Nested files are not indexed, so
+    a utils.py or io/ deep in the tree does not turn the stdlib or
+    third-party module of that name into a local one. Built once per
+    repo from the already enumerated file list.
+    """
+    local = set()
+    for p in py_files:
+        parts = p.relative_to(repo_root).parts
+        if len(parts) == 1:
+            local.add(p.stem)
+            continue
+        local.add(parts[0])
+        if parts[0] == "src":
+            local.add(parts[1] if len(parts) > 2 else p.stem)
+    local.discard("__init__")
+    return local
+
+# =========================================================
+# CLASSIFICATION
+# =========================================================
+def classify_import(name: str, local_modules, relative: bool = False) -> str:
+    """
+    'local' for relative imports and names defined in the repo,
+    'stdlib' for the standard library, 'third_party' otherwise.
+    Stdlib wins over a same-named top-level repo module, which would
+    only shadow it when run from the repo root.
+    """
+    if relative:
+        return "local"
+    if name in STDLIB_MODULES:
+        return "stdlib"
+    if name in local_modules:
+        return "local"
+    return "third_party"
+
+def classify_imports(imports, local_modules, relative_names=()):
+    """Split a {module: count} mapping into stdlib / third_party / local dicts."""
+    out = {"stdlib": {}, "third_party": {}, "local": {}}
+    for name, count in imports.items():
+        kind = classify_import(name, local_modules, name in relative_names)
+        out[kind][name] = count
+    return out
@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# =========================================================
+# ASYNC CHAT COMPLETIONS CLIENT
+# =========================================================
+# Used by llm_report.py. Many requests run at once, but never more than
+#
+#   concurrency          requests in flight
+#   tokens_per_minute    prompt + max_tokens, as a token bucket; the
+#                        estimate is corrected with the usage reported
+#                        by the server
+#
+# 429s, 5xx and network errors are retried up to MAX_RETRIES times with
+# exponential backoff and jitter (Retry-After is honoured). Every attempt
+# is appended to a JSONL cost log with its status, latency, tokens and
+# price. Answers are cached by the hash of the request (SummaryCache),
+# and identical requests in flight at the same time are sent once.
+#
+# The HTTP call itself is a blocking urllib request run in a thread
+# pool, so there is no dependency beyond the standard library.
+
+MODEL = "gpt-4o-mini"
+BASE_URL = "https://api.openai.com/v1"
+CONCURRENCY = 8
+TOKENS_PER_MINUTE = 200_000
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+REQUEST_TIMEOUT = 120
+CACHE_VERSION = 1          # bump when prompts change (see llm_report.PROMPT_VERSION)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# USD per 1M (prompt, completion) tokens
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+def request_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+# ---------------------------------------------------------
+# CACHE
+# ---------------------------------------------------------
+class SummaryCache:
+    """Answers keyed by the sha256 of the request; unused entries are dropped on save."""
+
+    def __init__(self, path: Path = None, version=CACHE_VERSION):
+        self.path = Path(path) if path else None
+        self.version = version
+        self.entries = {}
+        self.used = set()
+        if self.path and self.path.is_file():
+            with open(self.path, "r") as f:
+                self.entries = json.load(f)
+
+    def key(self, request: dict) -> str:
+        blob = json.dumps([self.version, request], sort_keys=True).encode()
+        return hashlib.sha256(blob).hexdigest()
+
+    def get(self, key: str):
+        if key in self.entries:
+            self.used.add(key)
+            return self.entries[key]
+        return None
+
+    def put(self, key: str, answer: str):
+        self.entries[key] = answer
+        self.used.add(key)
+
+    def save(self):
+        if not self.path:
+            return
+        kept = {k: v for k, v in self.entries.items() if k in self.used}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(kept, f, indent=0, sort_keys=True)
+        os.replace(tmp, self.path)
+
+# ---------------------------------------------------------
+# RATE LIMIT
+# ---------------------------------------------------------
+class TokenBucket:
+    """Tokens-per-minute limiter; waiters are served in arrival order."""
+
+    def __init__(self, tokens_per_minute: int = TOKENS_PER_MINUTE):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self.lock = None
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, n: int):
+        # A request larger than the bucket waits for a full bucket
+        n = min(n, self.capacity)
+        if self.lock is None:
+            # Created inside the running event loop (Python 3.9 binds it at creation)
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            self.refill()
+            while self.tokens < n:
+                await asyncio.sleep((n - self.tokens) / self.rate)
+                self.refill()
+            self.tokens -= n
+
+    def adjust(self, n: int):
+        """Charge (n > 0) or refund (n < 0) once the real usage is known."""
+        self.refill()
+        self.tokens = min(self.capacity, self.tokens - n)
+
+# ---------------------------------------------------------
+# COST LOG
+# ---------------------------------------------------------
+class CostLog:
+    """One JSON line per attempt, plus running totals."""
+
+    def __init__(self, path: Path = None):
+        self.f = open(path, "a") if path else None
+        self.totals = {"requests": 0, "cached": 0, "deduplicated": 0,
+                       "attempts": 0, "retries": 0, "errors": 0,
+                       "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+    def record(self, entry: dict):
+        self.totals["attempts"] += 1
+        if entry["status"] == 200:
+            self.totals["requests"] += 1
+            self.totals["prompt_tokens"] += entry["prompt_tokens"]
+            self.totals["completion_tokens"] += entry["completion_tokens"]
+            self.totals["cost_usd"] += entry["cost_usd"]
+        elif entry.get("retry"):
+            self.totals["retries"] += 1
+        else:
+            self.totals["errors"] += 1
+        if self.f:
+            self.f.write(json.dumps(entry) + "\n")
+            self.f.flush()
+
+    def close(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+# ---------------------------------------------------------
+# CLIENT
+# ---------------------------------------------------------
+class RetryableError(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+class AsyncChatClient:
+    def __init__(self, base_url: str = None, api_key: str = None, model: str = MODEL,
+                 cache: SummaryCache = None, concurrency: int = CONCURRENCY,
+                 tokens_per_minute: int = TOKENS_PER_MINUTE, max_retries: int = MAX_RETRIES,
+                 cost_log: Path = None, count_tokens=None):
+        self.base_url = (base_url or os.environ.get("OPENAI_BASE_URL") or BASE_URL).rstrip("/")
+        self.api_key = api_key if api_key is not None else os.environ.get("OPENAI_API_KEY", "")
+        self.model = model
+        self.cache = cache or SummaryCache()
+        self.max_retries = max_retries
+        self.count_tokens = count_tokens or (lambda text: len(text) // 4 + 1)
+        self.concurrency = concurrency
+        self.semaphore = None
+        self.bucket = TokenBucket(tokens_per_minute)
+        self.log = CostLog(cost_log)
+        self.stats = self.log.totals
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        self.in_flight = {}         # cache key -> task, so duplicates are sent once
+
+    def request(self, prompt: str, max_tokens: int, system: str) -> dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": max_tokens,
+        }
+
+    def is_cached(self, prompt: str, max_tokens: int, system: str) -> bool:
+        return self.cache.key(self.request(prompt, max_tokens, system)) in self.cache.entries
+
+    def post(self, request: dict):
+        """Blocking HTTP call (runs in the thread pool)."""
+        req = urllib.request.Request(
+            self.base_url + "/chat/completions",
+            data=json.dumps(request).encode(),
+            headers={"Content-Type": "application/json",
+                     "Authorization": f"Bearer {self.api_key}"},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
+                return json.load(resp)
+        except urllib.error.HTTPError as e:
+            if e.code in RETRY_STATUS:
+                retry_after = e.headers.get("Retry-After")
+                raise RetryableError(e.code, float(retry_after) if retry_after else None)
+            raise
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise RetryableError(type(e).__name__)
+
+    def backoff(self, attempt: int, retry_after=None) -> float:
+        if retry_after is not None:
+            return retry_after
+        delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.5)
+
+    async def complete(self, prompt: str, max_tokens: int, system: str) -> str:
+        request = self.request(prompt, max_tokens, system)
+        key = self.cache.key(request)
+        answer = self.cache.get(key)
+        if answer is not None:
+            self.stats["cached"] += 1
+            return answer
+        if key not in self.in_flight:
+            self.in_flight[key] = asyncio.ensure_future(self.send(request, key))
+        else:
+            self.stats["deduplicated"] += 1
+        return await self.in_flight[key]
+
+    async def send(self, request: dict, key: str) -> str:
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        estimate = sum(self.count_tokens(m["content"]) for m in request["messages"]) + request["max_tokens"]
+        loop = asyncio.get_running_loop()
+        try:
+            for attempt in range(self.max_retries + 1):
+                await self.bucket.acquire(estimate)
+                async with self.semaphore:
+                    start = time.monotonic()
+                    entry = {"time": time.time(), "key": key[:16], "model": self.model,
+                             "attempt": attempt}
+                    try:
+                        response = await loop.run_in_executor(self.pool, self.post, request)
+                    except urllib.error.HTTPError as e:
+                        self.log.record(dict(entry, status=e.code, retry=False,
+                                             seconds=round(time.monotonic() - start, 3)))
+                        raise
+                    except RetryableError as e:
+                        retry = attempt < self.max_retries
+                        self.log.record(dict(entry, status=e.status, retry=retry,
+                                             seconds=round(time.monotonic() - start, 3)))
+                        if not retry:
+                            raise
+                        wait = self.backoff(attempt, e.retry_after)
+                    else:
+                        break
+                await asyncio.sleep(wait)
+
+            usage = response.get("usage", {})
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+            if usage:
+                self.bucket.adjust(prompt_tokens + completion_tokens - estimate)
+            self.log.record(dict(
+                entry, status=200, seconds=round(time.monotonic() - start, 3),
+                prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                cost_usd=request_cost(self.model, prompt_tokens, completion_tokens),
+            ))
+            answer = response["choices"][0]["message"]["content"] or ""
+            self.cache.put(key, answer)
+            return answer
+        finally:
+            self.in_flight.pop(key, None)
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+        self.log.close()
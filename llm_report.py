@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from main import get_source_files, LANGUAGE_MAP
+from sniff import sniff_file
+from llm_client import AsyncChatClient, SummaryCache, CONCURRENCY, TOKENS_PER_MINUTE
+
+# Try to import tiktoken for exact token counts
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# =========================================================
+# LLM CODE REPORT
+# =========================================================
+# Builds CODE_ANALYSIS.md with an OpenAI-compatible chat API, map-reduce
+# style, without ever sending more than one request's worth of tokens:
+#
+#   map      every source file is cut into chunks of <= CHUNK_TOKENS
+#            (at line boundaries) and each chunk is summarized; files
+#            with several chunks get their part summaries merged
+#   reduce   file summaries are packed into requests of <= REDUCE_TOKENS
+#            and merged until one repo summary is left; several repos
+#            are reduced once more into an overview
+#
+# Every request is cached by the hash of its content (model, prompts,
+# file text), so an unchanged file or repo costs nothing on the next
+# run; entries not used by a run are dropped from the cache file.
+# --budget caps the tokens sent for new file summaries; files beyond it
+# are listed as not summarized. OPENAI_BASE_URL points the client at
+# another server, e.g. mock_llm_server.py for offline runs.
+#
+# All requests of one level (every file chunk, then every merge group)
+# are issued together; llm_client.py keeps them within the concurrency
+# and tokens-per-minute limits and retries 429s.
+
+MODEL = "gpt-4o-mini"
+CHUNK_TOKENS = 3000        # source tokens per map request
+REDUCE_TOKENS = 6000       # summary tokens per reduce request
+SUMMARY_TOKENS = 300       # max_tokens of every answer
+CHARS_PER_TOKEN = 4        # estimate when tiktoken is not installed
+PROMPT_VERSION = 1         # bump when the prompts change (invalidates the cache)
+
+SYSTEM_PROMPT = "You are a code analysis engine. Answer in concise Markdown."
+CHUNK_PROMPT = ("Summarize part {part} of {parts} of the file `{path}`: its purpose, "
+                "main functions/classes and notable issues.\n\n```\n{text}\n```")
+FILE_PROMPT = "Merge these part summaries of the file `{path}` into one summary.\n\n{text}"
+MERGE_PROMPT = "Merge these summaries of files in the repository `{name}` into one summary.\n\n{text}"
+REPO_PROMPT = ("Write a code report for the repository `{name}` from these file summaries: "
+               "architecture, main components, code quality and suggested improvements.\n\n{text}")
+OVERVIEW_PROMPT = "Write an overview of these repositories from their reports.\n\n{text}"
+
+# ---------------------------------------------------------
+# TOKENS
+# ---------------------------------------------------------
+_encoders = {}
+
+def count_tokens(text: str, model: str = MODEL) -> int:
+    if TIKTOKEN_AVAILABLE:
+        if model not in _encoders:
+            try:
+                _encoders[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encoders[model] = tiktoken.get_encoding("cl100k_base")
+        return len(_encoders[model].encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, model: str = MODEL):
+    """Split text at line boundaries into pieces of <= max_tokens tokens."""
+    chunks = []
+    current, current_tokens = [], 0
+    for line in text.splitlines(keepends=True):
+        n = count_tokens(line, model)
+        if n > max_tokens:
+            # Minified / generated line: cut it (a token is at least one character)
+            pieces = [line[i:i + max_tokens] for i in range(0, len(line), max_tokens)]
+        else:
+            pieces = [line]
+        for piece in pieces:
+            n = count_tokens(piece, model) if len(pieces) > 1 else n
+            if current and current_tokens + n > max_tokens:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += n
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+def pack(texts, max_tokens: int = REDUCE_TOKENS, model: str = MODEL):
+    """Group texts, in order, into lists of <= max_tokens tokens (at least one each)."""
+    groups = []
+    current, current_tokens = [], 0
+    for text in texts:
+        n = count_tokens(text, model)
+        if current and current_tokens + n > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += n
+    if current:
+        groups.append(current)
+    return groups
+
+# ---------------------------------------------------------
+# MAP / REDUCE
+# ---------------------------------------------------------
+def ask(client: AsyncChatClient, prompt: str):
+    return client.complete(prompt, SUMMARY_TOKENS, SYSTEM_PROMPT)
+
+def file_prompts(path: str, text: str, model: str = MODEL):
+    chunks = chunk_text(text, CHUNK_TOKENS, model) or [""]
+    return [CHUNK_PROMPT.format(part=i + 1, parts=len(chunks), path=path, text=chunk)
+            for i, chunk in enumerate(chunks)]
+
+async def summarize_file(client: AsyncChatClient, path: str, prompts) -> str:
+    parts = await asyncio.gather(*(ask(client, p) for p in prompts))
+    if len(parts) == 1:
+        return parts[0]
+    return await reduce_summaries(client, parts, FILE_PROMPT, FILE_PROMPT, path)
+
+async def reduce_summaries(client: AsyncChatClient, summaries, merge_prompt: str,
+                           final_prompt: str, name: str) -> str:
+    """Merge summaries REDUCE_TOKENS at a time until a single final request fits."""
+    while True:
+        groups = pack(summaries, REDUCE_TOKENS, client.model)
+        if len(groups) == 1:
+            return await ask(client, final_prompt.format(name=name, path=name,
+                                                         text="\n\n".join(groups[0])))
+        summaries = await asyncio.gather(*(
+            ask(client, merge_prompt.format(name=name, path=name, text="\n\n".join(g)))
+            for g in groups))
+
+def read_source(path: Path):
+    encoding, _, skip_reason = sniff_file(path)
+    if skip_reason:
+        return None
+    try:
+        return path.read_text(encoding=encoding, errors="ignore")
+    except OSError:
+        return None
+
+def source_files(repo: Path, languages):
+    files = []
+    for path, lang, _ in get_source_files(repo):
+        if lang in languages:
+            files.append(path)
+    return sorted(files)
+
+def plan_repo(client: AsyncChatClient, repo: Path, languages, budget: dict):
+    """
+    Returns ({relative path: prompts}, [files left out]). budget["left"]
+    is the number of tokens still allowed for new file summaries
+    (None = unlimited); cached files are always included. Planned before
+    anything is sent, so the files left out do not depend on timing.
+    """
+    planned = {}
+    skipped = []
+    for path in source_files(repo, languages):
+        rel = str(path.relative_to(repo))
+        text = read_source(path)
+        if text is None:
+            continue
+        prompts = file_prompts(rel, text, client.model)
+        if budget["left"] is not None and not all(
+                client.is_cached(p, SUMMARY_TOKENS, SYSTEM_PROMPT) for p in prompts):
+            cost = sum(count_tokens(p, client.model) for p in prompts)
+            if cost > budget["left"]:
+                skipped.append(rel)
+                continue
+            budget["left"] -= cost
+        planned[rel] = prompts
+    return planned, skipped
+
+async def summarize_repo(client: AsyncChatClient, name: str, planned: dict):
+    """Returns (repo summary, {relative path: summary})."""
+    answers = await asyncio.gather(*(summarize_file(client, rel, prompts)
+                                     for rel, prompts in planned.items()))
+    summaries = dict(zip(planned, answers))
+    if not summaries:
+        return "_No source files summarized._", summaries
+    labeled = [f"### {rel}\n{s}" for rel, s in summaries.items()]
+    return await reduce_summaries(client, labeled, MERGE_PROMPT, REPO_PROMPT, name), summaries
+
+# ---------------------------------------------------------
+# REPORT
+# ---------------------------------------------------------
+async def build_markdown(client: AsyncChatClient, repos, languages=("python",),
+                         budget: int = None) -> str:
+    budget = {"left": budget}
+    names = [repo.resolve().name for repo in repos]
+    plans = [plan_repo(client, repo, set(languages), budget) for repo in repos]
+    results = await asyncio.gather(*(summarize_repo(client, name, planned)
+                                     for name, (planned, _) in zip(names, plans)))
+
+    sections = []
+    repo_summaries = []
+    for name, (summary, files), (_, skipped) in zip(names, results, plans):
+        repo_summaries.append(f"## {name}\n{summary}")
+        lines = [f"## {name}", "", summary, "", "### Files", ""]
+        lines += [f"- `{rel}`: {' '.join(s.split())}" for rel, s in files.items()]
+        if skipped:
+            lines += ["", f"Not summarized (token budget): {len(skipped)} file(s)", ""]
+            lines += [f"- `{rel}`" for rel in skipped]
+        sections.append("\n".join(lines))
+
+    out = ["# Automated Code Report", ""]
+    if len(repos) > 1:
+        out += [await reduce_summaries(client, repo_summaries, OVERVIEW_PROMPT, OVERVIEW_PROMPT,
+                                       "repositories"), ""]
+    out += sections
+    s = client.stats
+    out += ["", "---",
+            f"_{s['requests']} requests ({s['prompt_tokens']} prompt / {s['completion_tokens']} "
+            f"completion tokens, ${s['cost_usd']:.4f}), {s['cached']} answers from cache; "
+            f"model {client.model}._", ""]
+    return "\n".join(out)
+
+# ---------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------
+def main(repos, out: Path, cache_path: Path = None, model: str = MODEL, languages=("python",),
+         budget: int = None, base_url: str = None, concurrency: int = CONCURRENCY,
+         tokens_per_minute: int = TOKENS_PER_MINUTE, cost_log: Path = None):
+    cache = SummaryCache(cache_path, PROMPT_VERSION)
+    client = AsyncChatClient(base_url=base_url, model=model, cache=cache,
+                             concurrency=concurrency, tokens_per_minute=tokens_per_minute,
+                             cost_log=cost_log, count_tokens=lambda t: count_tokens(t, model))
+    try:
+        markdown = asyncio.run(build_markdown(client, [Path(r) for r in repos], languages, budget))
+    finally:
+        # Whatever was answered before a failure is kept for the next run
+        cache.save()
+        client.close()
+    Path(out).write_text(markdown, encoding="utf-8")
+    s = client.stats
+    print(f"✓ {out} written: {s['requests']} requests ({s['retries']} retried), "
+          f"{s['cached']} cached, {s['prompt_tokens']} prompt tokens, ${s['cost_usd']:.4f}")
+    return client.stats
+
+
+if __name__ == "__main__":
+    languages = sorted({v["lang"] for v in LANGUAGE_MAP.values() if v["category"] == "code"})
+    parser = argparse.ArgumentParser(description="Write an LLM code report (CODE_ANALYSIS.md).")
+    parser.add_argument("repos", nargs="*", default=["."], help="repositories to report on")
+    parser.add_argument("--out", type=Path, default=Path("CODE_ANALYSIS.md"))
+    parser.add_argument("--cache", type=Path, default=Path(".llm_cache.json"),
+                        help="answer cache; only changed files are re-sent")
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--lang", action="append", choices=languages,
+                        help="languages to include (repeatable, default: python)")
+    parser.add_argument("--budget", type=int,
+                        help="max prompt tokens for new file summaries in this run")
+    parser.add_argument("--base-url", help="API base URL (default: $OPENAI_BASE_URL or OpenAI)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help="requests in flight at once")
+    parser.add_argument("--tpm", type=int, default=TOKENS_PER_MINUTE,
+                        help="tokens-per-minute limit (prompt + max_tokens)")
+    parser.add_argument("--cost-log", type=Path,
+                        help="append one JSON line per request attempt (status, tokens, cost)")
+    args = parser.parse_args()
+    main(args.repos, args.out, args.cache, args.model, tuple(args.lang or ["python"]),
+         args.budget, args.base_url, max(1, args.concurrency), args.tpm, args.cost_log)
@@ -1,9 +1,36 @@
 import os
 import json
-from pathlib import Path
+import argparse
+import io
+import random
+import subprocess
+from pathlib import Path, PurePosixPath
 from collections import Counter, defaultdict
+from functools import partial
 import ast
 import re
+import hashlib
+
+from techniques import load_techniques, detect_techniques
+from function_index import build_function_index, write_function_index, build_duplicate_index
+from import_index import build_local_module_index, classify_imports
+from call_graph import build_call_graph, write_call_graph
+from history import append_snapshot, flatten_aggregates
+from matlab_analyzer import analyze_matlab_text
+from clike_analyzer import analyze_clike_text, C_FAMILY, JS_FAMILY
+from notebook_analyzer import read_notebook, CELL_STATS_FIELDS
+from sampling import stratify, allocate, draw_sample, build_estimate_report
+from heavy_hitters import HeavyHitters
+from report_io import write_report
+from sniff import sniff_file, sniff_bytes, SNIFF_BYTES
+from checkpoint import ScanCheckpoint, file_stamp
+from scheduler import plan_batches, run_batches, summarize_batches
+from git_source import DEFAULT_REV, git_dir_of, repo_name_of, list_tree, read_blob
+from config import load_config, make_root
+from distributions import (
+    new_distributions, new_distribution_totals, add_distributions, build_distribution_section,
+)
+from clones import text_signature, function_signatures, build_clone_section
 
 # Try to import radon for complexity metrics
 try:
@@ -13,10 +40,18 @@ except ImportError:
     RADON_AVAILABLE = False
     print("[WARNING] radon not installed. Cyclomatic complexity will be empty.")
 
-# Root folders
-REPOS_DIR = Path("/Users/acalapai/Library/Mobile Documents/com~apple~CloudDocs/GitHub")
-RESULTS_DIR = Path("/Users/acalapai/Desktop/CodeAnalysis/results")
-RESULTS_DIR.mkdir(exist_ok=True)
+# Scan roots and output folder (metacode.json, see config.py)
+CONFIG = load_config()
+ROOTS = CONFIG["roots"]
+RESULTS_DIR = CONFIG["results_dir"]
+
+# Revision analyzed for bare clones (and every clone with --from-git)
+GIT_REV = DEFAULT_REV
+
+# Built-in technique spec (techniques.py). A run uses the spec from its
+# config's techniques file (load_techniques(config["techniques"])),
+# passed down to the analyzers like the roots and results_dir.
+DEFAULT_TECHNIQUES = load_techniques()
 
 # -------------------------------------------------------
 # EXCLUDE DIRS
@@ -41,6 +76,7 @@ LANGUAGE_MAP = {
     ".cpp":  {"lang": "cpp",       "category": "code"},
     ".hpp":  {"lang": "cpp",       "category": "code"},
     ".cc":   {"lang": "cpp",       "category": "code"},
+    ".ipynb":{"lang": "jupyter",   "category": "code"},
 
     # Scripts
     ".sh":   {"lang": "shell",     "category": "script"},
@@ -74,25 +110,162 @@ def compute_pseudo_complexity(text: str):
     }
 
 # -------------------------------------------------------
-# PYTHON FUNCTION CALL EXTRACTION
+# PYTHON FUNCTION CALL NAMES
+# -------------------------------------------------------
+def call_name(func):
+    """Dotted name of a call target (`f`, `np.mean`, `self.x.run`), or None."""
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        parts = []
+        curr = func
+        while isinstance(curr, ast.Attribute):
+            parts.append(curr.attr)
+            curr = curr.value
+        if isinstance(curr, ast.Name):
+            parts.append(curr.id)
+        return ".".join(reversed(parts))
+    return None
+
+# -------------------------------------------------------
+# PYTHON FUNCTION RECORDS
+# -------------------------------------------------------
+# One row per def / async def, stored as a plain list to keep the
+# report compact. Column order is given by function_index.FUNCTION_FIELDS;
+# function_index.py also builds the cross-repo table.
+
+BRANCH_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While,
+                ast.ExceptHandler, ast.Assert)
+BLOCK_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With,
+               ast.AsyncWith, ast.Try)
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+
+def function_complexity(func):
+    """
+    McCabe complexity of one function body, counted on the AST:
+    1 + branches + extra boolean operands + comprehension loops / ifs.
+    Nested functions and classes are not counted (they get their own row).
+    """
+    cc = 1
+    max_depth = 0
+    stack = [(child, 0) for child in ast.iter_child_nodes(func)]
+    while stack:
+        node, depth = stack.pop()
+        if isinstance(node, SCOPE_NODES):
+            continue
+        if isinstance(node, BRANCH_NODES):
+            cc += 1
+        elif isinstance(node, ast.BoolOp):
+            cc += len(node.values) - 1
+        elif isinstance(node, ast.comprehension):
+            cc += 1 + len(node.ifs)
+        elif hasattr(ast, "match_case") and isinstance(node, ast.match_case):
+            cc += 1
+
+        if isinstance(node, BLOCK_NODES):
+            depth += 1
+            max_depth = max(max_depth, depth)
+        stack.extend((child, depth) for child in ast.iter_child_nodes(node))
+    return cc, max_depth
+
+# -------------------------------------------------------
+# PYTHON FUNCTION HASHES
 # -------------------------------------------------------
-def extract_function_calls(tree):
+# A structural hash of each function body: the AST with the docstring
+# and decorators dropped, every identifier (names, arguments,
+# attributes) renamed in order of first use and every literal replaced
+# by its type. Two functions with the same hash are the same code up to
+# renaming and constants; function_index.build_duplicate_index groups
+# them across repos. Bodies under MIN_HASH_NODES nodes (getters,
+# `return x`, `pass`) are too common to be worth reporting and get None.
+
+MIN_HASH_NODES = 30
+IDENTIFIER_FIELDS = {"id", "arg", "attr", "name", "asname", "module", "names"}
+
+def function_hash(func):
+    """Hex digest of the normalized body of a def / async def, or None if it is small."""
+    names = {}
+    out = []
+    num_nodes = 0
+
+    def canonical(name):
+        if name not in names:
+            names[name] = f"v{len(names)}"
+        return names[name]
+
+    def visit(node):
+        nonlocal num_nodes
+        num_nodes += 1
+        out.append(type(node).__name__)
+        if isinstance(node, ast.Constant):
+            out.append(type(node.value).__name__)
+            return
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, ast.AST):
+                visit(value)
+            elif isinstance(value, list):
+                out.append("[")
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        visit(item)
+                    else:
+                        out.append(canonical(item) if field in IDENTIFIER_FIELDS else repr(item))
+                out.append("]")
+            elif isinstance(value, str) and field in IDENTIFIER_FIELDS:
+                out.append(canonical(value))
+            elif value is not None and field != "type_comment":
+                out.append(repr(value))
+
+    body = func.body
+    if (body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+            and isinstance(body[0].value.value, str)):
+        body = body[1:]
+    visit(func.args)
+    for stmt in body:
+        visit(stmt)
+
+    if num_nodes < MIN_HASH_NODES:
+        return None
+    return hashlib.blake2b("\0".join(out).encode(), digest_size=8).hexdigest()
+
+def extract_function_records(tree):
+    """
+    Walk the tree once, returning (records, calls, call_owners, hashes).
+    call_owners[i] is the row in `records` of the function that makes
+    calls[i], or -1 for module-level code; hashes[i] is the
+    function_hash of records[i].
+    """
+    records = []
     calls = []
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            func = node.func
-            if isinstance(func, ast.Name):
-                calls.append(func.id)
-            elif isinstance(func, ast.Attribute):
-                parts = []
-                curr = func
-                while isinstance(curr, ast.Attribute):
-                    parts.append(curr.attr)
-                    curr = curr.value
-                if isinstance(curr, ast.Name):
-                    parts.append(curr.id)
-                calls.append(".".join(reversed(parts)))
-    return calls
+    call_owners = []
+    hashes = []
+
+    def visit(node, prefix, owner):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.Call):
+                name = call_name(child.func)
+                if name is not None:
+                    calls.append(name)
+                    call_owners.append(owner)
+
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = prefix + child.name
+                a = child.args
+                num_args = (len(a.posonlyargs) + len(a.args) + len(a.kwonlyargs)
+                            + (a.vararg is not None) + (a.kwarg is not None))
+                start = child.lineno
+                end = getattr(child, "end_lineno", None) or start
+                cc, nesting = function_complexity(child)
+                records.append([qualname, start, end, end - start + 1, cc, num_args, nesting])
+                hashes.append(function_hash(child))
+                visit(child, qualname + ".<locals>.", len(records) - 1)
+            elif isinstance(child, ast.ClassDef):
+                visit(child, prefix + child.name + ".", owner)
+            else:
+                visit(child, prefix, owner)
+
+    visit(tree, "", -1)
+    return records, calls, call_owners, hashes
 
 # -------------------------------------------------------
 # COMMENT COUNTER
@@ -142,32 +315,47 @@ def count_comments(text: str, language: str) -> int:
 # -------------------------------------------------------
 # FILE DISCOVERY
 # -------------------------------------------------------
-def get_source_files(repo_path: Path):
+def is_excluded(path: Path, extra=()) -> bool:
+    """extra: the scan root's own excluded directory names."""
+    return any(part in EXCLUDE_DIRS or part in extra for part in path.parts)
+
+def file_language(path: Path):
+    """Return (lang, category) for a path, or None if it is not scanned."""
+    info = LANGUAGE_MAP.get(path.suffix.lower())
+    if info is None:
+        return None
+    return info["lang"], info["category"]
+
+def get_source_files(repo_path: Path, exclude=()):
     files = []
     for p in repo_path.rglob("*"):
         if not p.is_file():
             continue
 
-        if any(ex in p.parts for ex in EXCLUDE_DIRS):
+        if is_excluded(p, exclude):
             continue
 
-        info = LANGUAGE_MAP.get(p.suffix.lower())
-        if info:
-            files.append((p, info["lang"], info["category"]))
+        lang_cat = file_language(p)
+        if lang_cat:
+            files.append((p, *lang_cat))
 
     return files
 
 # -------------------------------------------------------
 # PYTHON ANALYSIS
 # -------------------------------------------------------
-def analyze_python_file(file_path: Path):
+def analyze_python_file(file_path: Path, local_modules=frozenset(), encoding: str = "utf-8",
+                        techniques=DEFAULT_TECHNIQUES):
     try:
-        text = file_path.read_text(errors="ignore")
+        text = file_path.read_text(encoding=encoding, errors="ignore")
     except Exception:
         m = empty_metrics()
         m["language"] = "python"
         return m
+    return analyze_python_text(text, local_modules, techniques=techniques)
 
+def analyze_python_text(text: str, local_modules=frozenset(), language: str = "python",
+                        techniques=DEFAULT_TECHNIQUES):
     lines = text.splitlines()
     loc = len(lines)
     num_blank = sum(1 for l in lines if not l.strip())
@@ -177,7 +365,12 @@ def analyze_python_file(file_path: Path):
     function_names = []
     num_classes = 0
     imports_counter = Counter()
+    relative_imports = set()
     function_calls = []
+    call_owners = []
+    functions = []
+    function_hashes = []
+    import_aliases = {}
 
     try:
         tree = ast.parse(text)
@@ -194,11 +387,23 @@ def analyze_python_file(file_path: Path):
             elif isinstance(node, ast.Import):
                 for name in node.names:
                     imports_counter[name.name.split(".")[0]] += 1
+                    if name.asname:
+                        import_aliases[name.asname] = name.name
             elif isinstance(node, ast.ImportFrom):
                 if node.module:
                     imports_counter[node.module.split(".")[0]] += 1
+                    if node.level:
+                        relative_imports.add(node.module.split(".")[0])
+                # Bound names -> dotted targets; relative targets keep their dots
+                base = "." * node.level + (node.module or "")
+                for name in node.names:
+                    if name.name != "*":
+                        sep = "" if base.endswith(".") or not base else "."
+                        import_aliases[name.asname or name.name] = base + sep + name.name
 
-        function_calls = extract_function_calls(tree)
+        functions, function_calls, call_owners, function_hashes = extract_function_records(tree)
+
+    import_kinds = classify_imports(imports_counter, local_modules, relative_imports)
 
     avg_cc = max_cc = total_cc = 0.0
     num_entities = 0
@@ -217,7 +422,7 @@ def analyze_python_file(file_path: Path):
             pass
 
     return {
-        "language": "python",
+        "language": language,
         "loc": loc,
         "num_comments": num_comments,
         "num_blank": num_blank,
@@ -225,6 +430,8 @@ def analyze_python_file(file_path: Path):
         "function_names": function_names,
         "num_classes": num_classes,
         "imports": dict(imports_counter),
+        "imports_third_party": import_kinds["third_party"],
+        "imports_local": import_kinds["local"],
         "complexity": {
             "avg_cc": avg_cc,
             "max_cc": max_cc,
@@ -234,45 +441,133 @@ def analyze_python_file(file_path: Path):
         },
         "pseudo_complexity": compute_pseudo_complexity(text),
         "function_calls": function_calls,
+        "call_owners": call_owners,
+        "import_aliases": import_aliases,
+        "functions": functions,
+        "function_hashes": function_hashes,
+        "techniques": detect_techniques(text, imports_counter, techniques),
+        "minhash": text_signature(text, language),
+        "function_minhash": function_signatures(lines, functions),
     }
 
 # -------------------------------------------------------
-# GENERIC ANALYSIS
+# JUPYTER NOTEBOOK ANALYSIS
+# -------------------------------------------------------
+def analyze_notebook_file(file_path: Path, local_modules=frozenset(), encoding: str = "utf-8",
+                          techniques=DEFAULT_TECHNIQUES):
+    # Streamed: cell outputs are skipped, never loaded (notebook_analyzer.py)
+    try:
+        with open(file_path, "r", encoding=encoding, errors="ignore") as f:
+            return analyze_notebook_stream(f, local_modules, techniques)
+    except OSError:
+        return empty_notebook_metrics()
+
+def empty_notebook_metrics():
+    m = empty_metrics()
+    m["language"] = "jupyter"
+    m["notebook"] = dict.fromkeys(CELL_STATS_FIELDS, 0)
+    return m
+
+def analyze_notebook_stream(f, local_modules=frozenset(), techniques=DEFAULT_TECHNIQUES):
+    try:
+        nb = read_notebook(f)
+    except ValueError:
+        return empty_notebook_metrics()
+
+    metrics = analyze_python_text(nb["code"], local_modules, language="jupyter", techniques=techniques)
+    metrics["notebook"] = nb["cells"]
+    return metrics
+
+# -------------------------------------------------------
+# MATLAB ANALYSIS
 # -------------------------------------------------------
-def analyze_matlab_file(file_path: Path):
+def analyze_matlab_file(file_path: Path, encoding: str = "utf-8", techniques=DEFAULT_TECHNIQUES):
     try:
-        text = file_path.read_text(errors="ignore")
+        text = file_path.read_text(encoding=encoding, errors="ignore")
     except Exception:
         m = empty_metrics()
         m["language"] = "matlab"
         return m
+    return analyze_matlab_source(text, techniques)
 
+def analyze_matlab_source(text: str, techniques=DEFAULT_TECHNIQUES):
     lines = text.splitlines()
+    mat = analyze_matlab_text(text)
     return {
         "language": "matlab",
         "loc": len(lines),
-        "num_comments": count_comments(text, "matlab"),
+        "num_comments": mat["num_comments"],
         "num_blank": sum(1 for l in lines if not l.strip()),
-        "num_functions": 0,
-        "function_names": [],
-        "num_classes": 0,
-        "imports": {},
-        "complexity": {
-            "avg_cc": 0.0, "max_cc": 0.0, "total_cc": 0.0,
-            "num_entities": 0, "cc_values": []
+        "num_functions": len(mat["functions"]),
+        "function_names": mat["function_names"],
+        "num_classes": mat["num_classes"],
+        "imports": mat["imports"],
+        "imports_third_party": {},
+        "imports_local": {},
+        "addpath": mat["addpath"],
+        "complexity": mat["complexity"],
+        "pseudo_complexity": {
+            "decision_points": mat["decision_points"],
+            "dict_comprehensions": 0,
         },
-        "pseudo_complexity": compute_pseudo_complexity(text),
-        "function_calls": [],
+        "function_calls": mat["function_calls"],
+        "functions": mat["functions"],
+        "techniques": detect_techniques(text, mat["imports"], techniques),
+        "minhash": text_signature(text, "matlab"),
+    }
+
+# -------------------------------------------------------
+# C / C++ / JAVASCRIPT / TYPESCRIPT ANALYSIS
+# -------------------------------------------------------
+def analyze_clike_file(file_path: Path, language: str, encoding: str = "utf-8",
+                       techniques=DEFAULT_TECHNIQUES):
+    try:
+        text = file_path.read_text(encoding=encoding, errors="ignore")
+    except Exception:
+        m = empty_metrics()
+        m["language"] = language
+        return m
+    return analyze_clike_source(text, language, techniques)
+
+def analyze_clike_source(text: str, language: str, techniques=DEFAULT_TECHNIQUES):
+    lines = text.splitlines()
+    lex = analyze_clike_text(text, language)
+    return {
+        "language": language,
+        "loc": len(lines),
+        "num_comments": lex["num_comments"],
+        "num_blank": sum(1 for l in lines if not l.strip()),
+        "num_functions": len(lex["functions"]),
+        "function_names": lex["function_names"],
+        "num_classes": lex["num_classes"],
+        "imports": lex["imports"],
+        "imports_third_party": lex["imports_third_party"],
+        "imports_local": lex["imports_local"],
+        "complexity": lex["complexity"],
+        "pseudo_complexity": {
+            "decision_points": lex["decision_points"],
+            "dict_comprehensions": 0,
+        },
+        "function_calls": lex["function_calls"],
+        "functions": lex["functions"],
+        "techniques": detect_techniques(text, lex["imports"], techniques),
+        "minhash": text_signature(text, language),
     }
 
-def analyze_generic_file(file_path: Path, language: str):
+# -------------------------------------------------------
+# GENERIC ANALYSIS
+# -------------------------------------------------------
+def analyze_generic_file(file_path: Path, language: str, encoding: str = "utf-8",
+                         techniques=DEFAULT_TECHNIQUES):
     try:
-        text = file_path.read_text(errors="ignore")
+        text = file_path.read_text(encoding=encoding, errors="ignore")
     except Exception:
         m = empty_metrics()
         m["language"] = language
         return m
+    return analyze_generic_source(text, language, techniques)
 
+def analyze_generic_source(text: str, language: str, techniques=DEFAULT_TECHNIQUES):
     lines = text.splitlines()
     return {
         "language": language,
@@ -283,12 +578,17 @@ def analyze_generic_file(file_path: Path, language: str):
         "function_names": [],
         "num_classes": 0,
         "imports": {},
+        "imports_third_party": {},
+        "imports_local": {},
         "complexity": {
             "avg_cc": 0.0, "max_cc": 0.0, "total_cc": 0.0,
             "num_entities": 0, "cc_values": []
         },
         "pseudo_complexity": compute_pseudo_complexity(text),
         "function_calls": [],
+        "functions": [],
+        "techniques": detect_techniques(text, {}, techniques),
+        "minhash": text_signature(text, language),
     }
 
 # -------------------------------------------------------
@@ -304,158 +604,557 @@ def empty_metrics():
         "function_names": [],
         "num_classes": 0,
         "imports": {},
+        "imports_third_party": {},
+        "imports_local": {},
         "complexity": {
             "avg_cc": 0.0, "max_cc": 0.0, "total_cc": 0.0,
             "num_entities": 0, "cc_values": []
         },
         "pseudo_complexity": {"decision_points": 0, "dict_comprehensions": 0},
         "function_calls": [],
+        "functions": [],
+        "techniques": [],
+        "minhash": None,
     }
 
 # -------------------------------------------------------
-# MAIN ANALYSIS LOOP
+# FILE DISPATCH
 # -------------------------------------------------------
-report = {}
-global_imports = Counter()
+# Binary containers that are the expected content for a language: the
+# file is counted, but never decoded.
+BINARY_FORMATS = {
+    "excel": {"zip", "ole2"},
+}
 
-language_stats = defaultdict(lambda: {
-    "total_loc": 0,
-    "total_blank": 0,
-    "total_comments": 0,
-    "total_functions": 0,
-    "total_pseudo_complexity": 0,
-    "total_radon_complexity": 0,
-    "num_files": 0,
-})
+def binary_metrics(lang: str, fmt, skip_reason):
+    m = empty_metrics()
+    m["language"] = lang
+    if fmt in BINARY_FORMATS.get(lang, ()):
+        m["binary_format"] = fmt
+    else:
+        m["skipped"] = skip_reason
+    return m
 
-category_stats = defaultdict(lambda: {
-    "total_loc": 0,
-    "total_comments": 0,
-    "total_files": 0,
-    "total_pseudo_complexity": 0,
-})
+def analyze_file(file_path: Path, lang: str, local_modules=frozenset(), techniques=DEFAULT_TECHNIQUES):
+    """
+    Sniff the first few KB (sniff.py), then run the analyzer for `lang`
+    with the detected encoding. Files that turn out to be binary come
+    back as empty metrics with "skipped" set to the reason.
+    """
+    encoding, fmt, skip_reason = sniff_file(file_path)
+    if encoding is None:
+        return binary_metrics(lang, fmt, skip_reason)
 
-total_source_files = 0
-global_total_loc = 0
-global_total_functions = 0
+    if lang == "python":
+        return analyze_python_file(file_path, local_modules, encoding, techniques)
+    if lang == "jupyter":
+        return analyze_notebook_file(file_path, local_modules, encoding, techniques)
+    if lang == "matlab":
+        return analyze_matlab_file(file_path, encoding, techniques)
+    if lang in C_FAMILY or lang in JS_FAMILY:
+        return analyze_clike_file(file_path, lang, encoding, techniques)
+    return analyze_generic_file(file_path, lang, encoding, techniques)
 
-for repo in REPOS_DIR.iterdir():
-    if not repo.is_dir():
-        continue
+def analyze_bytes(data: bytes, lang: str, local_modules=frozenset(), techniques=DEFAULT_TECHNIQUES):
+    """Same as analyze_file, for content already in memory (e.g. a git blob)."""
+    encoding, fmt, skip_reason = sniff_bytes(data[:SNIFF_BYTES])
+    if encoding is None:
+        return binary_metrics(lang, fmt, skip_reason)
+
+    text = data.decode(encoding, errors="ignore")
+    if lang == "python":
+        return analyze_python_text(text, local_modules, techniques=techniques)
+    if lang == "jupyter":
+        return analyze_notebook_stream(io.StringIO(text), local_modules, techniques)
+    if lang == "matlab":
+        return analyze_matlab_source(text, techniques)
+    if lang in C_FAMILY or lang in JS_FAMILY:
+        return analyze_clike_source(text, lang, techniques)
+    return analyze_generic_source(text, lang, techniques)
+
+# -------------------------------------------------------
+# AGGREGATION
+# -------------------------------------------------------
+def new_counter(approx: bool = False):
+    """Exact Counter, or a fixed-memory HeavyHitters (heavy_hitters.py)."""
+    return HeavyHitters() if approx else Counter()
 
-    print(f"Analyzing repo: {repo.name}")
+def new_totals(approx: bool = False, techniques=DEFAULT_TECHNIQUES):
+    return {
+        "approx": approx,
+        "techniques": techniques,      # spec the files were analyzed with
+        "total_source_files": 0,
+        "total_loc": 0,
+        "total_functions": 0,
+        "global_imports": new_counter(approx),
+        "language_stats": defaultdict(lambda: {
+            "total_loc": 0,
+            "total_blank": 0,
+            "total_comments": 0,
+            "total_functions": 0,
+            "total_pseudo_complexity": 0,
+            "total_radon_complexity": 0,
+            "num_files": 0,
+        }),
+        "category_stats": defaultdict(lambda: {
+            "total_loc": 0,
+            "total_comments": 0,
+            "total_files": 0,
+            "total_pseudo_complexity": 0,
+        }),
+        "notebook_stats": Counter(),
+        "skipped_files": Counter(),
+        "distributions": new_distribution_totals(),
+    }
 
-    files_with_lang = get_source_files(repo)
-    total_source_files += len(files_with_lang)
+def new_repo_entry(approx: bool = False):
+    return {
+        "total_loc": 0,
+        "total_functions": 0,
+        "imports": new_counter(approx),
+        "files": {},
+        "skipped": {},
+        "distributions": new_distributions(),
+        "local_modules": set(),
+    }
 
-    repo_total_loc = 0
-    repo_total_functions = 0
-    repo_import_counter = Counter()
-    repo_data = {}
+def update_counter(counter, items, sign: int):
+    if sign > 0:
+        counter.update(items)
+        return
+    if isinstance(counter, HeavyHitters):
+        counter.subtract(items)
+        return
+    for key, count in items.items():
+        counter[key] -= count
+        if counter[key] <= 0:
+            del counter[key]
 
-    for file_path, lang, category in files_with_lang:
+def add_file(totals, repo_entry, relative: str, metrics, category: str, sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) one file's metrics from the repo
+    entry and the global / language / category totals.
+    """
+    lang = metrics["language"]
+    decision_points = metrics["pseudo_complexity"]["decision_points"]
 
-        # Select correct analysis
-        if lang == "python":
-            metrics = analyze_python_file(file_path)
-        elif lang == "matlab":
-            metrics = analyze_matlab_file(file_path)
+    # Binary / unreadable files are only listed, with the reason
+    if metrics.get("skipped"):
+        reason = metrics["skipped"]
+        if sign > 0:
+            repo_entry["skipped"][relative] = reason
         else:
-            metrics = analyze_generic_file(file_path, lang)
-
-        relative = str(file_path.relative_to(repo))
-        repo_data[relative] = metrics
-
-        # Per repo
-        repo_total_loc += metrics["loc"]
-        repo_total_functions += metrics["num_functions"]
-        repo_import_counter.update(metrics["imports"])
-
-        # Global
-        global_total_loc += metrics["loc"]
-        global_total_functions += metrics["num_functions"]
-
-        # Per-language stats
-        language_stats[lang]["total_loc"] += metrics["loc"]
-        language_stats[lang]["total_blank"] += metrics["num_blank"]
-        language_stats[lang]["total_comments"] += metrics["num_comments"]
-        language_stats[lang]["total_functions"] += metrics["num_functions"]
-        language_stats[lang]["total_pseudo_complexity"] += metrics["pseudo_complexity"]["decision_points"]
-        language_stats[lang]["num_files"] += 1
-
-        # Category stats
-        category_stats[category]["total_loc"] += metrics["loc"]
-        category_stats[category]["total_comments"] += metrics["num_comments"]
-        category_stats[category]["total_files"] += 1
-        category_stats[category]["total_pseudo_complexity"] += metrics["pseudo_complexity"]["decision_points"]
-
-        # Python only: radon + imports
-        if lang == "python":
-            language_stats[lang]["total_radon_complexity"] += metrics["complexity"]["total_cc"]
-            global_imports.update(metrics["imports"])
-
-    report[repo.name] = {
-        "total_loc": repo_total_loc,
-        "total_functions": repo_total_functions,
-        "num_source_files": len(files_with_lang),
-        "imports": repo_import_counter.most_common(),
-        "files": repo_data,
+            repo_entry["skipped"].pop(relative, None)
+        update_counter(totals["skipped_files"], {reason: 1}, sign)
+        return
+
+    if sign > 0:
+        repo_entry["files"][relative] = metrics
+    else:
+        repo_entry["files"].pop(relative, None)
+
+    # Per repo
+    repo_entry["total_loc"] += sign * metrics["loc"]
+    repo_entry["total_functions"] += sign * metrics["num_functions"]
+    update_counter(repo_entry["imports"], metrics["imports"], sign)
+
+    # Global
+    totals["total_source_files"] += sign
+    totals["total_loc"] += sign * metrics["loc"]
+    totals["total_functions"] += sign * metrics["num_functions"]
+
+    # Per-language stats
+    ls = totals["language_stats"][lang]
+    ls["total_loc"] += sign * metrics["loc"]
+    ls["total_blank"] += sign * metrics["num_blank"]
+    ls["total_comments"] += sign * metrics["num_comments"]
+    ls["total_functions"] += sign * metrics["num_functions"]
+    ls["total_pseudo_complexity"] += sign * decision_points
+    ls["num_files"] += sign
+
+    # Category stats
+    cs = totals["category_stats"][category]
+    cs["total_loc"] += sign * metrics["loc"]
+    cs["total_comments"] += sign * metrics["num_comments"]
+    cs["total_files"] += sign
+    cs["total_pseudo_complexity"] += sign * decision_points
+
+    # Histograms / quantile sketches (distributions.py)
+    add_distributions(
+        (totals["distributions"]["global"], totals["distributions"]["languages"][lang],
+         repo_entry["distributions"]),
+        metrics, sign,
+    )
+
+    # Python and notebooks only: radon + imports
+    if lang in ("python", "jupyter"):
+        ls["total_radon_complexity"] += sign * metrics["complexity"]["total_cc"]
+        update_counter(totals["global_imports"], metrics["imports"], sign)
+
+    # Notebook cell counts
+    if "notebook" in metrics:
+        for key, value in metrics["notebook"].items():
+            totals["notebook_stats"][key] += sign * value
+
+def analyze_source(source, lang: str, local_modules=frozenset(), techniques=DEFAULT_TECHNIQUES):
+    """Analyze a file on disk (path string) or a git blob ((git dir, sha))."""
+    try:
+        if isinstance(source, tuple):
+            git_dir, sha = source
+            return analyze_bytes(read_blob(git_dir, sha), lang, local_modules, techniques)
+        return analyze_file(Path(source), lang, local_modules, techniques)
+    except Exception as e:
+        # One malformed file must not end a multi-hour scan
+        print(f"[WARNING] {source}: {type(e).__name__}: {e}")
+        return dict(empty_metrics(), language=lang, skipped="error:" + type(e).__name__)
+
+def analyze_batch(tasks, techniques=DEFAULT_TECHNIQUES):
+    """Worker side of the scheduler (scheduler.py): one batch of files."""
+    return [analyze_source(source, lang, local, techniques) for _, _, source, lang, local in tasks]
+
+def list_git_files(git_dir: Path, rev: str = GIT_REV, exclude=()):
+    """Like get_source_files, from a commit's tree: (path, lang, category, sha, size)."""
+    files = []
+    for path, sha, size in list_tree(git_dir, rev):
+        if is_excluded(path, exclude):
+            continue
+        lang_cat = file_language(path)
+        if lang_cat:
+            files.append((path, *lang_cat, sha, size))
+    return files
+
+def as_roots(roots):
+    """A single folder of repos (Path / str) or a list of config.py roots."""
+    if isinstance(roots, (str, Path)):
+        return [make_root(roots)]
+    return roots
+
+def list_repo_files(roots, from_git: bool = False, rev: str = GIT_REV):
+    """
+    One row per file: (repo name, relative, source, lang, category, size,
+    stamp), plus each repo's local modules and its (root, folder).
+    Bare clones (and, with from_git, every clone) are listed from git
+    objects at `rev`; the source is then (git dir, blob sha) instead of a
+    path. A repo name already taken by an earlier root is reported as
+    "<root name>:<repo>".
+    """
+    listing = []
+    local_modules = {}
+    repo_roots = {}
+    for root in as_roots(roots):
+        if not root["path"].is_dir():
+            print(f"[WARNING] scan root {root['path']} not found; skipped")
+            continue
+        for repo in sorted(root["path"].iterdir()):
+            if not repo.is_dir():
+                continue
+            git_dir = git_dir_of(repo)
+            from_objects = git_dir is not None and (from_git or git_dir == repo)
+            name = repo_name_of(repo) if from_objects else repo.name
+            if from_objects and name in local_modules and repo_roots[name][0] is root:
+                name = repo.name
+            if name in local_modules:
+                name = f"{root['name']}:{name}"
+            repo_roots[name] = (root, repo)
+
+            if from_objects:
+                try:
+                    found = list_git_files(git_dir, rev, root["exclude"])
+                except subprocess.CalledProcessError as e:
+                    print(f"[WARNING] {repo.name}: cannot list {rev}: {e.stderr.decode().strip()}")
+                    del repo_roots[name]
+                    continue
+                # Index of the repo's own modules, used to classify its imports
+                local_modules[name] = build_local_module_index(
+                    [p for p, lang, _, _, _ in found if lang == "python"], PurePosixPath())
+                for p, lang, category, sha, size in found:
+                    listing.append((name, str(p), (str(git_dir), sha), lang, category, size, ["git", sha]))
+                continue
+
+            files_with_lang = get_source_files(repo, root["exclude"])
+            local_modules[name] = build_local_module_index(
+                [p for p, lang, _ in files_with_lang if lang == "python"], repo)
+            for p, lang, category in files_with_lang:
+                stamp = file_stamp(p)
+                size = stamp[1] if stamp else 0
+                listing.append((name, str(p.relative_to(repo)), str(p), lang, category, size, stamp))
+    return listing, local_modules, repo_roots
+
+def scan_repos(roots=ROOTS, approx: bool = False, checkpoint=None,
+               max_workers: int = 1, from_git: bool = False, rev: str = GIT_REV,
+               techniques=DEFAULT_TECHNIQUES):
+    """
+    Analyze every file under the scan roots. Files not already in the
+    checkpoint are analyzed in size-aware batches (max_workers processes,
+    1 = in this process), at most max_readers batches per root at a time;
+    totals are then built in listing order, so the result does not depend
+    on which batch finished first.
+    """
+    roots = as_roots(roots)
+    listing, local_modules, repo_roots = list_repo_files(roots, from_git, rev)
+
+    results = {}
+    stamps = {}
+    todo = defaultdict(list)          # root name -> [(task, size)]
+    for repo_name, relative, source, lang, _, size, stamp in listing:
+        metrics = checkpoint.lookup(repo_name, relative, stamp) if checkpoint else None
+        if metrics is not None:
+            results[(repo_name, relative)] = metrics
+            continue
+        stamps[(repo_name, relative)] = stamp
+        todo[repo_roots[repo_name][0]["name"]].append(
+            ((repo_name, relative, source, lang, local_modules[repo_name]), size))
+
+    # Batches never mix roots, so each root's read concurrency can be capped
+    planned = sorted(((batch, name) for name, items in todo.items() for batch in plan_batches(items)),
+                     key=lambda b: -b[0][1])
+    batches = [batch for batch, _ in planned]
+    groups = [name for _, name in planned]
+    limits = {root["name"]: root["max_readers"] for root in roots}
+
+    print(f"Analyzing {sum(len(items) for items in todo.values())} of {len(listing)} files "
+          f"in {len(local_modules)} repos ({max_workers} worker(s))")
+    batch_rows = []
+    analyze = partial(analyze_batch, techniques=techniques)
+    for tasks, batch_results, row in run_batches(analyze, batches, max_workers, groups, limits):
+        for (repo_name, relative, _, _, _), metrics in zip(tasks, batch_results):
+            results[(repo_name, relative)] = metrics
+            if checkpoint:
+                checkpoint.record(repo_name, relative, stamps[(repo_name, relative)], metrics)
+        batch_rows.append(row)
+
+    repos = {}
+    totals = new_totals(approx, techniques)
+    for repo_name, local in local_modules.items():
+        repos[repo_name] = new_repo_entry(approx)
+        repos[repo_name]["local_modules"] = local
+        root, folder = repo_roots[repo_name]
+        repos[repo_name]["root"] = root["name"]
+        repos[repo_name]["path"] = str(folder)
+    for repo_name, relative, _, _, category, _, _ in listing:
+        add_file(totals, repos[repo_name], relative, results[(repo_name, relative)], category)
+
+    totals["schedule"] = {
+        "summary": summarize_batches(batch_rows, max_workers),
+        "batches": sorted(batch_rows, key=lambda r: r["batch"]),
     }
+    return repos, totals
 
 # -------------------------------------------------------
-# GLOBAL SUMMARY
+# SAMPLE ESTIMATE (see sampling.py)
 # -------------------------------------------------------
-relative_imports = {
-    m: c / total_source_files for m, c in global_imports.items()
-} if total_source_files else {}
+def file_values(metrics):
+    """One file's contribution to the per-language totals."""
+    python_like = metrics["language"] in ("python", "jupyter")
+    return {
+        "num_files": 0 if metrics.get("skipped") else 1,      # as add_file
+        "total_loc": metrics["loc"],
+        "total_blank": metrics["num_blank"],
+        "total_comments": metrics["num_comments"],
+        "total_functions": metrics["num_functions"],
+        "total_pseudo_complexity": metrics["pseudo_complexity"]["decision_points"],
+        "total_radon_complexity": metrics["complexity"]["total_cc"] if python_like else 0,
+    }, (metrics["imports"] if python_like else {})
 
-report["_global"] = {
-    "total_source_files": total_source_files,
-    "total_loc": global_total_loc,
-    "total_functions": global_total_functions,
-    "global_import_counts": global_imports.most_common(),
-    "global_import_relative_freq": sorted(relative_imports.items(), key=lambda x: -x[1]),
-}
+def estimate_repos(roots=ROOTS, fraction: float = 0.05, seed=None,
+                   from_git: bool = False, rev: str = GIT_REV, techniques=DEFAULT_TECHNIQUES):
+    listing, local_modules, _ = list_repo_files(roots, from_git, rev)
+    files = [(repo_name, source, lang, category, size)
+             for repo_name, _, source, lang, category, size, _ in listing]
 
-# Store language & category summaries
-report["_languages"] = dict(language_stats)
-report["_categories"] = dict(category_stats)
+    strata = stratify(files)
+    sample = draw_sample(strata, allocate(strata, fraction), random.Random(seed))
+    print(f"Sampling {sum(len(s) for s in sample.values())} of {len(files)} files "
+          f"in {len(strata)} strata")
+
+    observed = {}
+    for key, chosen in sample.items():
+        observed[key] = []
+        for repo_name, source, lang, _, size in chosen:
+            metrics = analyze_source(source, lang, local_modules[repo_name], techniques)
+            values, imports = file_values(metrics)
+            observed[key].append((size, values, imports))
+    return build_estimate_report(strata, observed, fraction)
 
 # -------------------------------------------------------
-# PYTHON SUMMARY
+# REPORT ASSEMBLY
 # -------------------------------------------------------
-py = language_stats.get("python", None)
+# The report is built from three kinds of sections:
+#
+#   per repo    one entry per repo (build_repo_section)
+#   summary     _global, _languages, ... read off the running totals, so
+#               cheap whatever the corpus size (build_summary_sections)
+#   derived     _clones, computed over every file (build_derived_sections)
+#
+# watch.py rebuilds only the repos a change touched plus the summary,
+# and refreshes the derived sections and indexes on a slower timer.
 
-if py and py["total_loc"] > 0:
-    comment_ratio = py["total_comments"] / py["total_loc"]
-else:
-    comment_ratio = 0.0
+def build_repo_section(entry):
+    section = {
+        "total_loc": entry["total_loc"],
+        "total_functions": entry["total_functions"],
+        "num_source_files": len(entry["files"]),
+        "imports": entry["imports"].most_common(),
+        "files": entry["files"],
+        "skipped": entry["skipped"],
+    }
+    # Where the repo was found (root name and folder)
+    for key in ("root", "path"):
+        if key in entry:
+            section[key] = entry[key]
+    return section
 
-python_summary = {
-    "python_loc": py["total_loc"] if py else 0,
-    "python_files": py["num_files"] if py else 0,
-    "python_functions": py["total_functions"] if py else 0,
-    "avg_cyclomatic_complexity": (
-        py["total_radon_complexity"] / py["num_files"]
-        if py and py["num_files"] > 0 else 0
-    ),
-    "comment_ratio": comment_ratio,
-}
+def build_summary_sections(repos, totals):
+    report = {}
+    total_source_files = totals["total_source_files"]
+    global_imports = totals["global_imports"]
+    relative_imports = {
+        m: c / total_source_files for m, c in global_imports.items()
+    } if total_source_files else {}
 
-with open(RESULTS_DIR / "python_summary.json", "w") as f:
-    json.dump(python_summary, f, indent=2)
+    report["_global"] = {
+        "total_source_files": total_source_files,
+        "total_loc": totals["total_loc"],
+        "total_functions": totals["total_functions"],
+        "global_import_counts": global_imports.most_common(),
+        "global_import_relative_freq": sorted(relative_imports.items(), key=lambda x: -x[1]),
+        "num_skipped_files": sum(totals["skipped_files"].values()),
+        "skipped_files": dict(totals["skipped_files"]),
+    }
+    if totals["approx"]:
+        report["_global"]["import_count_bounds"] = global_imports.bounds()
 
-print("✓ python_summary.json written")
+    # Store language & category summaries
+    report["_languages"] = {k: v for k, v in totals["language_stats"].items() if v["num_files"] > 0}
+    report["_categories"] = {k: v for k, v in totals["category_stats"].items() if v["total_files"] > 0}
+    if "jupyter" in report["_languages"]:
+        report["_notebooks"] = dict(totals["notebook_stats"],
+                                    num_notebooks=report["_languages"]["jupyter"]["num_files"])
+    report["_distributions"] = build_distribution_section(totals, repos)
+    report["_techniques"] = list(totals["techniques"])
+    return report
+
+def build_derived_sections(repos):
+    return {"_clones": build_clone_section(repos)}
+
+def build_report(repos, totals):
+    report = {name: build_repo_section(entry) for name, entry in repos.items()}
+    report.update(build_summary_sections(repos, totals))
+    report.update(build_derived_sections(repos))
+    return report
+
+def build_python_summary(totals):
+    py = totals["language_stats"].get("python", None)
+
+    if py and py["total_loc"] > 0:
+        comment_ratio = py["total_comments"] / py["total_loc"]
+    else:
+        comment_ratio = 0.0
+
+    return {
+        "python_loc": py["total_loc"] if py else 0,
+        "python_files": py["num_files"] if py else 0,
+        "python_functions": py["total_functions"] if py else 0,
+        "avg_cyclomatic_complexity": (
+            py["total_radon_complexity"] / py["num_files"]
+            if py and py["num_files"] > 0 else 0
+        ),
+        "comment_ratio": comment_ratio,
+    }
+
+def write_json(obj, path: Path, indent=2):
+    # Write to a temp file first so readers never see a half-written report
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=indent)
+    os.replace(tmp, path)
+
+def write_indexes(report, results_dir: Path = RESULTS_DIR):
+    """Cross-repo indexes derived from the whole report."""
+    write_function_index(build_function_index(report), results_dir / "functions_index.json")
+    write_json(build_duplicate_index(report), results_dir / "function_duplicates.json", indent=None)
+    write_call_graph(build_call_graph(report), results_dir / "call_graph.json")
+
+def write_reports(repos, totals, results_dir: Path = RESULTS_DIR, compression=None):
+    """compression: None (indented analysis.json), "gzip" or "zstd" (see report_io.py)."""
+    results_dir.mkdir(exist_ok=True)
+    write_json(build_python_summary(totals), results_dir / "python_summary.json")
+    report = build_report(repos, totals)
+    write_report(report, results_dir / "analysis.json", compression)
+    write_indexes(report, results_dir)
+    return report
 
 # -------------------------------------------------------
-# SAVE FULL REPORT
+# MAIN
 # -------------------------------------------------------
-with open(RESULTS_DIR / "analysis.json", "w") as f:
-    json.dump(report, f, indent=2)
+def main(estimate: float = None, seed: int = None, approx: bool = False, compression=None,
+         resume: bool = False, workers: int = 1, from_git: bool = False, rev: str = GIT_REV,
+         config: dict = None):
+    config = config or CONFIG
+    roots, results_dir = config["roots"], config["results_dir"]
+    techniques = load_techniques(config["techniques"])
+    if estimate:
+        # Quick extrapolated totals; the exact reports and history are untouched
+        report = estimate_repos(roots, estimate, seed, from_git, rev, techniques)
+        results_dir.mkdir(exist_ok=True)
+        write_json(report, results_dir / "analysis_estimate.json")
+        for key in ("global/_/total_loc", "global/_/total_functions"):
+            iv = report["_estimate"]["intervals"][key]
+            print(f"{key:28s} {iv['estimate']:12.0f}  [{iv['low']:.0f}, {iv['high']:.0f}]")
+        print("✓ analysis_estimate.json written")
+        return
+
+    # Every analyzed file is checkpointed, so --resume can pick up after a crash
+    results_dir.mkdir(exist_ok=True)
+    checkpoint = ScanCheckpoint(results_dir / "scan_checkpoint.jsonl",
+                                {"roots": [[str(r["path"]), sorted(r["exclude"])] for r in roots],
+                                 "approx": approx, "from_git": from_git, "rev": rev,
+                                 "techniques": techniques}, resume)
+    repos, totals = scan_repos(roots, approx, checkpoint, workers, from_git, rev, techniques)
+    checkpoint.flush()
+    report = write_reports(repos, totals, results_dir, compression)
+    checkpoint.close(finished=True)
+    print("✓ python_summary.json written")
+
+    # Per-batch timings of the analysis stage (see scheduler.py)
+    write_json(totals["schedule"], results_dir / "scan_batches.json")
+    summary = totals["schedule"]["summary"]
+    if summary["batches"]:
+        print(f"Scheduler: {summary['batches']} batches, {summary['wall_seconds']:.1f}s wall, "
+              f"utilization {summary['utilization']:.0%}, "
+              f"p95 batch {summary['batch_seconds_p95']:.2f}s, tail {summary['tail_seconds']:.2f}s")
+
+    # One delta-encoded line per run, for trend plots (see history.py)
+    append_snapshot(results_dir / "history.jsonl", flatten_aggregates(report))
+
+    print("\nDone. Languages:", list(totals["language_stats"].keys()))
+    print("Categories:", list(totals["category_stats"].keys()))
+
+    print("\n=== FULL IMPORT LIST (raw, unfiltered) ===")
+    for mod, count in totals["global_imports"].most_common():
+        print(f"{mod:20s}  {count}")
 
-print("\nDone. Languages:", list(language_stats.keys()))
-print("Categories:", list(category_stats.keys()))
 
-print("\n=== FULL IMPORT LIST (raw, unfiltered) ===")
-for mod, count in global_imports.most_common():
-    print(f"{mod:20s}  {count}")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan the configured roots and write the analysis reports.")
+    parser.add_argument("--estimate", type=float, metavar="FRACTION",
+                        help="analyze only a stratified sample of this fraction of files "
+                             "and write extrapolated totals to analysis_estimate.json")
+    parser.add_argument("--seed", type=int, help="random seed for --estimate")
+    parser.add_argument("--approx", action="store_true",
+                        help="count imports with fixed-memory sketches (see heavy_hitters.py)")
+    parser.add_argument("--compress", choices=["gzip", "zstd"],
+                        help="write analysis.json.gz / .zst with compact separators")
+    parser.add_argument("--resume", action="store_true",
+                        help="reuse files analyzed by an interrupted run (scan_checkpoint.jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="analysis processes (1 = no pool)")
+    parser.add_argument("--from-git", action="store_true",
+                        help="read every clone from its git objects, not just bare clones")
+    parser.add_argument("--rev", default=GIT_REV, help="revision analyzed in git-backed repos")
+    parser.add_argument("--config", type=Path,
+                        help="configuration file (default: metacode.json, see config.py)")
+    args = parser.parse_args()
+    main(estimate=args.estimate, seed=args.seed, approx=args.approx, compression=args.compress,
+         resume=args.resume, workers=max(1, args.workers), from_git=args.from_git, rev=args.rev,
+         config=load_config(args.config) if args.config else None)
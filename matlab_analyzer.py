@@ -0,0 +1,349 @@
+import re
+from collections import Counter
+
+# =========================================================
+# MATLAB TOKENIZER
+# =========================================================
+# One regex scan over the file. Block comments (%{ ... %} on lines of
+# their own, nestable) are skipped with a second regex from the
+# opening line; everything else is a single token.
+
+TOKEN_RE = re.compile(r"""
+    (?P<block>^[ \t]*%\{[ \t]*\r?$)
+  | (?P<comment>%[^\n]*)
+  | (?P<cont>\.\.\.[^\n]*\n)
+  | (?P<newline>\n)
+  | (?P<ws>[ \t\r]+)
+  | (?P<dq>"(?:[^"\n]|"")*")
+  | (?P<quote>')
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?[ij]?)
+  | (?P<name>[A-Za-z]\w*(?:\.[A-Za-z]\w*)*)
+  | (?P<op>&&|\|\||==|~=|<=|>=|\.'|\.\*|[()\[\]{};,=])
+  | (?P<other>.)
+""", re.VERBOSE | re.MULTILINE)
+
+BLOCK_LINE_RE = re.compile(r"^[ \t]*%([{}])[ \t]*\r?$", re.MULTILINE)
+SQ_STRING_RE = re.compile(r"'(?:[^'\n]|'')*'")
+
+CONTROL = {"if", "for", "parfor", "while", "switch", "try", "spmd"}
+CLASS_SECTIONS = {"properties", "methods", "events", "enumeration"}
+BRANCHES = {"if", "elseif", "for", "parfor", "while", "case", "catch"}
+KEYWORDS = CONTROL | {
+    "function", "classdef", "end", "else", "elseif", "case", "otherwise",
+    "catch", "break", "continue", "return", "global", "persistent", "import",
+}
+# Tokens after which a quote is the transpose operator, not a string
+VALUE_END = {"name", "number", ")", "]", "}", "'", ".'"}
+
+# Functions that identify a toolbox dependency
+TOOLBOX_FUNCTIONS = {
+    "signal": {"butter", "cheby1", "filtfilt", "designfilt", "pwelch", "spectrogram",
+               "hilbert", "resample", "periodogram", "findpeaks", "decimate"},
+    "stats": {"fitglm", "fitlm", "fitlme", "anova1", "anovan", "ranova", "ttest", "ttest2",
+              "ranksum", "signrank", "kstest", "fitcsvm", "kmeans", "pdist", "prctile",
+              "normrnd", "bootstrp", "multcompare"},
+    "images": {"imresize", "imfilter", "imrotate", "bwlabel", "regionprops", "imgaussfilt",
+               "imbinarize", "imadjust"},
+    "optim": {"fmincon", "fminunc", "lsqnonlin", "lsqcurvefit", "linprog", "quadprog"},
+    "curvefit": {"fit", "fittype", "fitoptions"},
+    "parallel": {"parpool", "gcp", "parfeval"},
+    "psychtoolbox": {"Screen", "KbCheck", "KbWait", "PsychImaging", "PsychPortAudio",
+                     "GetSecs", "WaitSecs", "Priority"},
+}
+TOOLBOX_OF = {fn: tb for tb, fns in TOOLBOX_FUNCTIONS.items() for fn in fns}
+
+# =========================================================
+# SIGNATURES
+# =========================================================
+def parse_function_signature(sig):
+    """
+    (name, outputs, params) from the tokens after `function`:
+    `[a, b] = name(x, y)`, `out = name(x)` or `name(x)`.
+    """
+    values = [v for _, v in sig]
+    if "=" in values:
+        eq = values.index("=")
+        outs = [v for k, v in sig[:eq] if k == "name"]
+        rest = sig[eq + 1:]
+    else:
+        outs, rest = [], sig
+    names = [v for k, v in rest if k == "name"]
+    if not names:
+        return None, outs, []
+    return names[0], outs, names[1:]
+
+def parse_class_name(stmt):
+    """Class name from `classdef (Attrs) Name < Super` tokens."""
+    depth = 0
+    for kind, value in stmt[1:]:
+        if value == "(":
+            depth += 1
+        elif value == ")":
+            depth -= 1
+        elif kind == "name" and depth == 0:
+            return value
+    return None
+
+# =========================================================
+# ANALYSIS
+# =========================================================
+def analyze_matlab_text(text: str) -> dict:
+    """
+    Tokenize MATLAB source once and return function records (rows in
+    function_index.FUNCTION_FIELDS order), classes, call sites, `import` / toolbox
+    usage, addpath targets, full-line comment count and cyclomatic
+    complexity (1 + if/elseif/for/while/case/catch + && + || per function).
+    """
+    functions = []
+    classes = []
+    # Open blocks as (kind, index, control depth); kind is one of
+    # "function" (index into functions), "class" (index into classes),
+    # "block" (if/for/...) or "section" (properties/methods/arguments).
+    stack = []
+    call_sites = []
+    variables = set()
+    imports = Counter()
+    addpaths = []
+    comment_lines = set()
+    decision_points = 0
+
+    line = 1
+    parens = 0              # ( / { depth: an `end` inside is an index
+    brackets = 0            # [ depth
+    prev = None             # previous significant token, for quote handling
+    stmt = []               # (kind, value) tokens of the current statement
+    line_has_code = False   # any significant token on the current line
+    pending = None          # (name, at statement start) awaiting next token
+    addpath_depth = None    # paren depth of an open addpath(...)
+    func_sig = None         # tokens of a `function ...` statement
+    func_line = 0
+
+    def innermost(kind):
+        for k, idx, _ in reversed(stack):
+            if k == kind:
+                return idx
+        return None
+
+    def add_decision():
+        nonlocal decision_points
+        decision_points += 1
+        fi = innermost("function")
+        if fi is not None:
+            functions[fi][4] += 1
+
+    def resolve_pending(next_tok):
+        # A name is a call site if "(" follows, or if it starts a
+        # statement in command syntax (`clc`, `hold on`, `disp 'x'`).
+        nonlocal pending
+        if pending is None:
+            return
+        name, at_start = pending
+        pending = None
+        if next_tok == "(" or (at_start and next_tok in ("name", "string", "number", ";")):
+            call_sites.append(name)
+
+    def open_function():
+        name, outs, params = parse_function_signature(func_sig)
+        variables.update(outs)
+        variables.update(params)
+        if name is None:
+            return
+        parent = innermost("function")
+        cls = innermost("class")
+        if parent is not None:
+            qualname = functions[parent][0] + "/" + name
+        elif cls is not None and classes[cls]:
+            qualname = classes[cls] + "." + name
+        else:
+            qualname = name
+        # [name, start, end, length, complexity, num_args, nesting]
+        functions.append([qualname, func_line, None, 0, 1, len(params), 0])
+        stack.append(("function", len(functions) - 1, 0))
+
+    def end_statement():
+        nonlocal stmt, func_sig
+        if func_sig is not None:
+            open_function()
+            func_sig = None
+        if stmt and stmt[0] == ("name", "classdef"):
+            classes.append(parse_class_name(stmt))
+            stack.append(("class", len(classes) - 1, 0))
+        stmt = []
+
+    pos = 0
+    n = len(text)
+    while pos < n:
+        m = TOKEN_RE.match(text, pos)
+        kind = m.lastgroup
+        value = m.group()
+        pos = m.end()
+
+        if kind == "ws":
+            prev = "ws"
+            continue
+
+        if kind == "block":
+            start_line = line
+            depth = 1
+            for bm in BLOCK_LINE_RE.finditer(text, pos):
+                depth += 1 if bm.group(1) == "{" else -1
+                if depth == 0:
+                    pos = bm.end()
+                    break
+            else:
+                pos = n
+            line += text.count("\n", m.start(), pos)
+            comment_lines.update(range(start_line, line + 1))
+            continue
+
+        if kind == "comment":
+            if not line_has_code:
+                comment_lines.add(line)
+            continue
+
+        if kind == "cont":
+            line += 1
+            line_has_code = False
+            continue
+
+        line_has_code = kind != "newline"
+
+        if kind == "quote":
+            if prev in VALUE_END:
+                kind = "op"
+            else:
+                sm = SQ_STRING_RE.match(text, m.start())
+                if sm:
+                    pos = sm.end()
+                    value = sm.group()
+                kind = "sq"
+
+        # ---- statement boundaries ----
+        if kind == "newline" or (value in (";", ",") and kind == "op"
+                                 and parens == 0 and brackets == 0):
+            resolve_pending(";")
+            end_statement()
+            if kind == "newline":
+                line += 1
+            prev = None
+            continue
+
+        if kind == "op":
+            tok = value
+        elif kind in ("sq", "dq"):
+            tok = "string"
+        else:
+            tok = kind
+        resolve_pending(tok)
+
+        # ---- keywords ----
+        if kind == "name" and value in KEYWORDS and func_sig is None:
+            if value == "end":
+                if parens == 0 and stack:
+                    k, idx, _ = stack.pop()
+                    if k == "function":
+                        functions[idx][2] = line
+            elif value == "function":
+                func_sig = []
+                func_line = line
+            elif value in CONTROL:
+                depth = (stack[-1][2] if stack else 0) + 1
+                stack.append(("block", None, depth))
+                fi = innermost("function")
+                if fi is not None:
+                    functions[fi][6] = max(functions[fi][6], depth)
+            if value in BRANCHES:
+                add_decision()
+            tok = "keyword"
+
+        # ---- class sections / argument blocks ----
+        elif (kind == "name" and not stmt and stack
+              and ((value in CLASS_SECTIONS and stack[-1][0] == "class")
+                   or (value == "arguments" and stack[-1][0] == "function"))):
+            stack.append(("section", None, 0))
+            tok = "keyword"
+
+        # ---- names ----
+        elif kind == "name":
+            if func_sig is not None:
+                func_sig.append((kind, value))
+            elif stmt and stmt[0] == ("name", "import"):
+                imports[value.split(".")[0]] += 1
+            elif stack and stack[-1][0] == "section":
+                # properties / arguments / events / enumeration declare
+                # names (`x`, `x (1,1) double = 0`); none of them is a call
+                pass
+            elif not (stmt and stmt[0] == ("name", "classdef")):
+                pending = (value, not stmt)
+                if value == "addpath":
+                    addpath_depth = parens + 1
+
+        # ---- operators ----
+        elif kind == "op":
+            if func_sig is not None:
+                func_sig.append((kind, value))
+            if value in ("&&", "||"):
+                add_decision()
+            elif value in ("(", "{"):
+                parens += 1
+            elif value in (")", "}"):
+                parens = max(0, parens - 1)
+                if addpath_depth is not None and parens < addpath_depth:
+                    addpath_depth = None
+            elif value == "[":
+                brackets += 1
+            elif value == "]":
+                brackets = max(0, brackets - 1)
+            elif value == "=" and parens == 0 and brackets == 0 and func_sig is None:
+                # Assignment: `x = ...`, `x(i) = ...`, `[a, b] = ...`
+                lhs = [v for k, v in stmt if k == "name"]
+                if stmt and stmt[0] == ("op", "["):
+                    variables.update(v.split(".")[0] for v in lhs)
+                elif lhs:
+                    variables.add(lhs[0].split(".")[0])
+
+        elif kind in ("sq", "dq") and addpath_depth is not None:
+            addpaths.append(value[1:-1])
+
+        stmt.append((kind, value))
+        prev = tok
+
+    resolve_pending(";")
+    end_statement()
+
+    # Functions not closed by `end` (the older one-function-per-block
+    # style): un-nest them and end each where the next one begins.
+    last_line = line - 1 if text.endswith("\n") else line
+    if any(f[2] is None for f in functions):
+        for i, f in enumerate(functions):
+            f[0] = f[0].rsplit("/", 1)[-1]
+            if f[2] is None:
+                f[2] = functions[i + 1][1] - 1 if i + 1 < len(functions) else last_line
+    for f in functions:
+        f[3] = f[2] - f[1] + 1
+
+    calls = [c for c in call_sites if c.split(".")[0] not in variables]
+    for c in calls:
+        toolbox = TOOLBOX_OF.get(c)
+        if toolbox:
+            imports[toolbox] += 1
+
+    cc_values = [f[4] for f in functions]
+    total_cc = float(sum(cc_values))
+    return {
+        "functions": functions,
+        "function_names": [f[0].rsplit("/", 1)[-1].rsplit(".", 1)[-1] for f in functions],
+        "num_classes": len([c for c in classes if c]),
+        "function_calls": calls,
+        "imports": dict(imports),
+        "addpath": addpaths,
+        "num_comments": len(comment_lines),
+        "decision_points": decision_points,
+        "complexity": {
+            "avg_cc": total_cc / len(cc_values) if cc_values else 0.0,
+            "max_cc": float(max(cc_values)) if cc_values else 0.0,
+            "total_cc": total_cc,
+            "num_entities": len(cc_values),
+            "cc_values": cc_values,
+        },
+    }
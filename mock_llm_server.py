@@ -0,0 +1,159 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# =========================================================
+# MOCK OPENAI-COMPATIBLE SERVER
+# =========================================================
+# A stand-in for the chat completions API, so llm_report.py can be run
+# and tested offline:
+#
+#   python mock_llm_server.py --port 8766
+#   OPENAI_BASE_URL=http://127.0.0.1:8766/v1 python llm_report.py .
+#
+# Answers are deterministic: the first words of the last user message
+# plus its size, with token usage estimated as characters / 4. Every
+# request is counted, so tests can check what was (not) re-sent.
+#
+# To exercise llm_client.py, the server can also be slow (--latency,
+# --jitter) and answer every Nth request with 429 + Retry-After
+# (--rate-limit-every, --retry-after). Peak concurrency is recorded.
+
+HOST = "127.0.0.1"
+PORT = 8766
+CHARS_PER_TOKEN = 4
+ECHO_WORDS = 12
+
+def mock_answer(messages, model: str, max_tokens: int = None):
+    prompt = messages[-1]["content"] if messages else ""
+    words = prompt.split()
+    text = (f"[mock {model}] {len(prompt)} chars, {len(prompt.splitlines())} lines: "
+            + " ".join(words[:ECHO_WORDS]))
+    if max_tokens:
+        text = text[:max_tokens * CHARS_PER_TOKEN]
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    usage = {
+        "prompt_tokens": prompt_chars // CHARS_PER_TOKEN + 1,
+        "completion_tokens": len(text) // CHARS_PER_TOKEN + 1,
+    }
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    return text, usage
+
+class MockStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.attempts = 0
+        self.rate_limited = 0
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+
+    def begin(self) -> int:
+        """Count an incoming request; returns its 1-based number."""
+        with self.lock:
+            self.attempts += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            return self.attempts
+
+    def end(self, limited: bool = False):
+        with self.lock:
+            self.active -= 1
+            self.rate_limited += limited
+
+    def record(self, prompt: str, usage: dict):
+        with self.lock:
+            self.requests += 1
+            self.prompt_tokens += usage["prompt_tokens"]
+            self.prompts.append(prompt)
+
+def make_handler(stats: MockStats, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit_every: int = 0, retry_after: float = 1.0):
+
+    class MockHandler(BaseHTTPRequestHandler):
+
+        def send_json(self, status, obj, headers=None):
+            body = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self.send_json(404, {"error": {"message": f"no route {self.path}"}})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                req = json.loads(self.rfile.read(length))
+                messages = req["messages"]
+            except (ValueError, KeyError) as e:
+                return self.send_json(400, {"error": {"message": f"bad request: {e}"}})
+
+            n = stats.begin()
+            limited = bool(rate_limit_every) and n % rate_limit_every == 0
+            try:
+                time.sleep(latency + random.uniform(0, jitter))
+            finally:
+                stats.end(limited)
+            if limited:
+                return self.send_json(429, {"error": {"message": "rate limit (mock)"}},
+                                      {"Retry-After": str(retry_after)})
+
+            model = req.get("model", "mock")
+            text, usage = mock_answer(messages, model, req.get("max_tokens"))
+            stats.record(messages[-1]["content"] if messages else "", usage)
+            self.send_json(200, {
+                "id": f"chatcmpl-mock-{stats.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return MockHandler
+
+def make_mock_server(host: str = HOST, port: int = PORT, latency: float = 0.0, jitter: float = 0.0,
+                     rate_limit_every: int = 0, retry_after: float = 1.0):
+    """Build (but do not start) the server; port=0 picks a free port. Stats are on server.stats."""
+    stats = MockStats()
+    server = ThreadingHTTPServer((host, port), make_handler(stats, latency, jitter,
+                                                            rate_limit_every, retry_after))
+    server.stats = stats
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI-compatible chat completions API.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds, up to this")
+    parser.add_argument("--rate-limit-every", type=int, default=0, metavar="N",
+                        help="answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                        help="Retry-After seconds sent with 429s")
+    args = parser.parse_args()
+
+    server = make_mock_server(args.host, args.port, args.latency, args.jitter,
+                              args.rate_limit_every, args.retry_after)
+    print(f"Mock LLM API on http://{args.host}:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,250 @@
+import ast
+import json
+import re
+
+# =========================================================
+# STREAMING NOTEBOOK READER
+# =========================================================
+# .ipynb files are JSON, but most of their bytes are cell outputs
+# (base64 PNGs, HTML tables, long tracebacks). JsonStream reads the file
+# in chunks and walks it token by token, so "outputs" can be stepped
+# over without ever building the strings they contain. Only cell types
+# and cell sources are decoded.
+
+CHUNK_SIZE = 1 << 16
+
+# Separators carry no information for a well-formed file, so ',' and
+# ':' are skipped together with whitespace.
+SKIP_RE = re.compile(r"[\s,:]*")
+LITERAL_RE = re.compile(r"[^\s,:\]\}]+")
+STRING_STOP_RE = re.compile(r'["\\]')
+
+class JsonStream:
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping what has been consumed. False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next significant character ('' at EOF), without consuming it."""
+        while True:
+            self.pos = SKIP_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def _scan_string(self, keep: bool):
+        """
+        Consume a string whose opening quote is at self.pos. Returns its
+        decoded value if keep, else the number of characters skipped.
+        """
+        self.pos += 1
+        pieces = []
+        skipped = 0
+        while True:
+            m = STRING_STOP_RE.search(self.buf, self.pos)
+            if m is None or (m.group() == "\\" and m.end() >= len(self.buf)):
+                # Ran off the buffer (or an escape is split across chunks)
+                end = m.start() if m else len(self.buf)
+                if keep:
+                    pieces.append(self.buf[self.pos:end])
+                skipped += end - self.pos
+                self.pos = end
+                if not self._fill():
+                    raise ValueError("unterminated string")
+                continue
+            if m.group() == "\\":
+                if keep:
+                    pieces.append(self.buf[self.pos:m.end() + 1])
+                skipped += m.end() + 1 - self.pos
+                self.pos = m.end() + 1
+                continue
+            if keep:
+                pieces.append(self.buf[self.pos:m.start()])
+            skipped += m.start() - self.pos
+            self.pos = m.end()
+            if keep:
+                return json.loads('"' + "".join(pieces) + '"')
+            return skipped
+
+    def read_string(self) -> str:
+        if self.peek() != '"':
+            raise ValueError(f"expected a string at offset {self.pos}")
+        return self._scan_string(keep=True)
+
+    def read_literal(self) -> str:
+        self.peek()
+        while True:
+            m = LITERAL_RE.match(self.buf, self.pos)
+            if m.end() < len(self.buf) or not self._fill():
+                break
+        m = LITERAL_RE.match(self.buf, self.pos)
+        self.pos = m.end()
+        return m.group()
+
+    def skip_value(self) -> int:
+        """Step over one value of any size. Returns the characters skipped."""
+        skipped = 0
+        depth = 0
+        while True:
+            c = self.peek()
+            if c == "":
+                raise ValueError("unexpected end of file")
+            if c == '"':
+                skipped += self._scan_string(keep=False) + 2
+            elif c in "[{":
+                self.pos += 1
+                skipped += 1
+                depth += 1
+            elif c in "]}":
+                self.pos += 1
+                skipped += 1
+                depth -= 1
+            else:
+                skipped += len(self.read_literal())
+            if depth == 0:
+                return skipped
+
+    def read_source(self):
+        """A cell source: one string, or a list of line strings."""
+        if self.peek() == "[":
+            self.pos += 1
+            parts = []
+            while self.peek() != "]":
+                parts.append(self.read_string())
+            self.pos += 1
+            return "".join(parts)
+        if self.peek() == '"':
+            return self.read_string()
+        self.skip_value()
+        return ""
+
+    def iter_object(self):
+        """Yield the keys of an object; the caller consumes each value."""
+        self.expect("{")
+        while self.peek() != "}":
+            yield self.read_string()
+        self.pos += 1
+
+    def iter_array(self):
+        """Yield once per array element; the caller consumes each element."""
+        self.expect("[")
+        while self.peek() != "]":
+            yield
+        self.pos += 1
+
+# ---------------------------------------------------------
+# CELLS
+# ---------------------------------------------------------
+def iter_cells(stream: JsonStream):
+    """
+    Yield (cell_type, source, output_chars) for every cell. Handles
+    nbformat 4 ("cells") and nbformat 3 ("worksheets" -> "cells", with
+    code in "input").
+    """
+    def cells():
+        for _ in stream.iter_array():
+            cell_type, source, output_chars = "code", "", 0
+            for key in stream.iter_object():
+                if key == "cell_type":
+                    cell_type = stream.read_string()
+                elif key in ("source", "input"):
+                    source = stream.read_source()
+                else:
+                    # outputs, metadata, attachments, ...
+                    size = stream.skip_value()
+                    if key == "outputs":
+                        output_chars += size
+            yield cell_type, source, output_chars
+
+    for key in stream.iter_object():
+        if key == "cells":
+            yield from cells()
+        elif key == "worksheets":
+            for _ in stream.iter_array():
+                for ws_key in stream.iter_object():
+                    if ws_key == "cells":
+                        yield from cells()
+                    else:
+                        stream.skip_value()
+        else:
+            stream.skip_value()
+
+# =========================================================
+# CODE EXTRACTION
+# =========================================================
+# IPython syntax is not Python: line magics (%matplotlib), shell escapes
+# (!pip), help (obj?) and cell magics (%%bash, %%time) are commented out
+# so ast.parse accepts the cell and line numbers stay aligned.
+
+MAGIC_LINE_RE = re.compile(r"^(\s*)([%!]|\w[\w.]*\?\??\s*$|\?)")
+# Cell magics whose body is still Python
+PYTHON_CELL_MAGICS = {"time", "timeit", "capture", "prun", "debug"}
+
+def neutralize_magics(source: str) -> str:
+    lines = source.splitlines()
+    if lines and lines[0].lstrip().startswith("%%"):
+        magic = lines[0].lstrip()[2:].split(" ", 1)[0]
+        if magic not in PYTHON_CELL_MAGICS:
+            return "\n".join("# " + l for l in lines)
+    return "\n".join(
+        m.group(1) + "# " + l[m.end(1):] if m else l
+        for l, m in ((l, MAGIC_LINE_RE.match(l)) for l in lines)
+    )
+
+CELL_STATS_FIELDS = (
+    "code_cells", "markdown_cells", "raw_cells", "empty_code_cells",
+    "code_lines", "markdown_lines", "output_chars", "unparsable_cells",
+)
+
+def read_notebook(f) -> dict:
+    """
+    Stream a notebook from an open text file. Returns the concatenated
+    code of all code cells (separated by a blank line; cells that do not
+    parse are commented out) and the cell statistics.
+    """
+    code_parts = []
+    stats = dict.fromkeys(CELL_STATS_FIELDS, 0)
+    for cell_type, source, output_chars in iter_cells(JsonStream(f)):
+        stats["output_chars"] += output_chars
+        n_lines = len(source.splitlines())
+        if cell_type == "code":
+            stats["code_cells"] += 1
+            if not source.strip():
+                stats["empty_code_cells"] += 1
+                continue
+            stats["code_lines"] += n_lines
+            code = neutralize_magics(source)
+            try:
+                ast.parse(code)
+            except SyntaxError:
+                # One broken cell must not hide the rest of the notebook
+                stats["unparsable_cells"] += 1
+                code = "\n".join("# " + l for l in code.splitlines())
+            code_parts.append(code)
+        elif cell_type == "markdown":
+            stats["markdown_cells"] += 1
+            stats["markdown_lines"] += n_lines
+        else:
+            stats["raw_cells"] += 1
+    return {"code": "\n\n".join(code_parts) + "\n" if code_parts else "", "cells": stats}
@@ -1,4 +1,3 @@
-import json
 from pathlib import Path
 import matplotlib.pyplot as plt
 from collections import Counter
@@ -6,28 +5,13 @@ import numpy as np
 from wordcloud import WordCloud
 import colorsys
 from matplotlib import cm
+from report_io import load_report
+from config import load_config
 
-BASE = Path("/Users/acalapai/Desktop/CodeAnalysis")
-RESULTS = BASE / "results"
+CONFIG = load_config()   # metacode.json (see config.py)
+RESULTS = CONFIG["results_dir"]
 ANALYSIS = RESULTS / "analysis.json"
 
-# ---------------------------------------------------------
-# CUSTOM IMPORTS TO HIDE (your internal modules)
-# ---------------------------------------------------------
-CUSTOM_IMPORTS = {
-    "utilities", "_utilities", "utils",
-    "config", "_webserver", "run_webserver",
-    "anc_mci_configuration", "_datalogger",
-    "touchtraining_v04", "doublereward_v01",
-    "dprime_2afc", "configurations",
-    "touchtraining_v03", "catchgame",
-    "thinkgame", "optionspage",
-    "_webserver_v02", "games",
-    "touchtraining_v05"
-}
-
-CUSTOM_IMPORTS = {c.lower() for c in CUSTOM_IMPORTS}
-
 # ---------------------------------------------------------
 # COLOR FIX FOR WORDCLOUD
 # ---------------------------------------------------------
@@ -46,8 +30,7 @@ def no_dark_purple(word, font_size, position, orientation, random_state=None, **
 # -------------------------
 # Load analysis.json
 # -------------------------
-with open(ANALYSIS, "r") as f:
-    data = json.load(f)
+data = load_report(ANALYSIS)   # also reads analysis.json.gz / .zst
 
 # ============================================
 # PYTHON SUMMARY
@@ -71,14 +54,11 @@ for repo, repo_data in data.items():
         if metrics["language"] != "python":
             continue
 
-        imports_raw = metrics.get("imports_third_party") or metrics.get("imports", {})
-
-        cleaned = {
+        # main.py already split stdlib / third-party / repo-local imports
+        import_counter.update({
             mod.lower(): count
-            for mod, count in imports_raw.items()
-            if mod.lower() not in CUSTOM_IMPORTS
-        }
-        import_counter.update(cleaned)
+            for mod, count in metrics.get("imports_third_party", {}).items()
+        })
 
 # ============================================
 # MATPLOTLIB STYLE
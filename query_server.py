@@ -0,0 +1,330 @@
+import argparse
+import json
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+from function_index import (
+    build_function_index, top_complex, distribution, build_duplicate_index, duplicates_in_repo,
+)
+from report_io import find_report, load_report
+from config import load_config
+
+# -----------------------------------------
+# PATHS
+# -----------------------------------------
+CONFIG = load_config()   # metacode.json (see config.py)
+RESULTS_DIR = CONFIG["results_dir"]
+ANALYSIS_FILE = RESULTS_DIR / "analysis.json"
+
+HOST = "127.0.0.1"
+PORT = 8765
+DEFAULT_TOP = 20
+
+# -----------------------------------------
+# QUERIES
+# -----------------------------------------
+# Every query takes the loaded report (or an index derived from it, see
+# INDEX_ROUTES) plus the (already parsed) query parameters and returns a
+# JSON-serialisable object.
+
+def iter_files(report, repo=None, lang=None):
+    for repo_name, repo_data in report.items():
+        if repo_name.startswith("_") or (repo and repo_name != repo):
+            continue
+        for rel_path, metrics in repo_data["files"].items():
+            if lang and metrics.get("language") != lang:
+                continue
+            yield repo_name, rel_path, metrics
+
+def q_summary(report, params):
+    return report.get("_global", {})
+
+def q_repos(report, params):
+    return [
+        {
+            "repo": name,
+            "total_loc": data["total_loc"],
+            "total_functions": data["total_functions"],
+            "num_source_files": data["num_source_files"],
+        }
+        for name, data in report.items() if not name.startswith("_")
+    ]
+
+def q_repo(report, params, name):
+    data = report.get(name)
+    if data is None or name.startswith("_"):
+        raise KeyError(name)
+
+    languages = Counter()
+    for _, _, metrics in iter_files(report, repo=name):
+        languages[metrics["language"]] += metrics["loc"]
+
+    return {
+        "repo": name,
+        "total_loc": data["total_loc"],
+        "total_functions": data["total_functions"],
+        "num_source_files": data["num_source_files"],
+        "loc_per_language": dict(languages.most_common()),
+        "imports": data["imports"][:params["top"]],
+    }
+
+def q_languages(report, params):
+    return report.get("_languages", {})
+
+def q_language(report, params, lang):
+    return report["_languages"][lang]
+
+def q_categories(report, params):
+    return report.get("_categories", {})
+
+def q_imports(report, params):
+    if not params["repo"] and not params["lang"]:
+        return report["_global"]["global_import_counts"][:params["top"]]
+
+    counter = Counter()
+    for _, _, metrics in iter_files(report, params["repo"], params["lang"]):
+        counter.update(metrics.get("imports", {}))
+    return counter.most_common(params["top"])
+
+def q_calls(report, params):
+    counter = Counter()
+    for _, _, metrics in iter_files(report, params["repo"], params["lang"]):
+        counter.update(metrics.get("function_calls", []))
+    return counter.most_common(params["top"])
+
+def q_complexity(report, params):
+    files = [
+        {
+            "repo": repo_name,
+            "file": rel_path,
+            "max_cc": metrics["complexity"]["max_cc"],
+            "avg_cc": metrics["complexity"]["avg_cc"],
+            "total_cc": metrics["complexity"]["total_cc"],
+            "decision_points": metrics["pseudo_complexity"]["decision_points"],
+        }
+        for repo_name, rel_path, metrics in iter_files(report, params["repo"], params["lang"])
+    ]
+    files.sort(key=lambda f: (-f["max_cc"], -f["decision_points"]))
+    return files[:params["top"]]
+
+def q_functions(index, params):
+    return top_complex(index, params["top"], params["repo"])
+
+def q_function_distribution(index, params, field):
+    return distribution(index, field)
+
+def q_distributions(report, params):
+    # Precomputed histograms / quantiles (distributions.py); older reports have none
+    section = report.get("_distributions")
+    if section is None:
+        raise KeyError("_distributions")
+    if params["repo"]:
+        return section["repos"][params["repo"]]
+    if params["lang"]:
+        return section["languages"][params["lang"]]
+    return section["global"]
+
+def q_clones(report, params):
+    # Near-duplicate clusters (clones.py), largest first; ?repo= keeps clusters touching it
+    section = report.get("_clones")
+    if section is None:
+        raise KeyError("_clones")
+    out = {}
+    for kind in ("files", "functions"):
+        clusters = section[kind]
+        if params["repo"]:
+            clusters = [c for c in clusters
+                        if any(m["repo"] == params["repo"] for m in c["members"])]
+        out[kind] = clusters[:params["top"]]
+    return out
+
+def q_duplicates(duplicates, params):
+    # Python functions with identical normalized bodies (function_index.py)
+    if params["repo"]:
+        return duplicates_in_repo(duplicates, params["repo"], params["top"])
+    return duplicates["groups"][:params["top"]]
+
+ROUTES = {
+    "summary": q_summary,
+    "repos": q_repos,
+    "languages": q_languages,
+    "categories": q_categories,
+    "imports": q_imports,
+    "calls": q_calls,
+    "complexity": q_complexity,
+    "distributions": q_distributions,
+    "clones": q_clones,
+}
+
+ITEM_ROUTES = {
+    "repos": q_repo,
+    "languages": q_language,
+}
+
+# Routes answered from an index derived from the report (built on first
+# use, see ReportStore.index) instead of the report itself
+INDEXES = {
+    "functions": build_function_index,
+    "duplicates": build_duplicate_index,
+}
+
+INDEX_ROUTES = {
+    "functions": ("functions", q_functions),
+    "duplicates": ("duplicates", q_duplicates),
+}
+
+INDEX_ITEM_ROUTES = {
+    "distribution": ("functions", q_function_distribution),
+}
+
+# -----------------------------------------
+# REPORT STORE (load once, cache answers)
+# -----------------------------------------
+class ReportStore:
+    """
+    Holds the parsed report, the indexes derived from it and a cache of
+    query answers. The report is re-read (and indexes and cache dropped)
+    only when the file's mtime changes, e.g. after main.py or watch.py
+    rewrote it.
+    """
+
+    def __init__(self, report_path: Path):
+        self.report_path = Path(report_path)
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.report = {}
+        self.indexes = {}
+        self.cache = {}
+
+    def current(self):
+        # The report may be plain or compressed (see report_io.py)
+        path = find_report(self.report_path)
+        mtime = (path, path.stat().st_mtime_ns)
+        with self.lock:
+            if mtime != self.mtime:
+                self.report = load_report(path)
+                self.mtime = mtime
+                self.indexes = {}
+                self.cache = {}
+            return self.report, self.indexes, self.cache
+
+    def index(self, name, report, indexes):
+        # Under the lock so concurrent first requests build it only once;
+        # `indexes` is the dict that belongs to `report`
+        with self.lock:
+            if name not in indexes:
+                indexes[name] = INDEXES[name](report)
+            return indexes[name]
+
+    def query(self, parts, params):
+        report, indexes, cache = self.current()
+        key = (tuple(parts), tuple(sorted(params.items())))
+        if key in cache:
+            return cache[key]
+
+        if len(parts) == 1 and parts[0] in ROUTES:
+            result = ROUTES[parts[0]](report, params)
+        elif len(parts) == 2 and parts[0] in ITEM_ROUTES:
+            result = ITEM_ROUTES[parts[0]](report, params, parts[1])
+        elif len(parts) == 1 and parts[0] in INDEX_ROUTES:
+            name, route = INDEX_ROUTES[parts[0]]
+            result = route(self.index(name, report, indexes), params)
+        elif len(parts) == 2 and parts[0] in INDEX_ITEM_ROUTES:
+            name, route = INDEX_ITEM_ROUTES[parts[0]]
+            result = route(self.index(name, report, indexes), params, parts[1])
+        else:
+            raise KeyError("/".join(parts))
+
+        body = json.dumps(result).encode()
+        with self.lock:
+            cache[key] = body
+        return body
+
+def parse_params(query: str):
+    qs = parse_qs(query)
+    return {
+        "top": int(qs.get("top", [DEFAULT_TOP])[0]),
+        "repo": qs.get("repo", [None])[0],
+        "lang": qs.get("lang", [None])[0],
+    }
+
+# -----------------------------------------
+# HTTP
+# -----------------------------------------
+def make_handler(store: ReportStore, results_dir: Path):
+
+    class QueryHandler(BaseHTTPRequestHandler):
+
+        def send_body(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_error_json(self, status, message):
+            self.send_body(status, json.dumps({"error": message}).encode(), "application/json")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+
+            if len(parts) == 2 and parts[0] == "plots":
+                return self.send_plot(parts[1])
+
+            try:
+                params = parse_params(url.query)
+            except ValueError:
+                return self.send_error_json(400, "top must be an integer")
+
+            try:
+                body = store.query(parts or ["summary"], params)
+            except KeyError as e:
+                return self.send_error_json(404, f"not found: {e.args[0]}")
+            except FileNotFoundError:
+                # No analysis.json yet (main.py has not finished a run)
+                return self.send_error_json(503, "no report available yet")
+            except Exception as e:
+                return self.send_error_json(500, f"{type(e).__name__}: {e}")
+            self.send_body(200, body, "application/json")
+
+        def send_plot(self, name):
+            path = results_dir / name
+            # Only plain PNG file names inside results_dir are served
+            if path.suffix.lower() != ".png" or path.name != name or not path.is_file():
+                return self.send_error_json(404, f"no such plot: {name}")
+            self.send_body(200, path.read_bytes(), "image/png")
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return QueryHandler
+
+def make_server(report_path: Path = ANALYSIS_FILE, results_dir: Path = RESULTS_DIR,
+                host: str = HOST, port: int = PORT):
+    """Build (but do not start) the server; port=0 picks a free port."""
+    store = ReportStore(report_path)
+    try:
+        store.current()
+    except FileNotFoundError:
+        pass               # served as 503 until the first report is written
+    return ThreadingHTTPServer((host, port), make_handler(store, Path(results_dir)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve analysis.json aggregates over HTTP.")
+    parser.add_argument("--report", type=Path, default=ANALYSIS_FILE)
+    parser.add_argument("--results", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    server = make_server(args.report, args.results, args.host, args.port)
+    print(f"Serving {args.report} on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,219 @@
+from pathlib import Path
+import numpy as np
+from report_io import find_report, load_report
+
+# =========================================================
+# COLUMNAR VIEW OF PER-FILE METRICS
+# =========================================================
+# The plot scripts used to walk every repo and file dict to build their
+# lists. ReportColumns does that walk once and keeps one NumPy array per
+# metric:
+#
+#   per file     repo, language (int codes), loc, num_comments, ...,
+#                avg_cc, max_cc
+#   flattened    cc_values, function_lengths, function_names, imports
+#                (one value per import statement, like Counter.update
+#                of the per-file counts), each with a <field>_file array
+#                giving the owning file
+#
+# Grouped sums / maxima / means, histograms, percentiles and name counts
+# are then single NumPy calls. load_columns caches the arrays next to the
+# report (analysis_columns.npz), so the walk only happens once per report.
+
+FILE_FIELDS = ("loc", "num_comments", "num_blank", "num_functions", "num_classes")
+CC_FIELDS = ("avg_cc", "max_cc", "total_cc")
+FLAT_FIELDS = ("cc_values", "function_lengths", "function_names", "imports")
+CACHE_NAME = "analysis_columns.npz"
+COLUMNS_VERSION = 2        # bump when the arrays change meaning (invalidates the cache)
+
+def flat_values(metrics, field):
+    if field == "cc_values":
+        return metrics.get("complexity", {}).get("cc_values", [])
+    if field == "function_lengths":
+        # length column of the function records (see function_index.FUNCTION_FIELDS)
+        return [r[3] for r in metrics.get("functions", [])]
+    if field == "imports":
+        # {module: count}: one value per import statement
+        return [module for module, count in metrics.get("imports", {}).items()
+                for _ in range(count)]
+    return metrics.get(field, [])
+
+class ReportColumns:
+    def __init__(self, arrays: dict):
+        self.arrays = arrays
+        self.repos = arrays["repo_names"].tolist()
+        self.languages = arrays["language_names"].tolist()
+
+    def __getitem__(self, field):
+        return self.arrays[field]
+
+    def __len__(self):
+        return len(self.arrays["repo"])
+
+    @classmethod
+    def from_report(cls, report: dict):
+        repos = [name for name in report if not name.startswith("_")]
+        languages = {}
+        repo_codes, lang_codes = [], []
+        per_file = {f: [] for f in FILE_FIELDS + CC_FIELDS}
+        flat = {f: [] for f in FLAT_FIELDS}
+        flat_counts = {f: [] for f in FLAT_FIELDS}
+
+        for code, name in enumerate(repos):
+            for metrics in report[name]["files"].values():
+                repo_codes.append(code)
+                lang_codes.append(languages.setdefault(metrics["language"], len(languages)))
+                for f in FILE_FIELDS:
+                    per_file[f].append(metrics.get(f, 0))
+                cc = metrics.get("complexity", {})
+                for f in CC_FIELDS:
+                    per_file[f].append(cc.get(f, 0))
+                for f in FLAT_FIELDS:
+                    values = flat_values(metrics, f)
+                    flat[f].extend(values)
+                    flat_counts[f].append(len(values))
+
+        n = len(repo_codes)
+        arrays = {
+            "repo_names": np.array(repos, dtype=str),
+            "language_names": np.array(list(languages), dtype=str),
+            "repo": np.array(repo_codes, dtype=np.int32),
+            "language": np.array(lang_codes, dtype=np.int32),
+        }
+        for f in FILE_FIELDS:
+            arrays[f] = np.array(per_file[f], dtype=np.int64)
+        for f in CC_FIELDS:
+            arrays[f] = np.array(per_file[f], dtype=np.float64)
+        for f in FLAT_FIELDS:
+            if f in ("function_names", "imports"):
+                arrays[f] = np.array(flat[f], dtype=str)
+            else:
+                arrays[f] = np.array(flat[f], dtype=np.float64)
+            arrays[f + "_file"] = np.repeat(np.arange(n, dtype=np.int32),
+                                            np.array(flat_counts[f], dtype=np.int64))
+        return cls(arrays)
+
+    # ---------------------------------------------------------
+    # CACHE
+    # ---------------------------------------------------------
+    def save(self, path: Path, source_mtime_ns: int = 0):
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(tmp, source_mtime_ns=np.int64(source_mtime_ns),
+                 columns_version=np.int64(COLUMNS_VERSION), **self.arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path):
+        with np.load(path) as npz:
+            if "columns_version" not in npz.files or int(npz["columns_version"]) != COLUMNS_VERSION:
+                raise ValueError(f"{path}: columns cache from another version")
+            arrays = {k: npz[k] for k in npz.files if k not in ("source_mtime_ns", "columns_version")}
+            return cls(arrays), int(npz["source_mtime_ns"])
+
+    # ---------------------------------------------------------
+    # SELECTION
+    # ---------------------------------------------------------
+    def code(self, by: str, name: str) -> int:
+        names = self.repos if by == "repo" else self.languages
+        return names.index(name) if name in names else -1
+
+    def mask(self, repo: str = None, language: str = None):
+        """Boolean per-file mask (all files if nothing is given)."""
+        m = np.ones(len(self), dtype=bool)
+        if repo is not None:
+            m &= self.arrays["repo"] == self.code("repo", repo)
+        if language is not None:
+            m &= self.arrays["language"] == self.code("language", language)
+        return m
+
+    def values(self, field: str, mask=None):
+        """A per-file or flattened column, restricted to the files in mask."""
+        values = self.arrays[field]
+        if mask is None:
+            return values
+        if field in FLAT_FIELDS:
+            return values[mask[self.arrays[field + "_file"]]]
+        return values[mask]
+
+    def counts_per_file(self, field: str):
+        """Number of flattened values each file contributes."""
+        return np.bincount(self.arrays[field + "_file"], minlength=len(self))
+
+    # ---------------------------------------------------------
+    # GROUPED AGGREGATES (by="repo" or "language")
+    # ---------------------------------------------------------
+    def group_size(self, by: str = "repo") -> int:
+        return len(self.repos if by == "repo" else self.languages)
+
+    def group_codes(self, field: str, by: str = "repo", mask=None):
+        """Group code of every value of `field` (per file or flattened)."""
+        codes = self.arrays[by]
+        if field in FLAT_FIELDS:
+            codes = codes[self.arrays[field + "_file"]]
+            if mask is not None:
+                return codes[mask[self.arrays[field + "_file"]]]
+            return codes
+        return codes if mask is None else codes[mask]
+
+    def group_count(self, field: str = "loc", by: str = "repo", mask=None):
+        return np.bincount(self.group_codes(field, by, mask), minlength=self.group_size(by))
+
+    def group_sum(self, field: str, by: str = "repo", mask=None):
+        return np.bincount(self.group_codes(field, by, mask), weights=self.values(field, mask),
+                           minlength=self.group_size(by))
+
+    def group_max(self, field: str, by: str = "repo", mask=None, empty=0.0):
+        out = np.full(self.group_size(by), -np.inf)
+        np.maximum.at(out, self.group_codes(field, by, mask), self.values(field, mask))
+        out[np.isneginf(out)] = empty
+        return out
+
+    def group_mean(self, field: str, by: str = "repo", mask=None, empty=0.0):
+        sums = self.group_sum(field, by, mask)
+        counts = self.group_count(field, by, mask)
+        out = np.full(len(sums), float(empty))
+        np.divide(sums, counts, out=out, where=counts > 0)
+        return out
+
+    # ---------------------------------------------------------
+    # DISTRIBUTIONS
+    # ---------------------------------------------------------
+    def histogram(self, field: str, bins=10, mask=None):
+        return np.histogram(self.values(field, mask), bins=bins)
+
+    def percentiles(self, field: str, qs=(50, 90, 99), mask=None):
+        values = self.values(field, mask)
+        if not len(values):
+            return np.zeros(len(qs))
+        return np.percentile(values, qs)
+
+    def most_common(self, field: str, n: int = None, mask=None):
+        """[(name, count), ...] for a string column, most frequent first."""
+        names, counts = np.unique(self.values(field, mask), return_counts=True)
+        order = np.argsort(-counts, kind="stable")[:n]
+        return list(zip(names[order].tolist(), counts[order].tolist()))
+
+# ---------------------------------------------------------
+# LOADER
+# ---------------------------------------------------------
+def load_columns(analysis_file: Path) -> ReportColumns:
+    """
+    Columns for the report at `analysis_file` (any compressed variant),
+    read from the .npz cache when it was built from the same report.
+    """
+    report_path = find_report(analysis_file)
+    mtime = report_path.stat().st_mtime_ns
+    cache = Path(analysis_file).with_name(CACHE_NAME)
+    try:
+        columns, cached_mtime = ReportColumns.load(cache)
+        if cached_mtime == mtime:
+            return columns
+    except (OSError, KeyError, ValueError):
+        pass
+    columns = ReportColumns.from_report(load_report(report_path))
+    try:
+        columns.save(cache, mtime)
+    except OSError:
+        pass
+    return columns
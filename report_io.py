@@ -0,0 +1,156 @@
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+
+# Try to import zstandard for .zst reports
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# =========================================================
+# REPORT FILES
+# =========================================================
+# analysis.json can be written as-is (indent=2, the default) or
+# compressed with compact separators as analysis.json.gz / .json.zst.
+# Writing streams the encoder's chunks straight into the compressor and
+# reading decompresses while json parses, so neither side holds the
+# compressed and uncompressed bytes at the same time.
+#
+# Loaders pass the plain "analysis.json" path; load_report picks
+# whichever variant exists (the newest, if several do). ReportWriter
+# rewrites the same file re-encoding only the entries that changed.
+
+SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+CHUNK_SIZE = 1 << 20
+
+def report_variants(path: Path):
+    path = Path(path)
+    return [path.with_name(path.name + s) for s in SUFFIXES.values()]
+
+def find_report(path: Path) -> Path:
+    """The existing variant of `path` with the newest mtime."""
+    existing = []
+    for p in report_variants(path):
+        try:
+            existing.append((p.stat().st_mtime_ns, p))
+        except OSError:
+            pass
+    if not existing:
+        raise FileNotFoundError(f"{path} not found (nor .gz / .zst). Run main.py first.")
+    return max(existing)[1]
+
+# ---------------------------------------------------------
+# WRITE
+# ---------------------------------------------------------
+def open_compressed_write(path: Path, compression):
+    if compression == "gzip":
+        return gzip.open(path, "wt", compresslevel=GZIP_LEVEL, encoding="utf-8")
+    if compression == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard not installed; use compression='gzip'")
+        raw = open(path, "wb")
+        writer = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(writer, encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+def report_encoder(compression=None):
+    if compression is None:
+        return json.JSONEncoder(indent=2)
+    return json.JSONEncoder(separators=(",", ":"))
+
+def write_chunks(chunks, path: Path, compression=None) -> Path:
+    """
+    Write the text chunks to `path` (plus .gz / .zst), atomically, and
+    remove the other variants so loaders never pick up a stale one.
+    Returns the path written.
+    """
+    if compression not in SUFFIXES:
+        raise ValueError(f"unknown compression: {compression!r}")
+    path = Path(path)
+    target = path.with_name(path.name + SUFFIXES[compression])
+    tmp = target.with_name(target.name + ".tmp")
+
+    with open_compressed_write(tmp, compression) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp, target)
+
+    for p in report_variants(path):
+        if p != target and p.exists():
+            p.unlink()
+    return target
+
+def write_report(obj, path: Path, compression=None) -> Path:
+    """Write `obj` as the report at `path` (see write_chunks)."""
+    return write_chunks(report_encoder(compression).iterencode(obj), path, compression)
+
+class ReportWriter:
+    """
+    Rewrites a report whose top-level entries change a few at a time
+    (watch.py). The JSON text of every entry is kept, so a write encodes
+    only the entries named as changed and copies the rest. The file is
+    the same as write_report would produce for the same dict.
+    """
+
+    def __init__(self, path: Path, compression=None):
+        if compression not in SUFFIXES:
+            raise ValueError(f"unknown compression: {compression!r}")
+        self.path = Path(path)
+        self.compression = compression
+        self.encoder = report_encoder(compression)
+        self.encoded = {}
+
+    def encode(self, value) -> str:
+        text = self.encoder.encode(value)
+        # Nested one level down: indent continuation lines
+        return text.replace("\n", "\n  ") if self.compression is None else text
+
+    def chunks(self, keys):
+        if not keys:
+            yield "{}"
+            return
+        if self.compression is None:
+            start, sep, colon, end = "{\n  ", ",\n  ", ": ", "\n}"
+        else:
+            start, sep, colon, end = "{", ",", ":", "}"
+        yield start
+        for i, key in enumerate(keys):
+            if i:
+                yield sep
+            yield json.dumps(key) + colon
+            yield self.encoded[key]
+        yield end
+
+    def write(self, report: dict, changed=None) -> Path:
+        """changed: top-level keys whose value changed since the last write (None = all)."""
+        for key in [k for k in self.encoded if k not in report]:
+            del self.encoded[key]
+        for key, value in report.items():
+            if changed is None or key in changed or key not in self.encoded:
+                self.encoded[key] = self.encode(value)
+        return write_chunks(self.chunks(list(report)), self.path, self.compression)
+
+# ---------------------------------------------------------
+# READ
+# ---------------------------------------------------------
+def open_report(path: Path):
+    """Text stream over the report, decompressing on the fly."""
+    path = find_report(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.suffix == ".zst":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"zstandard not installed; cannot read {path}")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(io.BufferedReader(reader, CHUNK_SIZE), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def load_report(path: Path):
+    with open_report(path) as f:
+        return json.load(f)
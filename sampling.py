@@ -0,0 +1,204 @@
+import math
+import random
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from statistics import NormalDist
+
+# =========================================================
+# STRATIFIED SAMPLE ESTIMATES
+# =========================================================
+# For a quick dashboard number on a huge corpus: enumerate every file
+# (cheap, a stat() each), group them into strata by language and size
+# bucket, analyze only a sample of each stratum and extrapolate.
+#
+# File size is known for every file and LOC, comments, functions, ...
+# grow roughly with it, so each stratum uses a ratio estimator:
+#
+#   total_h = X_h * (sum y / sum x over the sample)
+#
+# with X_h the stratum's total bytes. Stratum variances add up to the
+# variance of every language / category / global total, which gives
+# the normal-approximation confidence intervals in "_estimate".
+#
+# Binary and unreadable files are listed like any other but, as in the
+# exact scan, do not count as source files: file counts are estimated
+# as N_h times the fraction of the sample that was analyzed.
+
+SIZE_BUCKETS = (1 << 10, 1 << 13, 1 << 16, 1 << 19)   # 1 KiB, 8 KiB, 64 KiB, 512 KiB
+MIN_PER_STRATUM = 3
+CONFIDENCE = 0.95
+
+LANG_FIELDS = (
+    "total_loc", "total_blank", "total_comments", "total_functions",
+    "total_pseudo_complexity", "total_radon_complexity",
+)
+CATEGORY_FIELDS = ("total_loc", "total_comments", "total_pseudo_complexity")
+GLOBAL_FIELDS = ("total_loc", "total_functions")
+
+# ---------------------------------------------------------
+# STRATA AND ALLOCATION
+# ---------------------------------------------------------
+def size_bucket(size: int) -> int:
+    return bisect_right(SIZE_BUCKETS, size)
+
+def stratify(files) -> dict:
+    """
+    files: iterable of (repo, path, lang, category, size).
+    Returns {(lang, bucket): [file, ...]}.
+    """
+    strata = defaultdict(list)
+    for f in files:
+        strata[(f[2], size_bucket(f[4]))].append(f)
+    return dict(strata)
+
+def allocate(strata, fraction: float, min_per_stratum: int = MIN_PER_STRATUM) -> dict:
+    """
+    Sample size per stratum. Neyman allocation on file size (strata
+    whose sizes vary more get more of the sample), with a floor so every
+    stratum yields a variance estimate.
+    """
+    total = sum(len(files) for files in strata.values())
+    budget = max(1, math.ceil(fraction * total))
+
+    spread = {}
+    for key, files in strata.items():
+        sizes = [f[4] for f in files]
+        mean = sum(sizes) / len(sizes)
+        sd = math.sqrt(sum((s - mean) ** 2 for s in sizes) / len(sizes))
+        spread[key] = len(files) * max(sd, 1.0)
+    weight_sum = sum(spread.values())
+
+    alloc = {}
+    for key, files in strata.items():
+        n = round(budget * spread[key] / weight_sum) if weight_sum else 0
+        alloc[key] = min(len(files), max(min_per_stratum, n))
+    return alloc
+
+def draw_sample(strata, alloc, rng: random.Random) -> dict:
+    return {key: rng.sample(files, alloc[key]) for key, files in strata.items()}
+
+# ---------------------------------------------------------
+# ESTIMATION
+# ---------------------------------------------------------
+def ratio_estimate(xs, ys, N: int, X: float):
+    """
+    Separate ratio estimate of a stratum total and its variance from the
+    sampled sizes xs and values ys. Falls back to the plain mean when the
+    sampled files are all empty.
+    """
+    n = len(ys)
+    if n == 0:
+        return 0.0, 0.0
+    sx, sy = float(sum(xs)), float(sum(ys))
+    if sx <= 0:
+        return mean_estimate(ys, N)
+    r = sy / sx
+    return X * r, stratum_variance([y - r * x for x, y in zip(xs, ys)], N)
+
+def mean_estimate(ys, N: int):
+    """Expansion estimate N * mean(ys) of a stratum total and its variance."""
+    n = len(ys)
+    if n == 0:
+        return 0.0, 0.0
+    mean = float(sum(ys)) / n
+    return N * mean, stratum_variance([y - mean for y in ys], N)
+
+def stratum_variance(residuals, N: int) -> float:
+    n = len(residuals)
+    if n < 2 or n >= N:
+        return 0.0
+    s2 = sum(e * e for e in residuals) / (n - 1)
+    return N * N * (1 - n / N) * s2 / n
+
+def build_estimate_report(strata, observed, fraction: float, confidence: float = CONFIDENCE) -> dict:
+    """
+    observed: {(lang, bucket): [(size, values, imports), ...]} for the
+    analyzed sample, values keyed by LANG_FIELDS plus "num_files" (0 for
+    a skipped file, 1 otherwise). Returns a report with
+    the usual "_global", "_languages" and "_categories" sections (totals
+    rounded to integers) plus "_estimate" with the intervals, keyed like
+    history.py ("lang/python/total_loc").
+    """
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    category_of = {}
+    sums = defaultdict(lambda: [0.0, 0.0])      # key -> [estimate, variance]
+    num_files = defaultdict(float)
+    cat_files = defaultdict(float)
+    imports = Counter()
+    strata_rows = []
+
+    for key, files in strata.items():
+        lang, bucket = key
+        category = files[0][3]
+        category_of[lang] = category
+        sample = observed.get(key, [])
+        N = len(files)
+        X = float(sum(f[4] for f in files))
+        xs = [s for s, _, _ in sample]
+
+        # Skipped (binary / unreadable) files are not source files
+        est, var = mean_estimate([v["num_files"] for _, v, _ in sample], N)
+        num_files[lang] += est
+        cat_files[category] += est
+        for t in (f"lang/{lang}/num_files", f"cat/{category}/total_files",
+                  "global/_/total_source_files"):
+            sums[t][0] += est
+            sums[t][1] += var
+        strata_rows.append({"lang": lang, "size_bucket": bucket, "files": N, "sampled": len(sample)})
+
+        for field in LANG_FIELDS:
+            est, var = ratio_estimate(xs, [v[field] for _, v, _ in sample], N, X)
+            targets = [f"lang/{lang}/{field}"]
+            if field in CATEGORY_FIELDS:
+                targets.append(f"cat/{category}/{field}")
+            if field in GLOBAL_FIELDS:
+                targets.append(f"global/_/{field}")
+            for t in targets:
+                sums[t][0] += est
+                sums[t][1] += var
+
+        # Import counts are scaled by the inverse sampling rate
+        if sample:
+            weight = N / len(sample)
+            for _, _, file_imports in sample:
+                for mod, c in file_imports.items():
+                    imports[mod] += c * weight
+
+    intervals = {}
+    for key, (est, var) in sorted(sums.items()):
+        se = math.sqrt(var)
+        intervals[key] = {
+            "estimate": est,
+            "stderr": se,
+            "low": max(0.0, est - z * se),
+            "high": est + z * se,
+        }
+
+    def total(key):
+        return round(sums[key][0])
+
+    report = {
+        "_global": {
+            "total_source_files": total("global/_/total_source_files"),
+            "total_loc": total("global/_/total_loc"),
+            "total_functions": total("global/_/total_functions"),
+            "global_import_counts": [(m, round(c)) for m, c in imports.most_common()],
+        },
+        "_languages": {
+            lang: dict({f: total(f"lang/{lang}/{f}") for f in LANG_FIELDS}, num_files=round(n))
+            for lang, n in num_files.items() if round(n) > 0
+        },
+        "_categories": {
+            cat: dict({f: total(f"cat/{cat}/{f}") for f in CATEGORY_FIELDS}, total_files=round(n))
+            for cat, n in cat_files.items() if round(n) > 0
+        },
+        "_estimate": {
+            "confidence": confidence,
+            "fraction": fraction,
+            "files_total": sum(len(files) for files in strata.values()),
+            "files_sampled": sum(len(s) for s in observed.values()),
+            "strata": sorted(strata_rows, key=lambda r: (r["lang"], r["size_bucket"])),
+            "intervals": intervals,
+        },
+    }
+    return report
@@ -0,0 +1,179 @@
+import os
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# =========================================================
+# SIZE-AWARE BATCH SCHEDULER
+# =========================================================
+# Thousands of tiny files make one-task-per-file pools spend their time
+# on IPC; a few giant generated modules started last leave every other
+# worker idle. Work is therefore planned by file size:
+#
+#   - files >= HUGE_FILE_BYTES get a task of their own
+#   - everything else is packed into batches of up to BATCH_BYTES /
+#     BATCH_FILES
+#   - tasks are submitted largest-first (LPT), so the long ones start
+#     early and the small batches fill the gaps at the end
+#
+# Batches can also belong to groups (the scan roots of config.py) with a
+# cap on how many of a group's batches run at once; the free workers
+# then take the largest batch of a group that is below its cap.
+#
+# Every batch reports when and where it ran; summarize_batches turns
+# that into pool utilization and tail-latency numbers.
+
+HUGE_FILE_BYTES = 1 << 20     # 1 MiB
+BATCH_BYTES = 1 << 18         # 256 KiB
+BATCH_FILES = 64
+
+def plan_batches(items, huge_bytes: int = HUGE_FILE_BYTES,
+                 batch_bytes: int = BATCH_BYTES, batch_files: int = BATCH_FILES):
+    """
+    items: iterable of (task, size). Returns a list of batches (lists of
+    tasks), largest total size first.
+    """
+    batches = []
+    current, current_bytes = [], 0
+    for task, size in sorted(items, key=lambda it: -it[1]):
+        if size >= huge_bytes:
+            batches.append(([task], size))
+            continue
+        current.append(task)
+        current_bytes += size
+        if current_bytes >= batch_bytes or len(current) >= batch_files:
+            batches.append((current, current_bytes))
+            current, current_bytes = [], 0
+    if current:
+        batches.append((current, current_bytes))
+    batches.sort(key=lambda b: -b[1])
+    return batches
+
+def timed_call(fn, batch):
+    start = time.time()
+    results = fn(batch)
+    return results, {"worker": os.getpid(), "start": start, "end": time.time()}
+
+def run_batches(fn, batches, max_workers: int = None, groups=None, limits=None):
+    """
+    Run fn(tasks) for each (tasks, nbytes) batch and yield
+    (tasks, results, stats) as batches finish. fn must be picklable (a
+    module-level function or a functools.partial of one); max_workers=1
+    runs in this process.
+
+    groups[i] is the group of batch i; limits maps a group to the most
+    batches of it allowed to run at the same time (None = no cap).
+    """
+    t0 = time.time()
+    max_workers = max_workers or os.cpu_count() or 1
+    groups = groups or [None] * len(batches)
+    limits = limits or {}
+
+    def stats_row(i, tasks, nbytes, submitted, timing):
+        return {
+            "batch": i,
+            "group": groups[i],
+            "files": len(tasks),
+            "bytes": nbytes,
+            "worker": timing["worker"],
+            "queued": round(timing["start"] - submitted, 6),
+            "start": round(timing["start"] - t0, 6),
+            "seconds": round(timing["end"] - timing["start"], 6),
+        }
+
+    if max_workers == 1:
+        for i, (tasks, nbytes) in enumerate(batches):
+            submitted = time.time()
+            results, timing = timed_call(fn, tasks)
+            yield tasks, results, stats_row(i, tasks, nbytes, submitted, timing)
+        return
+
+    queues = defaultdict(deque)         # group -> batch indices, largest first
+    for i in range(len(batches)):
+        queues[groups[i]].append(i)
+    running = Counter()
+
+    def next_batch():
+        best = None
+        for group, queue in queues.items():
+            limit = limits.get(group)
+            if not queue or (limit is not None and running[group] >= limit):
+                continue
+            if best is None or batches[queue[0]][1] > batches[queues[best][0]][1]:
+                best = group
+        return None if best is None else queues[best].popleft()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        while True:
+            # Keep every worker busy, within the per-group caps
+            while len(futures) < max_workers:
+                i = next_batch()
+                if i is None:
+                    break
+                running[groups[i]] += 1
+                futures[pool.submit(timed_call, fn, batches[i][0])] = (i, time.time())
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i, submitted = futures.pop(fut)
+                running[groups[i]] -= 1
+                tasks, nbytes = batches[i]
+                results, timing = fut.result()
+                yield tasks, results, stats_row(i, tasks, nbytes, submitted, timing)
+
+# ---------------------------------------------------------
+# METRICS
+# ---------------------------------------------------------
+def percentile(sorted_values, q: float):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+def summarize_batches(rows, max_workers: int) -> dict:
+    if not rows:
+        return {"batches": 0}
+    durations = sorted(r["seconds"] for r in rows)
+    wall = max(r["start"] + r["seconds"] for r in rows)
+    busy = sum(durations)
+    workers = len({r["worker"] for r in rows})
+    last_start = max(r["start"] for r in rows)
+    return {
+        "batches": len(rows),
+        "files": sum(r["files"] for r in rows),
+        "bytes": sum(r["bytes"] for r in rows),
+        "max_workers": max_workers,
+        "workers_used": workers,
+        "wall_seconds": wall,
+        "busy_seconds": busy,
+        "utilization": busy / (wall * max_workers) if wall > 0 else 0.0,
+        "batch_seconds_p50": percentile(durations, 0.5),
+        "batch_seconds_p95": percentile(durations, 0.95),
+        "batch_seconds_p99": percentile(durations, 0.99),
+        "batch_seconds_max": durations[-1],
+        # Time after the last batch started: how long the run waited on stragglers
+        "tail_seconds": wall - last_start,
+        "groups": summarize_groups(rows),
+    }
+
+def summarize_groups(rows) -> dict:
+    """Per group: batches, files, bytes, busy seconds and peak concurrency."""
+    groups = {}
+    for group in sorted({r.get("group") for r in rows if r.get("group") is not None}):
+        mine = [r for r in rows if r.get("group") == group]
+        events = sorted([(r["start"], 1) for r in mine] +
+                        [(r["start"] + r["seconds"], -1) for r in mine])
+        active = peak = 0
+        for _, step in events:
+            active += step
+            peak = max(peak, active)
+        groups[group] = {
+            "batches": len(mine),
+            "files": sum(r["files"] for r in mine),
+            "bytes": sum(r["bytes"] for r in mine),
+            "busy_seconds": sum(r["seconds"] for r in mine),
+            "max_concurrent": peak,
+        }
+    return groups
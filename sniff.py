@@ -0,0 +1,101 @@
+import codecs
+
+# =========================================================
+# CONTENT SNIFFING
+# =========================================================
+# The extension says what a file should be; the first few KB say what
+# it is. sniff_bytes looks at that prefix only and returns
+#
+#   (encoding, format, skip_reason)
+#
+#   encoding     codec to decode the file with, or None if it is binary
+#   format       name of a recognised binary container ("zip", ...)
+#   skip_reason  why the file should not be analyzed, or None
+#
+# so binary blobs, mis-suffixed files and Git LFS pointers are never
+# decoded as text.
+
+SNIFF_BYTES = 8192
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),      # before UTF-16 LE, which it starts with
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+MAGIC = (
+    (b"PK\x03\x04", "zip"),                        # .xlsx, .docx, .zip, .jar
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole2"),  # legacy .xls / .doc
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF8", "gif"),
+    (b"%PDF-", "pdf"),
+    (b"\x1f\x8b", "gzip"),
+    (b"\x7fELF", "elf"),
+    (b"\xcf\xfa\xed\xfe", "macho"),
+    (b"\x89HDF\r\n\x1a\n", "hdf5"),                # MATLAB v7.3 .mat
+    (b"MATLAB 5.0 MAT-file", "mat"),
+    (b"\x93NUMPY", "npy"),
+)
+
+LFS_POINTER = b"version https://git-lfs.github.com/spec/v1"
+
+# Bytes that never appear in text files (everything below 0x20 except
+# \t \n \f \r, backspace and escape)
+CONTROL_BYTES = bytes(set(range(0x20)) - {0x08, 0x09, 0x0A, 0x0C, 0x0D, 0x1B})
+MAX_CONTROL_RATIO = 0.1
+
+def utf16_without_bom(head: bytes):
+    """'utf-16-le' / 'utf-16-be' if NULs sit on every other byte, else None."""
+    sample = head[:len(head) & ~1]
+    if len(sample) < 4:
+        return None
+    even_nul = sample[0::2].count(0)
+    odd_nul = sample[1::2].count(0)
+    half = len(sample) // 2
+    if odd_nul > 0.4 * half and even_nul < 0.05 * half:
+        return "utf-16-le"
+    if even_nul > 0.4 * half and odd_nul < 0.05 * half:
+        return "utf-16-be"
+    return None
+
+def sniff_bytes(head: bytes):
+    if not head:
+        return "utf-8", None, None
+
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, None, None
+
+    for magic, fmt in MAGIC:
+        if head.startswith(magic):
+            return None, fmt, "binary:" + fmt
+
+    if head.startswith(LFS_POINTER):
+        return None, None, "lfs_pointer"
+
+    if b"\x00" in head:
+        encoding = utf16_without_bom(head)
+        if encoding:
+            return encoding, None, None
+        return None, None, "binary:nul_bytes"
+
+    if len(head.translate(None, CONTROL_BYTES)) < (1 - MAX_CONTROL_RATIO) * len(head):
+        return None, None, "binary:control_bytes"
+
+    # A multi-byte character may be cut off at the end of the sample
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8", None, None
+    except UnicodeDecodeError:
+        return "latin-1", None, None
+
+def sniff_file(path, n: int = SNIFF_BYTES):
+    try:
+        with open(path, "rb") as f:
+            head = f.read(n)
+    except OSError as e:
+        return None, None, "unreadable:" + type(e).__name__
+    return sniff_bytes(head)
@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+# =========================================================
+# DEFAULT TECHNIQUE SPEC
+# =========================================================
+# Each technique is detected by top-level imports or by
+# keywords found anywhere in the (lower-cased) file text.
+TECHNIQUES = {
+    "Machine learning / deep learning": {
+        "imports": ["tensorflow", "keras", "torch", "sklearn", "xgboost", "lightgbm", "catboost"],
+        "keywords": ["neural", "cnn", "rnn", "lstm", "transformer", "classifier", "regressor", "deep learning"],
+    },
+    "Computer vision / pose": {
+        "imports": ["cv2", "mmpose", "mediapipe", "torchvision", "ultralytics", "yolov5", "yolov8"],
+        "keywords": ["pose", "keypoint", "bounding box", "segmentation"],
+    },
+    "Statistics / GLM / inference": {
+        "imports": ["statsmodels", "pymc", "scipy", "pingouin"],
+        "keywords": ["glm", "regression", "anova", "bayesian"],
+    },
+    "Time-series / signal processing": {
+        "imports": ["scipy.signal", "mne", "neurokit2"],
+        "keywords": ["fft", "spectral", "filter", "bandpass"],
+    },
+    "Data visualization / plots": {
+        "imports": ["matplotlib", "seaborn", "plotly"],
+        "keywords": ["heatmap", "scatter", "boxplot"],
+    },
+}
+
+# =========================================================
+# LOADING
+# =========================================================
+def load_techniques(path: Path = None):
+    """
+    Return the technique spec, read from a JSON file with the same
+    shape as TECHNIQUES if `path` exists, else the default spec.
+    Keywords are lower-cased so matching is case-insensitive.
+    """
+    spec = TECHNIQUES
+    if path is not None and Path(path).is_file():
+        with open(path, "r") as f:
+            spec = json.load(f)
+
+    return {
+        tech: {
+            "imports": list(info.get("imports", [])),
+            "keywords": [k.lower() for k in info.get("keywords", [])],
+        }
+        for tech, info in spec.items()
+    }
+
+# =========================================================
+# DETECTION
+# =========================================================
+def detect_techniques(text: str, imports, spec) -> list:
+    """Tag one file with the techniques whose imports or keywords it contains."""
+    imports = imports or {}
+    t = text.lower()
+
+    found = []
+    for tech, info in spec.items():
+        imp_hit = any(im in imports for im in info["imports"])
+        if imp_hit or any(kw in t for kw in info["keywords"]):
+            found.append(tech)
+    return found
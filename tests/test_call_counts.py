@@ -0,0 +1,35 @@
+from collections import Counter
+
+from heavy_hitters import HeavyHitters, count_calls
+
+def file_metrics(calls, loc=10):
+    return {"language": "python", "loc": loc, "function_calls": calls}
+
+REPORT = {
+    "repo_a": {"files": {
+        "a.py": file_metrics(["numpy.mean", "torch.nn.Linear", "print", "numpy.mean"], 20),
+        "b.py": file_metrics(["cv2.imread", "numpy.zeros"]),
+    }},
+    "repo_b": {"files": {"c.py": file_metrics([], 5)}},
+    "_global": {"total_loc": 35},
+    "_languages": {"python": {"num_files": 3}},
+}
+
+def test_count_calls_exact():
+    calls, per_file, locs, packages = count_calls(REPORT, ["numpy", "torch", "PIL"])
+    assert calls == Counter({"numpy.mean": 2, "torch.nn.Linear": 1, "print": 1,
+                             "cv2.imread": 1, "numpy.zeros": 1})
+    assert per_file == [4, 2, 0]
+    assert locs == [20, 10, 5]
+    assert packages["numpy"] == Counter({"numpy.mean": 2, "numpy.zeros": 1})
+    assert packages["torch"] == Counter({"torch.nn.Linear": 1})
+    assert not packages["PIL"]
+
+def test_count_calls_approximate_counter():
+    calls, per_file, _, packages = count_calls(REPORT, ["numpy", "PIL"], HeavyHitters)
+    assert isinstance(packages["numpy"], HeavyHitters)
+    assert dict(calls.most_common()) == {"numpy.mean": 2, "torch.nn.Linear": 1, "print": 1,
+                                         "cv2.imread": 1, "numpy.zeros": 1}
+    assert packages["numpy"].most_common() == [("numpy.mean", 2), ("numpy.zeros", 1)]
+    assert not packages["PIL"]
+    assert per_file == [4, 2, 0]
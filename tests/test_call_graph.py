@@ -0,0 +1,114 @@
+from call_graph import (
+    MODULE_NODE, build_call_graph, write_call_graph, load_call_graph, find_nodes, describe,
+    callers, callees, fan_in, fan_out, caller_repos, top_fan_in, reachable,
+)
+from main import analyze_python_text
+
+CORE = '''
+def helper():
+    return 1
+
+def load(path):
+    helper()
+    return Reader(path).read()
+
+class Reader:
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        def inner():
+            return self.parse()
+        return inner()
+
+    def parse(self):
+        return helper()
+'''
+
+API = '''
+from .core import load
+
+def go():
+    return load("x")
+'''
+
+RUN = '''
+import numpy as np
+import lib.core
+from lib.core import load as L
+
+def main():
+    L("a")
+    lib.core.helper()
+    np.mean([1])
+    undefined()
+
+main()
+'''
+
+def make_report():
+    return {
+        "lib": {"files": {
+            "lib/core.py": analyze_python_text(CORE),
+            "lib/api.py": analyze_python_text(API),
+            "README.md": {"language": "markdown", "functions": [], "function_calls": []},
+        }},
+        "app": {"files": {"run.py": analyze_python_text(RUN)}},
+        "_global": {},
+    }
+
+def node(graph, name):
+    (n,) = find_nodes(graph, name)
+    return n
+
+def names(graph, nodes):
+    return sorted(graph["node_name"][n] for n in nodes)
+
+def test_resolution():
+    graph = build_call_graph(make_report())
+    assert graph["repos"] == ["lib", "app"]
+    assert [f[1] for f in graph["files"]] == ["lib/core.py", "lib/api.py", "run.py"]
+
+    # Class(...) resolves to __init__; the chained .read() has no static target
+    assert names(graph, callees(graph, node(graph, "load"))) == ["Reader.__init__", "helper"]
+    # Closure, and self.method() inside it
+    read = node(graph, "Reader.read")
+    assert names(graph, callees(graph, read)) == ["Reader.read.<locals>.inner"]
+    assert names(graph, callees(graph, node(graph, "inner"))) == ["Reader.parse"]
+    # Relative import, aliased import and dotted module call across repos
+    assert names(graph, callees(graph, node(graph, "go"))) == ["load"]
+    assert names(graph, callees(graph, node(graph, "main"))) == ["helper", "load"]
+    run_module = [n for n in find_nodes(graph, MODULE_NODE) if describe(graph, n)["file"] == "run.py"]
+    assert names(graph, callees(graph, run_module[0])) == ["main"]
+
+    # np.mean and undefined() stay unresolved
+    assert graph["num_resolved"] < graph["num_call_sites"]
+
+def test_csr_arrays_are_consistent(tmp_path):
+    graph = build_call_graph(make_report())
+    num_nodes = len(graph["node_name"])
+    out_edges = {(s, t) for s in range(num_nodes) for t in callees(graph, s)}
+    in_edges = {(s, t) for t in range(num_nodes) for s in callers(graph, t)}
+    assert out_edges == in_edges
+    assert graph["out_offsets"][-1] == len(graph["out_targets"]) == len(out_edges)
+
+    helper = node(graph, "helper")
+    assert fan_in(graph, helper) == 3                       # load, parse, main
+    assert fan_in(graph, helper, weighted=True) == 3
+    assert caller_repos(graph, helper) == {0, 1}
+    assert fan_out(graph, node(graph, "load")) == 2
+    assert top_fan_in(graph, 1)[0] == {"repo": "lib", "file": "lib/core.py", "name": "helper",
+                                       "fan_in": 3, "caller_repos": 2}
+
+    path = tmp_path / "call_graph.json"
+    write_call_graph(graph, path)
+    assert load_call_graph(path) == graph
+
+def test_reachable():
+    graph = build_call_graph(make_report())
+    main = node(graph, "main")
+    assert names(graph, reachable(graph, main)) == ["Reader.__init__", "helper", "load"]
+    assert names(graph, reachable(graph, main, max_depth=1)) == ["helper", "load"]
+    assert names(graph, reachable(graph, node(graph, "helper"), reverse=True)) == [
+        MODULE_NODE, "Reader.parse", "Reader.read", "Reader.read.<locals>.inner",
+        "go", "load", "main"]
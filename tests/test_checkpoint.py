@@ -0,0 +1,73 @@
+import json
+
+import main
+from checkpoint import ScanCheckpoint, file_stamp
+from config import make_root
+
+HEADER = {"roots": [["/code", []]], "approx": False}
+
+def write_entries(path, n):
+    cp = ScanCheckpoint(path, HEADER)
+    for i in range(n):
+        cp.record("repo", f"f{i}.py", [i, 10], {"loc": i})
+    cp.close()
+
+def test_resume_after_torn_tail(tmp_path):
+    path = tmp_path / "scan_checkpoint.jsonl"
+    write_entries(path, 3)
+    with open(path, "a") as f:
+        f.write('{"repo":"repo","file":"f3.py","stamp":[3,10],"met')     # crash mid-write
+
+    cp = ScanCheckpoint(path, HEADER, resume=True)
+    assert sorted(cp.done) == [("repo", "f0.py"), ("repo", "f1.py"), ("repo", "f2.py")]
+    assert cp.lookup("repo", "f1.py", [1, 10]) == {"loc": 1}
+    # Content changed since it was recorded
+    assert cp.lookup("repo", "f1.py", [1, 11]) is None
+    assert cp.lookup("repo", "f3.py", [3, 10]) is None
+
+    # The torn tail is dropped, so new lines start on a fresh line
+    cp.record("repo", "f3.py", [3, 10], {"loc": 3})
+    cp.close()
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines[0] == {"header": HEADER}
+    assert [e["file"] for e in lines[1:]] == ["f0.py", "f1.py", "f2.py", "f3.py"]
+
+def test_header_mismatch_starts_over(tmp_path):
+    path = tmp_path / "scan_checkpoint.jsonl"
+    write_entries(path, 2)
+    other = dict(HEADER, approx=True)
+    cp = ScanCheckpoint(path, other, resume=True)
+    assert cp.done == {}
+    cp.close()
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{"header": other}]
+
+def test_without_resume_and_finished(tmp_path):
+    path = tmp_path / "scan_checkpoint.jsonl"
+    write_entries(path, 2)
+    cp = ScanCheckpoint(path, HEADER)
+    assert cp.done == {}
+    cp.record("repo", "gone.py", None, {"loc": 0})      # no stamp: not recorded
+    cp.close(finished=True)
+    assert not path.exists()
+    assert file_stamp(path) is None
+
+def test_resumed_scan_matches_fresh_scan(tmp_path, monkeypatch):
+    code = tmp_path / "code"
+    for i in range(5):
+        (code / "repo").mkdir(parents=True, exist_ok=True)
+        (code / "repo" / f"m{i}.py").write_text(f"import os\n\ndef f{i}(x):\n    return x + {i}\n")
+    roots = [make_root(code)]
+    path = tmp_path / "scan_checkpoint.jsonl"
+
+    cp = ScanCheckpoint(path, HEADER)
+    fresh = main.build_report(*main.scan_repos(roots, checkpoint=cp))
+    cp.close()                                         # interrupted before the reports
+
+    # Every file is in the checkpoint: nothing is analyzed again
+    def fail(tasks, techniques=None):
+        raise AssertionError(f"re-analyzed {len(tasks)} files")
+    monkeypatch.setattr(main, "analyze_batch", fail)
+    cp = ScanCheckpoint(path, HEADER, resume=True)
+    resumed = main.build_report(*main.scan_repos(roots, checkpoint=cp))
+    cp.close()
+    assert resumed == fresh
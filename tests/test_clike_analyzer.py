@@ -0,0 +1,54 @@
+from clike_analyzer import analyze_clike_text
+
+def functions_by_name(result):
+    return {f[0]: f for f in result["functions"]}
+
+def test_default_object_parameter():
+    src = ("function main(x, y = {}) {\n"
+           "  if (x) { return y; }\n"
+           "  return x;\n"
+           "}\n")
+    result = analyze_clike_text(src, "javascript")
+    assert result["function_names"] == ["main"]
+    name, start, end, length, cc, num_args, nesting = result["functions"][0]
+    assert (start, end, cc, num_args) == (1, 4, 2, 2)
+    assert "main" not in result["function_calls"]
+
+def test_destructured_parameter():
+    src = ("function k({a, b}: Opts) {\n"
+           "  while (a) { a--; }\n"
+           "}\n"
+           "const h = ({p, q}) => {\n"
+           "  if (p) { q(); }\n"
+           "};\n")
+    result = analyze_clike_text(src, "typescript")
+    funcs = functions_by_name(result)
+    assert set(funcs) == {"k", "h"}
+    assert funcs["k"][1:3] == [1, 3]
+    assert funcs["k"][4] == 2          # the while belongs to k
+    assert funcs["k"][5] == 1          # one destructured parameter
+    assert funcs["h"][4] == 2
+    assert result["function_calls"] == ["q"]
+
+def test_callback_body_is_still_a_function():
+    src = "arr.forEach(function (z) { if (z) { use({k: 1}); } });\n"
+    result = analyze_clike_text(src, "javascript")
+    assert len(result["functions"]) == 1
+    assert result["functions"][0][4] == 2
+    assert result["function_calls"] == ["arr.forEach", "use"]
+
+def test_call_chain_does_not_leak_keywords():
+    src = ("function f(xs) {\n"
+           "  return [1].map(f);\n"
+           "}\n"
+           "make().run();\n")
+    calls = analyze_clike_text(src, "javascript")["function_calls"]
+    assert "map" in calls
+    assert "return.map" not in calls
+    assert calls.count("make") == 1 and "run" in calls
+    assert "make.run" not in calls
+
+def test_member_chains_are_kept():
+    src = "void g() {\n  obj->next()->go();\n  ns::util::run(1);\n}\n"
+    calls = analyze_clike_text(src, "cpp")["function_calls"]
+    assert calls == ["obj->next", "go", "ns::util::run"]
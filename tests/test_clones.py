@@ -0,0 +1,111 @@
+from clones import (
+    NUM_BINS, normalized_tokens, minhash, similarity, find_clusters, text_signature,
+    decode_signature, encode_signature, build_clone_section,
+)
+from main import analyze_python_text
+
+ORIGINAL = '''\
+def load_trials(path, min_rt=0.2):
+    trials = []
+    with open(path) as f:
+        for line in f:
+            fields = line.strip().split(",")
+            if len(fields) < 3 or fields[0] == "trial":
+                continue
+            rt = float(fields[2])
+            if rt >= min_rt:
+                trials.append({"trial": int(fields[0]), "cond": fields[1], "rt": rt})
+    return trials
+
+def mean_rt(trials, cond):
+    values = [t["rt"] for t in trials if t["cond"] == cond]
+    if not values:
+        return None
+    return sum(values) / len(values)
+'''
+
+# Renamed identifiers, other constants, a comment and one edited line
+EDITED = '''\
+def read_rows(fname, threshold=0.15):
+    rows = []
+    with open(fname) as fh:
+        for raw in fh:
+            parts = raw.strip().split(";")   # semicolon separated export
+            if len(parts) < 4 or parts[0] == "id":
+                continue
+            rt = float(parts[2])
+            if rt >= threshold:
+                rows.append({"trial": int(parts[0]), "cond": parts[1], "rt": rt, "src": fname})
+    return rows
+
+def average(rows, condition):
+    values = [r["rt"] for r in rows if r["cond"] == condition]
+    if not values:
+        return None
+    return sum(values) / len(values)
+'''
+
+UNRELATED = '''\
+class Grid:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = [[0] * width for _ in range(height)]
+
+    def neighbours(self, x, y):
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if (dx or dy) and 0 <= x + dx < self.width and 0 <= y + dy < self.height:
+                    yield self.cells[y + dy][x + dx]
+
+    def step(self):
+        alive = lambda x, y: sum(self.neighbours(x, y)) in (2, 3)
+        self.cells = [[int(alive(x, y)) for x in range(self.width)] for y in range(self.height)]
+'''
+
+def sig(text):
+    return decode_signature(text_signature(text, "python"))
+
+def test_normalized_tokens():
+    assert normalized_tokens("x = foo(1, 'a')  # note\n", "python") == \
+        ["v", "=", "v", "(", "0", ",", "s", ")"]
+    assert normalized_tokens("if (n > 0) { /* c */ return 2.5; }", "c") == \
+        ["if", "(", "v", ">", "0", ")", "{", "return", "0", ";", "}"]
+
+def test_signatures():
+    a, b, c = sig(ORIGINAL), sig(EDITED), sig(UNRELATED)
+    assert len(a) == NUM_BINS
+    assert list(a) == minhash(normalized_tokens(ORIGINAL, "python"))
+    assert encode_signature(a) == text_signature(ORIGINAL, "python")
+    assert similarity(a, a) == 1.0
+    # Renaming and constants do not matter after normalization, the edited line does
+    assert normalized_tokens(ORIGINAL, "python") != normalized_tokens(EDITED, "python")
+    assert similarity(a, b) >= 0.8
+    assert similarity(a, c) < 0.3
+    # Too short / not a compared language
+    assert text_signature("x = 1\n", "python") is None
+    assert text_signature(ORIGINAL, "markdown") is None
+
+def test_find_clusters():
+    sigs = [sig(ORIGINAL), sig(UNRELATED), sig(EDITED), sig(ORIGINAL)]
+    assert sorted(sorted(c) for c in find_clusters(sigs)) == [[0, 2, 3]]
+    assert find_clusters(sigs, threshold=1.01) == []
+
+def test_clone_section():
+    def metrics(text):
+        return dict(analyze_python_text(text), loc=len(text.splitlines()))
+
+    repos = {
+        "a": {"files": {"load.py": metrics(ORIGINAL), "small.py": metrics("x = 1\n")}},
+        "b": {"files": {"io/rows.py": metrics(EDITED), "grid.py": metrics(UNRELATED)}},
+    }
+    section = build_clone_section(repos)
+    assert section["num_files"] == 3
+    (cluster,) = section["files"]
+    assert cluster["size"] == 2 and cluster["min_similarity"] >= 0.8
+    assert sorted((m["repo"], m["file"]) for m in cluster["members"]) == \
+        [("a", "load.py"), ("b", "io/rows.py")]
+
+    # The loader is long enough to be compared as a function on its own
+    (func_cluster,) = [c for c in section["functions"] if c["size"] == 2]
+    assert sorted(m["function"] for m in func_cluster["members"]) == ["load_trials", "read_rows"]
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+import data_index
+from data_index import count_lines, update_line_index
+
+SAMPLES = {
+    "empty.csv": b"",
+    "one.csv": b"a,b",
+    "two.csv": b"a,b\n1,2\n",
+    "blank_lines.txt": b"\n\n\n",
+    "no_trailing.txt": b"x\ny\nz",
+    "crlf.csv": b"a\r\nb\r\n",
+}
+
+def baseline(path):
+    # The count this index replaced: iterating the text file line by line
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_count_lines_matches_baseline(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(SAMPLES[name])
+    assert count_lines(path) == baseline(path)
+    # Lines that span chunk boundaries
+    assert count_lines(path, chunk_size=2) == baseline(path)
+
+def test_count_lines_large_file(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"0123456789\n" * 5000 + b"tail")
+    assert count_lines(path, chunk_size=4096) == baseline(path) == 5001
+    assert count_lines(tmp_path / "missing.txt") == 0
+
+def test_index_recounts_only_changed_files(tmp_path, monkeypatch):
+    root = tmp_path / "data"
+    for name, data in SAMPLES.items():
+        (root / "sub").mkdir(parents=True, exist_ok=True)
+        (root / "sub" / name).write_bytes(data)
+    (root / "skip.bin").write_bytes(b"\n" * 10)
+    index_path = tmp_path / "index.json"
+    exts = {".csv", ".txt"}
+
+    index = update_line_index(root, index_path, exts, max_workers=2)
+    assert {rel: e["lines"] for rel, e in index.items()} == {
+        os.path.join("sub", name): baseline(root / "sub" / name) for name in SAMPLES}
+    assert json.loads(index_path.read_text()) == index
+
+    counted = []
+    real = data_index.count_lines
+    monkeypatch.setattr(data_index, "count_lines", lambda p: counted.append(p.name) or real(p))
+
+    changed = root / "sub" / "two.csv"
+    changed.write_bytes(b"a\nb\nc\nd\n")
+    os.utime(changed, (1, 1))
+    (root / "sub" / "one.csv").unlink()
+    index = update_line_index(root, index_path, exts)
+    assert counted == ["two.csv"]
+    assert index[os.path.join("sub", "two.csv")]["lines"] == 4
+    assert os.path.join("sub", "one.csv") not in index
+
+    # Nothing changed: nothing read
+    counted.clear()
+    assert update_line_index(root, index_path, exts) == index
+    assert counted == []
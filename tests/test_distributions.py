@@ -0,0 +1,50 @@
+from distributions import (
+    Distribution, BUCKETS, add_distributions, new_distribution_totals, build_distribution_section,
+)
+from main import analyze_python_text, new_repo_entry, RADON_AVAILABLE
+
+SOURCE = """
+def flat(x):
+    return x
+
+def branchy(x):
+    if x > 1:
+        return 1
+    for i in range(x):
+        if i and x:
+            return i
+    return 0
+"""
+
+def test_cc_per_function_from_function_records():
+    metrics = analyze_python_text(SOURCE)
+    totals = new_distribution_totals()
+    repo = new_repo_entry()
+    add_distributions((totals["global"], repo["distributions"]), metrics)
+
+    cc = totals["global"]["cc_per_function"]
+    assert cc.count == 2
+    assert (cc.min, cc.max) == (1, 5)
+    # Same counts whether or not radon is installed
+    assert not RADON_AVAILABLE or sorted(metrics["complexity"]["cc_values"]) == [1, 5]
+
+def test_remove_file_and_round_trip():
+    metrics = analyze_python_text(SOURCE)
+    totals = new_distribution_totals()
+    repo = new_repo_entry()
+    scopes = (totals["global"], totals["languages"]["python"], repo["distributions"])
+    add_distributions(scopes, metrics)
+    add_distributions(scopes, analyze_python_text("x = 1\n"))
+    add_distributions(scopes, metrics, sign=-1)
+
+    section = build_distribution_section({"distributions": totals}, {"r": repo})
+    assert section["global"]["cc_per_function"]["count"] == 0
+    assert section["global"]["loc_per_file"]["count"] == 1
+    assert list(section["repos"]) == ["r"]
+
+    d = Distribution(BUCKETS["loc_per_file"])
+    for v in (3, 40, 700, 12000):
+        d.add(v)
+    again = Distribution.from_dict(d.to_dict())
+    assert again.to_dict() == d.to_dict()
+    assert again.merge(d).count == 8
@@ -0,0 +1,101 @@
+import json
+
+from function_index import build_duplicate_index, duplicates_in_repo
+from main import analyze_python_text, write_indexes
+
+CLEAN = '''
+def clean(values, low=0, high=100):
+    out = []
+    for v in values:
+        if v is None or v < low or v > high:
+            continue
+        out.append(round(v, 2))
+    return out
+'''
+
+# Same body with other names and constants (of the same type), and as a method
+CLEAN_RENAMED = '''
+def filter_rt(xs, lo=1, hi=50):
+    result = []
+    for x in xs:
+        if x is None or x < lo or x > hi:
+            continue
+        result.append(round(x, 1))
+    return result
+'''
+
+CLEAN_METHOD = '''
+class Session:
+    def tidy(self, values, low=0, high=100):
+        out = []
+        for v in values:
+            if v is None or v < low or v > high:
+                continue
+            out.append(round(v, 2))
+        return out
+'''
+
+SHORT = '''
+def get_name(self):
+    return self.name
+'''
+
+SPLIT = '''
+def split(path, sep="/"):
+    parts = [p for p in path.strip().split(sep) if p and p != "."]
+    if not parts:
+        return "", ""
+    return parts[0], sep.join(parts[1:])
+'''
+
+def make_report():
+    return {
+        "repo_a": {"files": {
+            "clean.py": analyze_python_text(CLEAN + SHORT),
+            "util/filters.py": analyze_python_text(CLEAN_RENAMED + SPLIT),
+        }},
+        "repo_b": {"files": {
+            "session.py": analyze_python_text(CLEAN_METHOD + SHORT),
+            "paths.py": analyze_python_text(SPLIT),
+        }},
+        "repo_c": {"files": {"paths.py": analyze_python_text(SPLIT)}},
+        "_global": {"total_loc": 0},
+    }
+
+def test_function_hash_ignores_names():
+    (h1,) = [h for h in analyze_python_text(CLEAN)["function_hashes"]]
+    (h2,) = [h for h in analyze_python_text(CLEAN_RENAMED)["function_hashes"]]
+    assert h1 is not None and h1 == h2
+    assert analyze_python_text(CLEAN_METHOD)["function_hashes"][0] != h1   # `self` is a parameter
+    # Small bodies are not hashed
+    assert analyze_python_text(SHORT)["function_hashes"] == [None]
+
+def test_duplicate_index():
+    dup = build_duplicate_index(make_report())
+    groups = {tuple(sorted(f[2] for f in g["functions"])): g for g in dup["groups"]}
+    assert set(groups) >= {("clean", "filter_rt")}
+    clean = groups[("clean", "filter_rt")]
+    assert clean["count"] == 2 and clean["num_repos"] == 1 and clean["length"] == 7
+    assert sorted(f[:2] for f in clean["functions"]) == \
+        [["repo_a", "clean.py"], ["repo_a", "util/filters.py"]]
+    # Largest count * length first: 3 copies of 5 lines before 2 of 7
+    assert [(g["count"], g["length"], g["num_repos"]) for g in dup["groups"]] == [(3, 5, 3), (2, 7, 1)]
+    assert dup["num_hashed"] == 6
+    assert build_duplicate_index(make_report(), min_count=4)["groups"] == []
+
+def test_duplicates_in_repo():
+    dup = build_duplicate_index(make_report())
+    assert duplicates_in_repo(dup, "missing") == []
+    assert all(any(f[0] == "repo_c" for f in g["functions"])
+               for g in duplicates_in_repo(dup, "repo_c"))
+    assert len(duplicates_in_repo(dup, "repo_a", n=1)) == 1
+
+def test_chart_input(tmp_path):
+    write_indexes(make_report(), tmp_path)
+    with open(tmp_path / "function_duplicates.json") as f:
+        data = json.load(f)
+    assert data == build_duplicate_index(make_report())
+    # PLOT_defs.py section 6: labels from fn[2], bar lengths from g["count"]
+    for g in data["groups"][:20]:
+        assert g["count"] == len(g["functions"]) >= 2
+        assert all(isinstance(fn[2], str) for fn in g["functions"])
@@ -0,0 +1,72 @@
+import pytest
+
+from function_index import (
+    FUNCTION_FIELDS, build_function_index, write_function_index, load_function_index,
+    num_functions, row, top_complex, distribution,
+)
+from main import analyze_python_text
+
+SOURCE = '''
+def simple(a, b=1, *args, **kw):
+    return a
+
+class Model:
+    def fit(self, x):
+        for i in x:
+            if i:
+                while i:
+                    i -= 1
+        return self
+
+    async def predict(self, x):
+        def helper(y):
+            return y if y else 0
+        return helper(x)
+'''
+
+def make_report():
+    return {
+        "repo_a": {"files": {"model.py": analyze_python_text(SOURCE)}},
+        "repo_b": {"files": {
+            "b.py": analyze_python_text("def g(x):\n    if x and x > 1:\n        return 1\n"),
+            "empty.py": analyze_python_text("x = 1\n"),
+        }},
+        "_global": {"total_loc": 0},
+    }
+
+def test_function_records():
+    records = {r[0]: dict(zip(FUNCTION_FIELDS, r)) for r in analyze_python_text(SOURCE)["functions"]}
+    assert list(records) == ["simple", "Model.fit", "Model.predict",
+                             "Model.predict.<locals>.helper"]
+    assert records["simple"]["num_args"] == 4
+    assert (records["simple"]["start"], records["simple"]["end"], records["simple"]["length"]) == (2, 3, 2)
+    assert records["Model.fit"]["complexity"] == 4
+    assert records["Model.fit"]["nesting"] == 3
+    assert records["Model.predict.<locals>.helper"]["complexity"] == 2
+
+def test_index_ordered_by_complexity(tmp_path):
+    index = build_function_index(make_report())
+    assert index["repos"] == ["repo_a", "repo_b"]
+    # empty.py has no functions and is not listed
+    assert index["files"] == [[0, "model.py"], [1, "b.py"]]
+    assert num_functions(index) == 5
+
+    cols = index["columns"]
+    keys = list(zip(cols["complexity"], cols["length"]))
+    assert keys == sorted(keys, key=lambda k: (-k[0], -k[1]))
+    assert row(index, 0) == {"repo": "repo_a", "file": "model.py", "name": "Model.fit",
+                             "start": 6, "end": 11, "length": 6, "complexity": 4,
+                             "num_args": 2, "nesting": 3}
+
+    path = tmp_path / "functions_index.json"
+    write_function_index(index, path)
+    assert load_function_index(path) == index
+
+def test_queries():
+    index = build_function_index(make_report())
+    assert [f["name"] for f in top_complex(index, 2)] == ["Model.fit", "g"]
+    assert [f["name"] for f in top_complex(index, 5, repo="repo_b")] == ["g"]
+    assert top_complex(index, 5, repo="nope") == []
+    assert distribution(index, "complexity") == {1: 2, 2: 1, 3: 1, 4: 1}
+    with pytest.raises(KeyError):
+        distribution(index, "name")
@@ -0,0 +1,53 @@
+import os
+import subprocess
+
+import pytest
+
+import git_source
+from git_source import git_dir_of, list_tree, read_blob, blob_reader, repo_name_of
+
+def git(*args, cwd=None):
+    return subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t",
+                           "-c", "init.defaultBranch=main", *args],
+                          cwd=cwd, check=True, capture_output=True).stdout
+
+@pytest.fixture
+def bare_repo(tmp_path):
+    work = tmp_path / "work"
+    work.mkdir()
+    git("init", "-q", cwd=work)
+    (work / "a.py").write_text("import os\n")
+    (work / "pkg").mkdir()
+    (work / "pkg" / "b.py").write_bytes(b"x = 1\n" * 1000)
+    os.symlink("a.py", work / "link.py")
+    git("add", "-A", cwd=work)
+    git("commit", "-qm", "init", cwd=work)
+    bare = tmp_path / "Repo.git"
+    git("clone", "-q", "--bare", str(work), str(bare))
+    yield bare
+    git_source.close_readers()
+
+def test_list_tree(bare_repo):
+    assert git_dir_of(bare_repo) == bare_repo
+    assert repo_name_of(bare_repo) == "Repo"
+    files = {str(p): size for p, _, size in list_tree(bare_repo)}
+    assert files == {"a.py": 10, "pkg/b.py": 6000}
+
+def test_read_blob(bare_repo):
+    shas = {str(p): sha for p, sha, _ in list_tree(bare_repo)}
+    assert read_blob(bare_repo, shas["a.py"]) == b"import os\n"
+    assert read_blob(bare_repo, shas["pkg/b.py"]) == b"x = 1\n" * 1000
+    with pytest.raises(KeyError):
+        read_blob(bare_repo, "0" * 40)
+    # A missing object does not cost the reader
+    assert read_blob(bare_repo, shas["a.py"]) == b"import os\n"
+
+def test_dead_reader_is_respawned(bare_repo):
+    shas = {str(p): sha for p, sha, _ in list_tree(bare_repo)}
+    reader = blob_reader(bare_repo)
+    reader.proc.kill()
+    reader.proc.wait()
+
+    assert read_blob(bare_repo, shas["a.py"]) == b"import os\n"
+    assert blob_reader(bare_repo) is not reader
+    assert read_blob(bare_repo, shas["pkg/b.py"]) == b"x = 1\n" * 1000
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from heavy_hitters import HeavyHitters
+
+REPO = Path(__file__).resolve().parent.parent
+
+CELLS = "from heavy_hitters import HeavyHitters; print(HeavyHitters()._cells('numpy.mean'))"
+
+def cells_with_seed(seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    out = subprocess.run([sys.executable, "-c", CELLS], cwd=REPO, env=env,
+                         capture_output=True, text=True, check=True)
+    return out.stdout
+
+def test_cells_do_not_depend_on_hash_seed():
+    assert cells_with_seed(1) == cells_with_seed(2)
+    assert cells_with_seed(1).strip() == str(HeavyHitters()._cells("numpy.mean"))
+
+def test_estimates_bound_the_true_counts():
+    hh = HeavyHitters(epsilon=0.01, delta=0.01, top_k=5)
+    truth = {f"name{i}": i % 7 + 1 for i in range(200)}
+    truth["numpy"] = 500
+    hh.update(truth)
+    total = sum(truth.values())
+    for key, count in truth.items():
+        assert count <= hh.sketch_estimate(key) <= count + hh.epsilon * total
+    assert hh.most_common(1)[0][0] == "numpy"
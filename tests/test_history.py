@@ -0,0 +1,62 @@
+import json
+
+import history
+from history import append_snapshot, read_history, time_series
+
+def lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_deltas_round_trip(tmp_path):
+    path = tmp_path / "history.jsonl"
+    runs = [{"a": 1, "b": 2}, {"a": 3, "b": 2}, {"a": 3, "b": 2, "c": 7}, {"a": 0, "b": 2, "c": 7}]
+    for ts, flat in enumerate(runs):
+        append_snapshot(path, flat, ts=ts)
+
+    entries = lines(path)
+    assert "full" in entries[0]
+    assert entries[1] == {"ts": 1, "delta": {"a": 2}, "removed": []}
+    assert [dict(state) for _, state in read_history(path)] == runs
+
+def test_removed_keys(tmp_path):
+    path = tmp_path / "history.jsonl"
+    append_snapshot(path, {"repo/A/total_loc": 10, "repo/B/total_loc": 5}, ts=0)
+    append_snapshot(path, {"repo/A/total_loc": 12}, ts=1)
+
+    assert lines(path)[1]["removed"] == ["repo/B/total_loc"]
+    series = time_series(path, ["repo/A/total_loc", "repo/B/total_loc"])
+    assert series == {"ts": [0, 1], "repo/A/total_loc": [10, 12], "repo/B/total_loc": [5, None]}
+
+def test_keyframes(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "KEYFRAME_EVERY", 3)
+    path = tmp_path / "history.jsonl"
+    for ts in range(7):
+        append_snapshot(path, {"n": ts * 10}, ts=ts)
+
+    kinds = ["full" if "full" in e else "delta" for e in lines(path)]
+    assert kinds == ["full", "delta", "delta", "full", "delta", "delta", "full"]
+    assert [state["n"] for _, state in read_history(path)] == [0, 10, 20, 30, 40, 50, 60]
+
+def test_corrupt_line_skips_deltas_until_keyframe(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_text(
+        '{"ts":0,"full":{"n":1}}\n'
+        '{"ts":1,"delta":{"n":1},"removed":[]}\n'
+        '{"ts":2,"delta":{"n":\n'                      # truncated
+        '{"ts":3,"delta":{"n":5},"removed":[]}\n'      # relative to the lost line
+        '{"ts":4,"full":{"n":20}}\n'
+        '{"ts":5,"delta":{"n":1},"removed":[]}\n'
+        '{"ts":6}\n'                                   # hand-edited, no delta
+    )
+    assert [(ts, state["n"]) for ts, state in read_history(path)] == [(0, 1), (1, 2), (4, 20), (5, 21)]
+
+def test_append_after_killed_run(tmp_path):
+    path = tmp_path / "history.jsonl"
+    append_snapshot(path, {"n": 1}, ts=0)
+    with open(path, "a") as f:
+        f.write('{"ts":1,"delta":{"n"')               # no newline
+
+    # The broken tail forces a keyframe on its own line
+    append_snapshot(path, {"n": 4}, ts=2)
+    assert path.read_text().splitlines()[-1] == '{"ts":2,"full":{"n":4}}'
+    append_snapshot(path, {"n": 6}, ts=3)
+    assert [(ts, state["n"]) for ts, state in read_history(path)] == [(0, 1), (2, 4), (3, 6)]
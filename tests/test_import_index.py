@@ -0,0 +1,36 @@
+from pathlib import Path, PurePosixPath
+
+from import_index import build_local_module_index, classify_imports
+
+FILES = [
+    "setup.py",
+    "analysis.py",
+    "mypkg/__init__.py",
+    "mypkg/utils.py",
+    "mypkg/io/readers.py",
+    "scripts/data/logging.py",
+    "src/corepkg/__init__.py",
+    "src/corepkg/test/helpers.py",
+    "src/standalone.py",
+    "tests/test_analysis.py",
+]
+
+def test_only_top_level_and_src_layout_names(tmp_path):
+    index = build_local_module_index([tmp_path / f for f in FILES], tmp_path)
+    assert index == {"setup", "analysis", "mypkg", "scripts", "src", "corepkg",
+                     "standalone", "tests"}
+
+def test_git_listing_paths():
+    # Bare clones list repo-relative paths (main.list_repo_files)
+    index = build_local_module_index([PurePosixPath(f) for f in FILES], PurePosixPath())
+    assert "corepkg" in index and "utils" not in index
+
+def test_nested_names_do_not_shadow_imports(tmp_path):
+    index = build_local_module_index([tmp_path / f for f in FILES], tmp_path)
+    kinds = classify_imports({"logging": 1, "io": 1, "utils": 2, "data": 1, "mypkg": 3,
+                              "corepkg": 1, "numpy": 1, "helpers": 1}, index, {"helpers"})
+    assert kinds == {
+        "stdlib": {"logging": 1, "io": 1},
+        "third_party": {"utils": 2, "data": 1, "numpy": 1},
+        "local": {"mypkg": 3, "corepkg": 1, "helpers": 1},
+    }
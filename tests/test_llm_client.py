@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import llm_report
+from llm_client import AsyncChatClient, SummaryCache
+from mock_llm_server import make_mock_server
+
+SYSTEM = "test"
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**kwargs):
+        server = make_mock_server(port=0, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def complete_all(client, prompts):
+    async def run():
+        return await asyncio.gather(*(client.complete(p, 50, SYSTEM) for p in prompts))
+    try:
+        return asyncio.run(run())
+    finally:
+        client.close()
+
+def test_rate_limited_requests_are_retried(serve, tmp_path):
+    server, url = serve(rate_limit_every=3, retry_after=0.01)
+    log = tmp_path / "costs.jsonl"
+    client = AsyncChatClient(base_url=url, api_key="x", concurrency=4, cost_log=log)
+    prompts = [f"prompt {i}" for i in range(20)]
+    answers = complete_all(client, prompts)
+
+    assert all(a.startswith("[mock ") for a in answers)
+    assert server.stats.rate_limited > 0
+    assert server.stats.requests == len(prompts)
+    assert client.stats["retries"] == server.stats.rate_limited
+    assert client.stats["errors"] == 0
+
+    # One line per attempt, successful or not
+    entries = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(entries) == server.stats.attempts == client.stats["attempts"]
+    assert sum(e["status"] == 429 for e in entries) == server.stats.rate_limited
+    assert sum(e["status"] == 200 for e in entries) == len(prompts)
+
+def test_concurrency_limit(serve):
+    server, url = serve(latency=0.05)
+    client = AsyncChatClient(base_url=url, api_key="x", concurrency=3)
+    complete_all(client, [f"prompt {i}" for i in range(12)])
+    assert server.stats.requests == 12
+    assert server.stats.max_active <= 3
+
+def test_duplicate_and_cached_prompts_are_not_resent(serve, tmp_path):
+    server, url = serve(latency=0.02)
+    cache_path = tmp_path / "cache.json"
+    cache = SummaryCache(cache_path)
+    client = AsyncChatClient(base_url=url, api_key="x", cache=cache)
+    first = complete_all(client, ["same"] * 5 + ["other"])
+    cache.save()
+    assert server.stats.requests == 2
+    assert client.stats["deduplicated"] == 4
+
+    client = AsyncChatClient(base_url=url, api_key="x", cache=SummaryCache(cache_path))
+    second = complete_all(client, ["same", "other"])
+    assert server.stats.requests == 2
+    assert client.stats["cached"] == 2
+    assert second == [first[0], first[-1]]
+
+def write_repo(root, num_files=6):
+    repo = root / "repo"
+    repo.mkdir()
+    for i in range(num_files):
+        lines = [f"def f{i}_{j}(x):\n    return x + {j}\n" for j in range(20)]
+        (repo / f"m{i}.py").write_text("".join(lines))
+    return repo
+
+def test_report_cache_and_budget(serve, tmp_path):
+    server, url = serve(rate_limit_every=4, retry_after=0.01)
+    repo = write_repo(tmp_path)
+    cache = tmp_path / "cache.json"
+    per_file = llm_report.count_tokens(
+        llm_report.file_prompts("m0.py", (repo / "m0.py").read_text())[0])
+    budget = per_file * 3 + per_file // 2
+
+    out = tmp_path / "report.md"
+    stats = llm_report.main([repo], out, cache, budget=budget, base_url=url, concurrency=4)
+    markdown = out.read_text()
+    # Files are planned in sorted order before anything is sent
+    skipped = markdown.split("Not summarized (token budget): 3 file(s)")[1].split("\n---\n")[0]
+    assert skipped.split() == ["-", "`m3.py`", "-", "`m4.py`", "-", "`m5.py`"]
+    sent = server.stats.requests
+    assert sent == stats["requests"]
+
+    # Same budget again: the three summarized files are cached and free,
+    # so the budget now covers the next three
+    out2 = tmp_path / "report2.md"
+    llm_report.main([repo], out2, cache, budget=budget, base_url=url, concurrency=1)
+    assert "Not summarized" not in out2.read_text()
+
+    # Nothing changed: a third run sends nothing
+    before = server.stats.requests
+    out3 = tmp_path / "report3.md"
+    stats = llm_report.main([repo], out3, cache, base_url=url)
+    assert server.stats.requests == before
+    assert stats["requests"] == 0
+    assert out3.read_text().split("\n---\n")[0] == out2.read_text().split("\n---\n")[0]
@@ -0,0 +1,53 @@
+from matlab_analyzer import analyze_matlab_text
+
+CLASSDEF = """classdef Counter < handle
+    properties
+        x;
+        count (1,1) double = 0
+    end
+    events
+        Changed
+    end
+    enumeration
+        Low (1)
+    end
+    methods
+        function obj = Counter(n)
+            arguments
+                n (1,1) double {mustBePositive}
+            end
+            obj.count = n;
+            disp hello
+        end
+        function inc(obj)
+            obj.count = obj.count + 1;
+            notify(obj, 'Changed');
+        end
+    end
+end
+"""
+
+def test_classdef_sections_declare_no_calls():
+    result = analyze_matlab_text(CLASSDEF)
+    assert result["function_calls"] == ["disp", "notify"]
+    assert result["num_classes"] == 1
+
+def test_classdef_methods():
+    result = analyze_matlab_text(CLASSDEF)
+    names = [f[0] for f in result["functions"]]
+    assert names == ["Counter.Counter", "Counter.inc"]
+    assert result["functions"][0][1:3] == [13, 19]
+    assert result["functions"][0][5] == 1
+
+def test_single_property_section():
+    src = "classdef A\n    properties x; end\nend\n"
+    assert analyze_matlab_text(src)["function_calls"] == []
+
+def test_trailing_comment_is_not_a_comment_line():
+    src = ("% header\n"
+           "y = x'; % note after a terminator\n"
+           "z = 1, % and after a comma\n"
+           "w = [1, ...\n"
+           "     % inside a continued statement\n"
+           "     2];\n")
+    assert analyze_matlab_text(src)["num_comments"] == 2
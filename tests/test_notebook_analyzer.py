@@ -0,0 +1,87 @@
+import io
+import json
+
+import pytest
+
+from main import analyze_notebook_stream
+from notebook_analyzer import JsonStream, iter_cells, read_notebook, neutralize_magics
+
+PNG = "iVBORw0KGgo" * 2000
+
+def code(source, outputs=()):
+    return {"cell_type": "code", "execution_count": 1, "metadata": {"tags": ["x"]},
+            "outputs": list(outputs), "source": source}
+
+NOTEBOOK = {
+    "cells": [
+        {"cell_type": "markdown", "metadata": {}, "source": ["# Title\n", "Some *text* é\n"]},
+        code(["%matplotlib inline\n", "import numpy as np\n", "!pip install foo\n",
+              "np.mean?\n", "def f(x):\n", "    return np.mean(x)\n"],
+             [{"output_type": "display_data", "data": {"image/png": PNG, "text/plain": ["<Figure>"]},
+               "metadata": {}},
+              {"output_type": "stream", "name": "stdout",
+               "text": ["quote \" backslash \\ tab \t unicode ☃\n"]}]),
+        code("%%bash\nls -la\n"),
+        code("%%time\ny = f([1, 2])\n"),
+        code(""),
+        code("def broken(:\n    pass\n"),
+        {"cell_type": "raw", "metadata": {}, "source": "raw text"},
+        code(['s = "escaped \\" quote and \\\\ backslash"\n', "import os.path\n"]),
+    ],
+    "metadata": {"kernelspec": {"name": "python3"}, "numbers": [1, 2.5, -3e4, True, None]},
+    "nbformat": 4,
+    "nbformat_minor": 5,
+}
+
+def expected_cells(nb):
+    for cell in nb["cells"]:
+        source = cell["source"]
+        yield cell["cell_type"], "".join(source) if isinstance(source, list) else source
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_stream_matches_json(chunk_size):
+    text = json.dumps(NOTEBOOK, indent=1)
+    cells = list(iter_cells(JsonStream(io.StringIO(text), chunk_size)))
+    assert [(t, s) for t, s, _ in cells] == list(expected_cells(NOTEBOOK))
+    # Outputs are stepped over, but their size is counted ("[]" for none)
+    assert cells[1][2] >= len(PNG)
+    assert [out for i, (_, _, out) in enumerate(cells) if i != 1] == [0, 2, 2, 2, 2, 0, 2]
+
+def test_nbformat3():
+    nb = {"worksheets": [{"cells": [
+        {"cell_type": "code", "input": ["import sys\n", "x = 1\n"], "outputs": [{"text": "1"}]},
+        {"cell_type": "markdown", "source": "hi"},
+    ], "metadata": {}}], "nbformat": 3}
+    cells = list(iter_cells(JsonStream(io.StringIO(json.dumps(nb)), 5)))
+    assert [(t, s) for t, s, _ in cells] == [("code", "import sys\nx = 1\n"), ("markdown", "hi")]
+
+def test_magics():
+    assert neutralize_magics("%matplotlib inline\n  !ls\nx?\nx = 1") == \
+        "# %matplotlib inline\n  # !ls\n# x?\nx = 1"
+    assert neutralize_magics("%%bash\nls") == "# %%bash\n# ls"
+    # Python cell magics keep their body
+    assert neutralize_magics("%%time\nx = 1") == "# %%time\nx = 1"
+
+def test_read_notebook_stats_and_metrics():
+    text = json.dumps(NOTEBOOK)
+    nb = read_notebook(io.StringIO(text))
+    assert nb["cells"]["code_cells"] == 6
+    assert nb["cells"]["empty_code_cells"] == 1
+    assert nb["cells"]["markdown_cells"] == 1
+    assert nb["cells"]["markdown_lines"] == 2
+    assert nb["cells"]["raw_cells"] == 1
+    assert nb["cells"]["unparsable_cells"] == 1
+    assert nb["cells"]["output_chars"] >= len(PNG)
+
+    metrics = analyze_notebook_stream(io.StringIO(text))
+    assert metrics["language"] == "jupyter"
+    assert [r[0] for r in metrics["functions"]] == ["f"]
+    assert set(metrics["imports"]) == {"numpy", "os"}
+    assert "broken" not in metrics["function_names"]
+    assert metrics["notebook"] == nb["cells"]
+
+def test_truncated_notebook():
+    text = json.dumps(NOTEBOOK)[:5000]
+    with pytest.raises(ValueError):
+        read_notebook(io.StringIO(text))
+    assert analyze_notebook_stream(io.StringIO(text))["loc"] == 0
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from query_server import make_server
+
+def file_metrics(language, loc, imports, max_cc, decisions):
+    return {"language": language, "loc": loc, "imports": imports, "function_calls": [],
+            "functions": [],
+            "complexity": {"max_cc": max_cc, "avg_cc": max_cc / 2, "total_cc": max_cc},
+            "pseudo_complexity": {"decision_points": decisions}}
+
+def make_report(total_loc=47):
+    return {
+        "repo_a": {
+            "total_loc": 40, "total_functions": 3, "num_source_files": 2,
+            "imports": [["numpy", 2], ["os", 1]],
+            "files": {
+                "a.py": file_metrics("python", 30, {"numpy": 2, "os": 1}, 9, 4),
+                "b.m": file_metrics("matlab", 10, {"stats": 1}, 2, 1),
+            },
+        },
+        "repo_b": {
+            "total_loc": 7, "total_functions": 1, "num_source_files": 1,
+            "imports": [["os", 1]],
+            "files": {"c.py": file_metrics("python", 7, {"os": 1}, 5, 2)},
+        },
+        "_global": {"total_loc": total_loc,
+                    "global_import_counts": [["numpy", 2], ["os", 2], ["stats", 1]]},
+        "_languages": {"python": {"total_loc": 37}, "matlab": {"total_loc": 10}},
+    }
+
+def write(path, report):
+    path.write_text(json.dumps(report))
+
+@pytest.fixture
+def serve(tmp_path):
+    servers = []
+
+    def start(report_path):
+        server = make_server(report_path, tmp_path / "results", port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    (tmp_path / "results").mkdir()
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as r:
+            return r.status, r.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+def get_json(url):
+    status, body = get(url)
+    return status, json.loads(body)
+
+def test_routes(serve, tmp_path):
+    path = tmp_path / "analysis.json"
+    write(path, make_report())
+    url = serve(path)
+
+    assert get_json(url + "/") == (200, make_report()["_global"])
+    assert get_json(url + "/summary")[1]["total_loc"] == 47
+
+    status, repo = get_json(url + "/repos/repo_a")
+    assert status == 200
+    assert repo["loc_per_language"] == {"python": 30, "matlab": 10}
+    assert repo["imports"] == [["numpy", 2], ["os", 1]]
+
+    assert get_json(url + "/languages/matlab") == (200, {"total_loc": 10})
+    assert get_json(url + "/imports?top=2")[1] == [["numpy", 2], ["os", 2]]
+    assert get_json(url + "/imports?lang=python")[1] == [["numpy", 2], ["os", 2]]
+
+    status, files = get_json(url + "/complexity?top=2")
+    assert [(f["repo"], f["file"], f["max_cc"]) for f in files] == \
+        [("repo_a", "a.py", 9), ("repo_b", "c.py", 5)]
+
+def test_errors(serve, tmp_path):
+    path = tmp_path / "analysis.json"
+    write(path, make_report())
+    url = serve(path)
+
+    assert get(url + "/nope")[0] == 404
+    assert get(url + "/repos/missing")[0] == 404
+    assert get(url + "/repos/_global")[0] == 404
+    assert get(url + "/languages/cobol")[0] == 404
+    # Older report without the section
+    assert get(url + "/distributions")[0] == 404
+    status, body = get_json(url + "/imports?top=x")
+    assert status == 400 and "error" in body
+
+def test_plot_paths(serve, tmp_path):
+    path = tmp_path / "analysis.json"
+    write(path, make_report())
+    (tmp_path / "results" / "loc.png").write_bytes(b"\x89PNG loc")
+    (tmp_path / "secret.png").write_bytes(b"\x89PNG secret")
+    url = serve(path)
+
+    assert get(url + "/plots/loc.png") == (200, b"\x89PNG loc")
+    for name in ("..%2Fsecret.png", "..", "missing.png", "analysis.json"):
+        status, body = get(url + "/plots/" + name)
+        assert status == 404 and b"PNG" not in body
+    assert get(url + "/plots/../secret.png")[0] == 404
+
+def test_missing_report(serve, tmp_path):
+    path = tmp_path / "analysis.json"
+    url = serve(path)
+    status, body = get_json(url + "/summary")
+    assert status == 503 and "error" in body
+
+    # Picked up once main.py writes it
+    write(path, make_report())
+    assert get_json(url + "/summary")[0] == 200
+
+def test_cache_invalidated_on_mtime_change(serve, tmp_path):
+    path = tmp_path / "analysis.json"
+    write(path, make_report(total_loc=47))
+    url = serve(path)
+    assert get_json(url + "/summary")[1]["total_loc"] == 47
+    assert get_json(url + "/functions")[1] == []
+
+    mtime = path.stat().st_mtime_ns
+    report = make_report(total_loc=50)
+    report["repo_b"]["files"]["c.py"]["functions"] = [["f", 1, 7, 7, 5, 0, 0]]
+    write(path, report)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+    assert get_json(url + "/summary")[1]["total_loc"] == 50
+    # Derived indexes are rebuilt from the new report too
+    assert [f["name"] for f in get_json(url + "/functions")[1]] == ["f"]
+
+def test_route_error_is_500(serve, tmp_path):
+    path = tmp_path / "analysis.json"
+    report = make_report()
+    report["repo_b"]["files"]["c.py"]["complexity"] = None
+    write(path, report)
+    url = serve(path)
+    status, body = get_json(url + "/complexity")
+    assert status == 500 and "TypeError" in body["error"]
@@ -0,0 +1,62 @@
+from collections import Counter
+
+import numpy as np
+
+from report_columns import ReportColumns, load_columns
+from report_io import write_report
+
+def file_metrics(language, loc, imports, functions=()):
+    return {"language": language, "loc": loc, "num_functions": len(functions),
+            "imports": imports, "function_names": [f[0] for f in functions],
+            "functions": [list(f) for f in functions],
+            "complexity": {"cc_values": [f[4] for f in functions]}}
+
+REPORT = {
+    "repo_a": {"files": {
+        # import os / from os import path / import os.path
+        "a.py": file_metrics("python", 30, {"os": 3, "numpy": 1},
+                             [("f", 1, 10, 10, 2, 1, 0), ("g", 12, 30, 19, 5, 2, 1)]),
+        "b.py": file_metrics("python", 5, {"numpy": 2}),
+        "c.m": file_metrics("matlab", 8, {"stats": 1}),
+    }},
+    "repo_b": {"files": {
+        "d.py": file_metrics("python", 12, {"os": 1, "sys": 1}, [("f", 1, 12, 12, 1, 0, 0)]),
+    }},
+    "_global": {"total_loc": 55},
+}
+
+def python_files():
+    for name, repo in REPORT.items():
+        if name.startswith("_"):
+            continue
+        for metrics in repo["files"].values():
+            if metrics["language"] == "python":
+                yield name, metrics
+
+def test_imports_count_statements_like_counter():
+    cols = ReportColumns.from_report(REPORT)
+    expected = Counter()
+    for _, metrics in python_files():
+        expected.update(metrics["imports"])
+    assert dict(cols.most_common("imports", mask=cols.mask(language="python"))) == dict(expected)
+    assert cols.most_common("imports", 1, mask=cols.mask(language="python")) == [("os", 4)]
+    assert cols.counts_per_file("imports").tolist() == [4, 2, 1, 2]
+
+def test_flattened_and_grouped_columns():
+    cols = ReportColumns.from_report(REPORT)
+    assert cols["loc"].tolist() == [30, 5, 8, 12]
+    assert cols.values("function_lengths").tolist() == [10, 19, 12]
+    assert cols.most_common("function_names") == [("f", 2), ("g", 1)]
+    assert cols.group_sum("loc").tolist() == [43, 12]
+    assert cols.group_max("cc_values").tolist() == [5, 1]
+    python = cols.mask(language="python")
+    assert cols.values("loc", python).sum() == 47
+
+def test_cache_round_trip(tmp_path):
+    path = tmp_path / "analysis.json"
+    write_report(REPORT, path)
+    first = load_columns(path)
+    assert (tmp_path / "analysis_columns.npz").exists()
+    cached = load_columns(path)
+    for key, value in first.arrays.items():
+        assert np.array_equal(cached.arrays[key], value)
@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import report_io
+from report_io import ReportWriter, write_report, load_report, open_report, find_report
+
+REPORT = {
+    "repo": {"total_loc": 3, "files": {"a.py": {"loc": 3, "doc": "two\nlines", "e": {}}},
+             "imports": [], "skipped": {}},
+    "other": {"total_loc": 0, "files": {}, "imports": [["os", 2]], "skipped": {}},
+    "_global": {"total_loc": 3},
+    "_techniques": [],
+}
+
+def read_bytes(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        return f.read()
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_writer_matches_write_report(tmp_path, compression):
+    written = ReportWriter(tmp_path / "inc.json", compression).write(REPORT)
+    expected = write_report(REPORT, tmp_path / "full.json", compression)
+    assert read_bytes(written) == read_bytes(expected)
+
+def test_writer_reencodes_only_changed_entries(tmp_path):
+    writer = ReportWriter(tmp_path / "analysis.json")
+    writer.write(REPORT)
+    kept = writer.encoded["other"]
+
+    report = dict(REPORT, repo=dict(REPORT["repo"], total_loc=4), new={"files": {}})
+    del report["_techniques"]
+    path = writer.write(report, changed={"repo"})
+    assert writer.encoded["other"] is kept
+    assert load_report(path) == report
+    assert read_bytes(path) == read_bytes(write_report(report, tmp_path / "full.json"))
+
+def test_writer_empty_report(tmp_path):
+    path = ReportWriter(tmp_path / "analysis.json").write({})
+    assert load_report(path) == {}
+
+BIG = dict(REPORT, big={"files": {f"f{i}.py": {"loc": i, "text": "x" * 50} for i in range(3000)}})
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_round_trip(tmp_path, compression):
+    if compression == "zstd" and not report_io.ZSTD_AVAILABLE:
+        pytest.skip("zstandard not installed")
+    path = write_report(BIG, tmp_path / "analysis.json", compression)
+    assert path.name == "analysis.json" + report_io.SUFFIXES[compression]
+    # Loaders always pass the plain name
+    assert load_report(tmp_path / "analysis.json") == BIG
+    with open_report(tmp_path / "analysis.json") as f:
+        first = f.read(10)
+        rest = f.read()
+    assert json.loads(first + rest) == BIG
+    if compression:
+        assert os.path.getsize(path) < len(json.dumps(BIG)) / 4
+
+def test_gzip_is_compact(tmp_path):
+    path = write_report(REPORT, tmp_path / "analysis.json", "gzip")
+    assert read_bytes(path) == json.dumps(REPORT, separators=(",", ":")).encode()
+
+def test_variants(tmp_path):
+    plain = write_report(REPORT, tmp_path / "analysis.json")
+    gz = write_report(dict(REPORT, new={}), tmp_path / "analysis.json", "gzip")
+    # Writing one variant removes the others
+    assert not plain.exists()
+    assert find_report(tmp_path / "analysis.json") == gz
+
+    # A stale variant left by hand loses to the newer one
+    plain.write_text(json.dumps(REPORT))
+    os.utime(gz, ns=(1, 1))
+    assert find_report(tmp_path / "analysis.json") == plain
+    assert load_report(tmp_path / "analysis.json") == REPORT
+
+def test_missing_and_unknown(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_report(tmp_path / "analysis.json")
+    with pytest.raises(ValueError):
+        write_report(REPORT, tmp_path / "analysis.json", "bz2")
+
+def test_zst_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_io, "ZSTD_AVAILABLE", False)
+    (tmp_path / "analysis.json.zst").write_bytes(b"")
+    with pytest.raises(RuntimeError):
+        load_report(tmp_path / "analysis.json")
@@ -0,0 +1,41 @@
+from config import make_root
+from main import estimate_repos, scan_repos, build_report
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, bytes):
+        path.write_bytes(data)
+    else:
+        path.write_text(data)
+
+def make_tree(tmp_path):
+    code = tmp_path / "code"
+    for i in range(6):
+        write(code / "repoA" / f"m{i}.py", "import os\n" + "x = 1\n" * (i * 20 + 1))
+    write(code / "repoA" / "blob.py", b"\x00\x01\x02" * 4000)          # binary, skipped
+    write(code / "repoA" / "run.sh", "echo hi\n" * 5)
+    write(code / "repoB" / "data.csv", b"\x00" * 100)                   # only a skipped file
+    return [make_root(code)]
+
+def test_full_sample_matches_exact_scan(tmp_path):
+    roots = make_tree(tmp_path)
+    exact = build_report(*scan_repos(roots))
+    estimate = estimate_repos(roots, fraction=1.0, seed=1)
+
+    assert exact["_global"]["num_skipped_files"] == 2
+    for key in ("total_source_files", "total_loc", "total_functions"):
+        assert estimate["_global"][key] == exact["_global"][key]
+    for lang, stats in exact["_languages"].items():
+        assert estimate["_languages"][lang]["num_files"] == stats["num_files"]
+        assert estimate["_languages"][lang]["total_loc"] == stats["total_loc"]
+    assert set(estimate["_languages"]) == set(exact["_languages"])
+    for cat, stats in exact["_categories"].items():
+        assert estimate["_categories"][cat]["total_files"] == stats["total_files"]
+    assert estimate["_estimate"]["files_total"] == 9
+
+def test_interval_covers_file_count(tmp_path):
+    roots = make_tree(tmp_path)
+    estimate = estimate_repos(roots, fraction=0.3, seed=3)
+    iv = estimate["_estimate"]["intervals"]["global/_/total_source_files"]
+    assert iv["low"] <= iv["estimate"] <= iv["high"]
+    assert estimate["_estimate"]["files_sampled"] < 9
@@ -0,0 +1,56 @@
+import time
+
+from scheduler import plan_batches, run_batches, summarize_batches, percentile
+
+def sizes_of(batch_tasks, sizes):
+    return [sizes[t] for t in batch_tasks]
+
+def test_plan_batches_lpt():
+    sizes = {"huge1": 5 << 20, "huge2": 2 << 20, **{f"s{i}": 1000 * (i + 1) for i in range(200)}}
+    batches = plan_batches(sizes.items(), batch_bytes=50_000, batch_files=16)
+
+    # Every task exactly once
+    assert sorted(t for tasks, _ in batches for t in tasks) == sorted(sizes)
+    # Huge files alone, everything largest first
+    assert batches[0] == (["huge1"], 5 << 20)
+    assert batches[1] == (["huge2"], 2 << 20)
+    totals = [nbytes for _, nbytes in batches]
+    assert totals == sorted(totals, reverse=True)
+    for tasks, nbytes in batches[2:]:
+        assert nbytes == sum(sizes_of(tasks, sizes))
+        assert len(tasks) <= 16
+        # A batch closes as soon as it reaches the byte budget
+        assert nbytes - max(sizes_of(tasks, sizes)) < 50_000
+    assert plan_batches([]) == []
+
+def work(tasks):
+    time.sleep(0.05)
+    return [t * 2 for t in tasks]
+
+def test_run_batches_in_process():
+    batches = [([1, 2], 20), ([3], 10)]
+    out = list(run_batches(work, batches, max_workers=1, groups=["a", "b"]))
+    assert [(tasks, results) for tasks, results, _ in out] == [([1, 2], [2, 4]), ([3], [6])]
+    assert [row["group"] for _, _, row in out] == ["a", "b"]
+
+def test_group_caps():
+    batches = [([i], 100 - i) for i in range(8)]
+    groups = ["share"] * 4 + ["ssd"] * 4
+    rows = []
+    results = {}
+    for tasks, res, row in run_batches(work, batches, max_workers=4, groups=groups,
+                                       limits={"share": 1, "ssd": None}):
+        results[tasks[0]] = res
+        rows.append(row)
+    assert results == {i: [2 * i] for i in range(8)}
+
+    summary = summarize_batches(rows, 4)
+    assert summary["batches"] == 8 and summary["files"] == 8
+    assert summary["groups"]["share"]["max_concurrent"] == 1
+    assert summary["groups"]["ssd"]["max_concurrent"] > 1
+    assert 0 < summary["utilization"] <= 1
+
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1, 2, 3, 4, 5], 0.5) == 3
+    assert percentile([1, 2, 3, 4, 5], 0.99) == 5
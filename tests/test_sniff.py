@@ -0,0 +1,77 @@
+import codecs
+
+import pytest
+
+from main import analyze_file
+from sniff import sniff_bytes, sniff_file, SNIFF_BYTES
+
+TEXT = "import os\n# café ☃\nx = 1\n"
+
+@pytest.mark.parametrize("encoding, sniffed", [
+    ("utf-8-sig", "utf-8-sig"),
+    ("utf-16", "utf-16"),                  # BOM written by the codec
+    ("utf-32", "utf-32"),
+])
+def test_boms(encoding, sniffed):
+    data = TEXT.encode(encoding)
+    assert sniff_bytes(data) == (sniffed, None, None)
+    assert data.decode(sniffed) == TEXT
+
+def test_utf32_le_bom_is_not_utf16():
+    data = codecs.BOM_UTF32_LE + TEXT.encode("utf-32-le")
+    assert sniff_bytes(data)[0] == "utf-32"
+
+@pytest.mark.parametrize("encoding", ["utf-16-le", "utf-16-be"])
+def test_utf16_without_bom(encoding):
+    data = (TEXT * 20).encode(encoding)
+    assert sniff_bytes(data) == (encoding, None, None)
+    # Odd-length sample (cut in the middle of a character)
+    assert sniff_bytes(data[:101])[0] == encoding
+
+def test_plain_text():
+    assert sniff_bytes(b"") == ("utf-8", None, None)
+    assert sniff_bytes(TEXT.encode()) == ("utf-8", None, None)
+    # A multi-byte character cut off at the end of the sample is still UTF-8
+    assert sniff_bytes(TEXT.encode()[:-9])[0] == "utf-8"
+    assert sniff_bytes("café au lait".encode("latin-1")) == ("latin-1", None, None)
+    # Tabs, form feeds, ANSI colours are text
+    assert sniff_bytes(b"\tx\x0c\x1b[31mred\x1b[0m\r\n")[0] == "utf-8"
+
+def test_lfs_pointer():
+    pointer = (b"version https://git-lfs.github.com/spec/v1\n"
+               b"oid sha256:4d7a2146\nsize 12345\n")
+    assert sniff_bytes(pointer) == (None, None, "lfs_pointer")
+
+def test_nul_and_control_bytes():
+    assert sniff_bytes(b"abc\x00def\x00\x00\x01") == (None, None, "binary:nul_bytes")
+    noisy = bytes(range(1, 32)) * 10 + b"text" * 10
+    assert sniff_bytes(noisy) == (None, None, "binary:control_bytes")
+    # A few stray control bytes are tolerated
+    assert sniff_bytes(b"x = 1\n" * 50 + b"\x01")[0] == "utf-8"
+
+@pytest.mark.parametrize("head, fmt", [
+    (b"PK\x03\x04rest", "zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1rest", "ole2"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\x89HDF\r\n\x1a\nrest", "hdf5"),
+    (b"MATLAB 5.0 MAT-file, Platform", "mat"),
+])
+def test_magic(head, fmt):
+    assert sniff_bytes(head) == (None, fmt, "binary:" + fmt)
+
+def test_sniff_file_and_dispatch(tmp_path):
+    big = tmp_path / "big.py"
+    big.write_bytes(b"x = 1\n" * SNIFF_BYTES + b"\x00")      # NUL beyond the sniffed prefix
+    assert sniff_file(big) == ("utf-8", None, None)
+    assert sniff_file(tmp_path / "missing.py") == (None, None, "unreadable:FileNotFoundError")
+
+    utf16 = tmp_path / "script.m"
+    utf16.write_bytes("% comment\nx = 1;\n".encode("utf-16-le"))
+    assert analyze_file(utf16, "matlab")["loc"] == 2
+
+    sheet = tmp_path / "table.xlsx"
+    sheet.write_bytes(b"PK\x03\x04" + b"\x00" * 100)
+    assert analyze_file(sheet, "excel")["binary_format"] == "zip"
+    fake = tmp_path / "model.py"
+    fake.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
+    assert analyze_file(fake, "python")["skipped"] == "binary:png"
@@ -0,0 +1,41 @@
+import json
+
+import main
+from config import load_config
+from report_io import load_report
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+def make_config(tmp_path):
+    base = tmp_path / "base"
+    write(base / "techniques.json", json.dumps({
+        "Spike sorting": {"imports": ["kilosort"], "keywords": ["Waveform"]},
+    }))
+    write(tmp_path / "code" / "repoA" / "sort.py", "import kilosort\n\ndef f():\n    pass\n")
+    write(tmp_path / "code" / "repoA" / "plot.m", "% waveform plot\nplot(1)\n")
+    path = write(tmp_path / "metacode.json", json.dumps({
+        "base": str(base),
+        "roots": [{"path": str(tmp_path / "code")}],
+    }))
+    return load_config(path)
+
+def test_techniques_file_follows_config(tmp_path):
+    config = make_config(tmp_path)
+    assert config["techniques"] == tmp_path / "base" / "techniques.json"
+
+    # Two workers: the spec must reach the pool processes too
+    main.main(config=config, workers=2)
+    report = load_report(config["results_dir"] / "analysis.json")
+    assert report["_techniques"] == ["Spike sorting"]
+    files = report["repoA"]["files"]
+    assert files["sort.py"]["techniques"] == ["Spike sorting"]
+    assert files["plot.m"]["techniques"] == ["Spike sorting"]
+
+def test_scan_defaults_to_builtin_spec(tmp_path):
+    config = make_config(tmp_path)
+    repos, totals = main.scan_repos(config["roots"])
+    assert list(totals["techniques"]) == list(main.DEFAULT_TECHNIQUES)
+    assert repos["repoA"]["files"]["sort.py"]["techniques"] == []
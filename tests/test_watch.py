@@ -0,0 +1,76 @@
+import json
+import shutil
+
+from config import make_root
+from main import scan_repos, build_report
+from report_io import ReportWriter, load_report
+from watch import apply_changes, repo_folders, snapshot, write_update, refresh_derived
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+def make_tree(tmp_path):
+    one, two = tmp_path / "one", tmp_path / "two"
+    write(one / "repoA" / "a.py", "import os\n\ndef f(x):\n    return x\n")
+    write(one / "repoA" / "raw_data" / "gen.py", "x = 1\n")
+    write(two / "repoA" / "b.py", "def g():\n    pass\n")
+    write(two / "repoB" / "c.py", "print(1)\n")
+    roots = [make_root(one, "one", exclude=["raw_data"]),
+             make_root(two, "two", max_readers=1)]
+    return one, two, roots
+
+def repo_files(repos):
+    return {name: sorted(entry["files"]) for name, entry in repos.items()}
+
+def test_snapshot_uses_root_excludes(tmp_path):
+    one, two, roots = make_tree(tmp_path)
+    snap = snapshot(roots)
+    assert one / "repoA" / "a.py" in snap
+    assert two / "repoA" / "b.py" in snap
+    assert one / "repoA" / "raw_data" / "gen.py" not in snap
+
+def test_apply_changes_across_roots(tmp_path):
+    one, two, roots = make_tree(tmp_path)
+    repos, totals = scan_repos(roots)
+    assert repo_files(repos) == {"repoA": ["a.py"], "two:repoA": ["b.py"], "repoB": ["c.py"]}
+    folders = repo_folders(repos)
+
+    changed = {
+        write(two / "repoA" / "b.py", "def g():\n    return 1\n\n\ndef h():\n    pass\n"),
+        write(one / "repoA" / "raw_data" / "more.py", "y = 2\n"),    # excluded in root "one"
+        write(two / "repoC" / "d.py", "import sys\n"),                # new repo
+        two / "repoB",                                                 # deleted repo
+    }
+    shutil.rmtree(two / "repoB")
+    touched = apply_changes(repos, totals, changed, roots, folders)
+    assert touched == {"two:repoA": 1, "repoC": 1, "repoB": 1}
+
+    assert repo_files(repos) == {"repoA": ["a.py"], "two:repoA": ["b.py"], "repoC": ["d.py"]}
+    assert repos["two:repoA"]["files"]["b.py"]["num_functions"] == 2
+    assert repos["repoC"]["root"] == "two"
+    assert repos["repoC"]["path"] == str(two / "repoC")
+
+    # The patched totals match a fresh scan of the new tree
+    fresh_repos, fresh_totals = scan_repos(roots)
+    for key in ("total_source_files", "total_loc", "total_functions"):
+        assert totals[key] == fresh_totals[key]
+    patched, fresh = build_report(repos, totals), build_report(fresh_repos, fresh_totals)
+    for name in fresh_repos:
+        assert patched[name] == fresh[name]
+    assert patched["_global"] == fresh["_global"]
+
+def test_incremental_report_matches_full_report(tmp_path):
+    one, two, roots = make_tree(tmp_path)
+    results = tmp_path / "results"
+    results.mkdir()
+    repos, totals = scan_repos(roots)
+    writer = ReportWriter(results / "analysis.json")
+    derived = refresh_derived(writer, repos, totals, results)
+    assert (results / "call_graph.json").exists()
+
+    changed = {write(one / "repoA" / "a.py", "def f(x):\n    return x * 2\n")}
+    touched = apply_changes(repos, totals, changed, roots, repo_folders(repos))
+    write_update(writer, repos, totals, derived, touched, results)
+    assert load_report(results / "analysis.json") == json.loads(json.dumps(build_report(repos, totals)))
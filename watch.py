@@ -0,0 +1,304 @@
+import argparse
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from main import (
+    CONFIG, ROOTS, RESULTS_DIR,
+    is_excluded, file_language, analyze_file, empty_metrics, as_roots,
+    scan_repos, new_repo_entry, add_file, write_json, write_indexes, build_python_summary,
+    build_repo_section, build_summary_sections, build_derived_sections,
+)
+from import_index import build_local_module_index
+from report_io import ReportWriter
+from config import load_config
+from techniques import load_techniques
+
+# Try to import inotify_simple for event-driven watching (Linux only)
+try:
+    from inotify_simple import INotify, flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+# -------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------
+DEBOUNCE_SECONDS = 0.25   # quiet time before a burst of changes is applied
+MAX_DELAY_SECONDS = 2.0   # apply anyway if changes keep arriving this long
+POLL_INTERVAL = 1.0       # seconds between tree snapshots in polling mode
+DERIVED_SECONDS = 30.0    # min. seconds between refreshes of clones / call graph / indexes
+
+# -------------------------------------------------------
+# CHANGE SOURCES
+# -------------------------------------------------------
+# Both sources yield a (possibly empty) set of changed paths roughly
+# every DEBOUNCE_SECONDS / POLL_INTERVAL, so the debounce loop can
+# tell bursts from quiet periods. Every scan root (config.py) is
+# watched, with its own excluded directories.
+
+def snapshot(roots):
+    snap = {}
+    for root in roots:
+        if not root["path"].is_dir():
+            continue
+        for p in root["path"].rglob("*"):
+            if is_excluded(p, root["exclude"]) or file_language(p) is None:
+                continue
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            snap[p] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+def poll_changes(roots, interval: float = POLL_INTERVAL):
+    prev = snapshot(roots)
+
+    def loop(prev):
+        while True:
+            time.sleep(interval)
+            cur = snapshot(roots)
+            yield {p for p in cur.keys() | prev.keys() if cur.get(p) != prev.get(p)}
+            prev = cur
+
+    return loop(prev)
+
+def inotify_changes(roots, timeout: float = DEBOUNCE_SECONDS):
+    ino = INotify()
+    mask = (flags.CREATE | flags.CLOSE_WRITE | flags.MODIFY | flags.DELETE
+            | flags.MOVED_FROM | flags.MOVED_TO)
+    watches = {}            # watch descriptor -> (directory, its root)
+
+    def add_tree(top: Path, root):
+        for d in [top, *top.rglob("*")]:
+            if d.is_dir() and not is_excluded(d, root["exclude"]):
+                try:
+                    watches[ino.add_watch(str(d), mask)] = (d, root)
+                except OSError:
+                    pass
+
+    # Watches are registered before returning, so nothing that happens
+    # during the initial scan is missed.
+    for root in roots:
+        if root["path"].is_dir():
+            add_tree(root["path"], root)
+
+    def loop():
+        while True:
+            changed = set()
+            for ev in ino.read(timeout=int(timeout * 1000)):
+                watched = watches.get(ev.wd)
+                if watched is None or not ev.name:
+                    continue
+                base, root = watched
+                path = base / ev.name
+                if ev.mask & flags.ISDIR and ev.mask & (flags.CREATE | flags.MOVED_TO):
+                    add_tree(path, root)
+                changed.add(path)
+            yield changed
+
+    return loop()
+
+# -------------------------------------------------------
+# INCREMENTAL UPDATE
+# -------------------------------------------------------
+def repo_folders(repos) -> dict:
+    """Repo folder -> repo name, for the repos scan_repos found."""
+    return {Path(entry["path"]): name for name, entry in repos.items() if "path" in entry}
+
+def locate(path: Path, roots, repos, folders):
+    """
+    (root, repo name, repo folder, path relative to the repo) of a changed
+    path, or None outside the roots. folders maps repo folders to the
+    names scan_repos gave them; a new repo whose name is taken by another
+    root becomes "<root name>:<repo>", as in main.list_repo_files.
+    """
+    for root in roots:
+        try:
+            parts = path.relative_to(root["path"]).parts
+        except ValueError:
+            continue
+        if not parts:
+            return None
+        folder = root["path"] / parts[0]
+        name = folders.get(folder)
+        if name is None:
+            name = parts[0]
+            if name in repos:
+                name = f"{root['name']}:{name}"
+        return root, name, folder, os.sep.join(parts[1:])
+    return None
+
+def expand_changes(paths, roots, repos, folders):
+    """Turn raw changed paths into the set of (root, repo, folder, relative) files to refresh."""
+    targets = set()
+
+    def add(p):
+        found = locate(p, roots, repos, folders)
+        if found is not None:
+            root, name, folder, relative = found
+            targets.add((root["name"], name, folder, relative))
+
+    for path in paths:
+        found = locate(path, roots, repos, folders)
+        if found is None:
+            continue
+        root, repo_name, folder, relative = found
+
+        if path.is_dir():
+            for p in path.rglob("*"):
+                if p.is_file():
+                    add(p)
+        elif path.exists():
+            add(path)
+        else:
+            # Deleted file, directory or whole repo: drop everything under it
+            entry = repos.get(repo_name)
+            if entry is None:
+                continue
+            prefix = relative + os.sep if relative else ""
+            for rel in list(entry["files"]) + list(entry["skipped"]):
+                if rel == relative or rel.startswith(prefix):
+                    targets.add((root["name"], repo_name, folder, rel))
+    return targets
+
+def apply_changes(repos, totals, paths, roots, folders) -> Counter:
+    """Re-analyze changed files and patch the totals in place. Returns {repo: #files touched}."""
+    roots_by_name = {root["name"]: root for root in roots}
+    touched = Counter()
+    for root_name, repo_name, folder, relative in expand_changes(paths, roots, repos, folders):
+        if not relative:
+            continue
+        root = roots_by_name[root_name]
+        path = folder / relative
+        lang_cat = file_language(path)
+        if lang_cat is None or is_excluded(path, root["exclude"]):
+            continue
+        lang, category = lang_cat
+
+        entry = repos.get(repo_name)
+        if entry is None:
+            entry = repos[repo_name] = new_repo_entry(totals["approx"])
+            entry["root"] = root_name
+            entry["path"] = str(folder)
+            folders[folder] = repo_name
+
+        old = entry["files"].get(relative)
+        if old is not None:
+            add_file(totals, entry, relative, old, category, sign=-1)
+        elif relative in entry["skipped"]:
+            old = dict(empty_metrics(), language=lang, skipped=entry["skipped"][relative])
+            add_file(totals, entry, relative, old, category, sign=-1)
+
+        if path.is_file():
+            if lang == "python":
+                entry["local_modules"].update(build_local_module_index([path], folder))
+            metrics = analyze_file(path, lang, entry["local_modules"], totals["techniques"])
+            add_file(totals, entry, relative, metrics, category)
+
+        if not entry["files"] and not entry["skipped"] and not folder.is_dir():
+            del repos[repo_name]
+            folders.pop(folder, None)
+        touched[repo_name] += 1
+    return touched
+
+# -------------------------------------------------------
+# REPORT UPDATE
+# -------------------------------------------------------
+# A batch of changes rewrites analysis.json re-encoding only the touched
+# repos and the summary sections (ReportWriter keeps the JSON text of the
+# rest). The derived sections (_clones) and the cross-repo indexes
+# (function index, duplicates, call graph) cost a pass over the whole
+# corpus, so they are refreshed at most every DERIVED_SECONDS, once the
+# changes have quieted down; until then the report keeps the last ones.
+
+def write_update(writer: ReportWriter, repos, totals, derived: dict, changed, results_dir: Path):
+    """Rewrite the report; `changed` names the repos / derived sections to re-encode."""
+    write_json(build_python_summary(totals), results_dir / "python_summary.json")
+    report = {name: build_repo_section(entry) for name, entry in repos.items()}
+    summary = build_summary_sections(repos, totals)
+    report.update(summary)
+    report.update(derived)
+    writer.write(report, set(changed) | set(summary))
+    return report
+
+def refresh_derived(writer: ReportWriter, repos, totals, results_dir: Path):
+    derived = build_derived_sections(repos)
+    report = write_update(writer, repos, totals, derived, derived, results_dir)
+    write_indexes(report, results_dir)
+    return derived
+
+# -------------------------------------------------------
+# WATCH LOOP
+# -------------------------------------------------------
+def watch(roots=ROOTS, results_dir: Path = RESULTS_DIR,
+          use_inotify: bool = INOTIFY_AVAILABLE, poll_interval: float = POLL_INTERVAL,
+          approx: bool = False, compression=None, workers: int = 1, techniques=None):
+    roots = as_roots(roots)
+    if techniques is None:
+        techniques = load_techniques(CONFIG["techniques"])
+    if use_inotify:
+        changes = inotify_changes(roots)
+        print("[watch] using inotify")
+    else:
+        changes = poll_changes(roots, poll_interval)
+        print(f"[watch] polling every {poll_interval:.2f}s")
+
+    # Same scan as main.py: every root, its excludes and its max_readers
+    repos, totals = scan_repos(roots, approx, max_workers=workers, techniques=techniques)
+    folders = repo_folders(repos)
+    results_dir.mkdir(exist_ok=True)
+    writer = ReportWriter(results_dir / "analysis.json", compression)
+    derived = refresh_derived(writer, repos, totals, results_dir)
+    derived_at = time.monotonic()
+    derived_stale = False
+    print(f"[watch] initial scan: {totals['total_source_files']} files")
+
+    pending = set()
+    first = last = 0.0
+    for changed in changes:
+        now = time.monotonic()
+        if derived_stale and not pending and not changed and now - derived_at >= DERIVED_SECONDS:
+            derived = refresh_derived(writer, repos, totals, results_dir)
+            derived_at, derived_stale = now, False
+            print(f"[watch] clones and indexes refreshed in {time.monotonic() - now:.3f}s")
+        if changed:
+            if not pending:
+                first = now
+            pending |= changed
+            last = now
+            if now - first < MAX_DELAY_SECONDS:
+                continue
+        if not pending or (now - last < DEBOUNCE_SECONDS and now - first < MAX_DELAY_SECONDS):
+            continue
+
+        t0 = time.monotonic()
+        touched = apply_changes(repos, totals, pending, roots, folders)
+        pending = set()
+        if touched:
+            write_update(writer, repos, totals, derived, touched, results_dir)
+            derived_stale = True
+            print(f"[watch] {sum(touched.values())} file(s) updated in {time.monotonic() - t0:.3f}s "
+                  f"(total LOC {totals['total_loc']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep analysis.json up to date while the scan roots change.")
+    parser.add_argument("--poll", action="store_true", help="force polling instead of inotify")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="polling interval in seconds")
+    parser.add_argument("--approx", action="store_true", help="count imports with fixed-memory sketches")
+    parser.add_argument("--compress", choices=["gzip", "zstd"], help="write a compressed analysis.json")
+    parser.add_argument("--workers", type=int, default=1, help="processes for the initial scan")
+    parser.add_argument("--config", type=Path,
+                        help="configuration file (default: metacode.json, see config.py)")
+    args = parser.parse_args()
+
+    config = load_config(args.config) if args.config else CONFIG
+    try:
+        watch(config["roots"], config["results_dir"], INOTIFY_AVAILABLE and not args.poll,
+              args.interval, args.approx, args.compress, max(1, args.workers),
+              load_techniques(config["techniques"]))
+    except KeyboardInterrupt:
+        print("\n[watch] stopped")
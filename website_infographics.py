@@ -1,21 +1,14 @@
-import json
 from pathlib import Path
 import matplotlib.pyplot as plt
 import numpy as np
-from collections import Counter
+from report_columns import load_columns
+from config import load_config
 
-BASE = Path("/Users/acalapai/Desktop/CodeAnalysis")
-RESULTS = BASE / "results"
+CONFIG = load_config()   # metacode.json (see config.py)
+RESULTS = CONFIG["results_dir"]
 ANALYSIS = RESULTS / "analysis.json"
 
-with open(ANALYSIS, "r") as f:
-    data = json.load(f)
-
-import_counter = Counter()
-cc_values = []
-function_lengths = []
-python_loc = 0
-python_files = 0
+cols = load_columns(ANALYSIS)   # also reads analysis.json.gz / .zst
 
 # --- Dark theme ---
 plt.style.use("default")
@@ -37,26 +30,18 @@ plt.rcParams.update({
 })
 
 # --- Gather metrics ---
-for repo, repo_data in data.items():
-    if repo.startswith("_"):
-        continue
-
-    for file, metrics in repo_data["files"].items():
-        if metrics["language"] != "python":
-            continue
-
-        python_files += 1
-        python_loc += metrics["loc"]
-        import_counter.update(metrics["imports"])
-        cc_values.extend(metrics["complexity"].get("cc_values", []))
+python = cols.mask(language="python")
+python_files = int(python.sum())
+python_loc = int(cols.values("loc", python).sum())
+cc_values = cols.values("cc_values", python)
 
-        if metrics["num_functions"] > 0:
-            function_lengths.append(metrics["loc"] / metrics["num_functions"])
+# Exact per-function lengths from the function records (see function_index.FUNCTION_FIELDS)
+function_lengths = cols.values("function_lengths", python)
 
 # ================================
 #  PLOT 1 — TOP 5 IMPORTS
 # ================================
-top5 = import_counter.most_common(5)
+top5 = cols.most_common("imports", 5, mask=python)
 mods  = [m for m, _ in top5]
 counts = [c for _, c in top5]
 